@@ -1,29 +1,19 @@
 import sys
 import numpy as np
+sys.path.append("../../../../code")
+import genetic_code as gc
 
-int_to_nuc = {0: 'A', 1: 'C', 2: 'G', 3: 'U'}
-
-# Generates all codons neighboring (i.e., one nucleotide substituion away) codons of codon c.
-def gen_neighbouring_codons(c):
-	res = []
-	for i in range(3):
-		for b in ['A', 'C', 'G', 'U']:
-			if c[i]!=b:
-				res.append(c[:i] + b + c[(i+1):])
-	return res
-
-# Translates a given RNA seq using given genetic code
+# Translates a nucleotide sequence (array of integers, see genetic_code.encode_seqs) using a given genetic code (array).
 def translate(seq, code):
-	t = ""
-	for i in range(int(len(seq)/3)):
-		t += code[seq[3*i:(3*i+3)]]
-	return t
+	return gc.aa_strings(gc.translate(seq, code))[0]
 
 # Generates a random RNA sequence of a given length
 def rand_RNA_seq(length):
-	ints = np.random.choice(4, length, replace=True)
-	chars = [int_to_nuc[x] for x in ints]
-	return ''.join(chars)
+	return np.random.choice(4, length, replace=True)
+
+# Replaces the nucleotide at position pos of seq by base
+def mutate(seq, pos, base):
+	return gc.mutate(seq[None,:], [pos], [base])[0]
 
 
 
@@ -35,14 +25,7 @@ seed = int(sys.argv[3])		# random seed
 np.random.seed(seed)
 
 # the standard genetic code
-code = {}
-with open("../input/code_standard.tsv", 'r') as f:
-	lines = f.read().split("\n")[1:]
-for line in lines:
-	if line!="":
-		aa = line.split()[0]
-		codon = line.split()[1]
-		code[codon] = aa
+code = gc.code_to_array(gc.read_code("../input/code_standard.tsv"))
 
 
 # read the input file
@@ -71,8 +54,8 @@ for i in range(numSquares):
 		# first mutation
 		while True:
 			pos1 = np.random.randint(12)
-			new_char1 = int_to_nuc[np.random.randint(4)]
-			seq1 = seq0[:pos1] + new_char1 + seq0[(pos1+1):]
+			new_char1 = np.random.randint(4)
+			seq1 = mutate(seq0, pos1, new_char1)
 			tseq1 = translate(seq1, code)
 			# this is not a synonymous mutation, the sequence is not a global peak and it does not contain stop codons
 			if tseq1!=tseq0 and tseq1!="WWLA" and "*" not in tseq1:
@@ -82,8 +65,8 @@ for i in range(numSquares):
 		# second mutation
 		while True:
 			pos2 = np.random.randint(12)
-			new_char2 = int_to_nuc[np.random.randint(4)]
-			seq2 = seq0[:pos2] + new_char2 + seq0[(pos2+1):]
+			new_char2 = np.random.randint(4)
+			seq2 = mutate(seq0, pos2, new_char2)
 			tseq2 = translate(seq2, code)
 			# in addition to all the condition above, the mutation must happen in a different position than the first one
 			if tseq2!=tseq0 and tseq2!=tseq1 and tseq2!="WWLA" and pos2!=pos1 and "*" not in tseq2:
@@ -92,7 +75,7 @@ for i in range(numSquares):
 
 
 		# double mutant
-		seq12 = seq1[:pos2] + new_char2 + seq1[(pos2+1):]
+		seq12 = mutate(seq1, pos2, new_char2)
 		tseq12 = translate(seq12, code)
 		if tseq12!=tseq0 and tseq12!=tseq1 and tseq12!=tseq2 and "*" not in tseq12:
 			score12 = data[tseq12]
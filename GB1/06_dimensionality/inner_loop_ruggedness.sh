@@ -4,17 +4,19 @@ L=$2
 input_name=$( echo $input | sed 's%input/%%' )
 echo $input_name
 outFile="output_ruggedness/output_"$input_name
-codeFile="tmp_code_ruggedness_"$input_name
-tmpOut="tmp_out_ruggedness_"$input_name
 
-for i in $(seq 0 99999); do
-        python3 ../../code/generate_gen_code.py aa_permutation_restricted $i $outFile $codeFile
-        ../../code/./landscape_ruggedness $input $codeFile $tmpOut $L
-        cat $tmpOut >> $outFile
-done
+# code library of the randomization type (optional, see code/code_library.py)
+libDir=""
+if [ -d input/code_library ]; then
+	libDir="input/code_library"
+fi
 
-rm $codeFile
-rm $tmpOut
+# result cache (optional, see code/result_cache.py)
+cacheDir="../../result_cache"
+
+# generate the genetic codes (or read them from the code library) and run the engine for all seeds at once, appending the
+# results to the output file (see code/sweep.py)
+python3 ../../code/sweep.py aa_permutation_restricted 0 99999 "" ../../code/./landscape_ruggedness $input $outFile $cacheDir "$libDir" $L || exit 1
 
 # here compute the correlation and report to a file (problem with overwriting?)
 python3 ../../code/compute_corrs.py $input_name $outFile "output_ruggedness/results"
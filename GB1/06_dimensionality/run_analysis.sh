@@ -3,6 +3,7 @@ mkdir input
 cd input
 ln -s ../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../resources/code_standard.tsv .
+ln -s ../../../resources/code_libraries/aa_permutation_restricted code_library
 cd ..
 
 # generate the inputs
@@ -0,0 +1,572 @@
+/*
+Computes the landscape ruggedness characteristics (number of peaks; prevalence of epistasis; peak accessibility) of a landscape
+for many genetic codes with the same codon-block structure (e.g. the codes of the aa_permutation and aa_permutation_restricted
+randomizations, which only relabel the amino acids of the standard code), without working on all 4^(3L) nucleotide sequences.
+The results are the same as those of landscape_ruggedness (up to the order of the floating point summation of the proportion
+of accessible paths).
+
+The codon blocks are the groups of neighbouring codons encoding the same amino acid in the first code (22 in the standard code,
+where the serine codons form two blocks). The following is compiled once, as it does not depend on the code:
+	the block graph: the sequences of L blocks, neighbouring if they differ at one position by two neighbouring blocks.
+		All nucleotide sequences with the same block sequence have the same score and are connected, so the plateaus and
+		peaks of the nucleotide landscape are exactly those of the block graph.
+	the squares of sequences sampled for the epistasis (the same as in landscape_ruggedness), as block sequences.
+	for each block T, the classes of codons with the same block, the same distance to T and the same classes of the
+		neighbours one step closer to T. The nucleotide graph is the product of the codon graphs of the L positions, so
+		the numbers of shortest and of accessible shortest paths from a sequence to the global peak only depend on the
+		classes of its codons (with respect to the blocks of the peak).
+For each code, only the scores of the block sequences are computed. If the maximal score is reached by more than one block
+sequence, the accessible paths are counted on the nucleotide graph, as in landscape_ruggedness.
+
+Parameters:
+	[1] Name of the file containing the genotype-phenotype map. Format of the file: First line header, each other line contains one sequence and its phenotype, tab-delimited.
+	[2] The genetic codes: "-" for a stream of 64-byte code records on the standard input, a code library file (codes.npy, see
+		code_library.py), or a single code file (see landscape_ruggedness).
+	[3] Name of the output file; one line of results for each code.
+	[4] Number of amino acid positions L.
+	[5], [6] (optional, code library only) number of records to use and the first of them (default: all).
+All codes must be constant on the codon blocks of the first one.
+The code records are read by code_records.h; invalid records, library files or record ranges ([5], [6]) stop the engine with exit code 1.
+The landscape is read (and the neighbours in the genotype network are generated) by landscape.h.
+
+Compile as
+g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o block_ruggedness block_ruggedness.cpp
+*/
+
+#include <vector>
+#include <iostream>
+#include <fstream>
+#include <map>
+#include <unordered_map>
+#include <cstdlib>
+#include <algorithm>
+#include <string>
+#include <queue>
+#include <numeric>
+#include "code_records.h"
+#include "landscape.h"
+
+using namespace std;
+
+const string NUCS = "ACGU";
+
+// a class of codons with respect to a target block (see the header)
+struct CodonClass{
+	int block;	// block of the codons
+	int dist;	// distance to the target block
+	int size;	// number of codons
+	vector<pair<int, int> > down;	// classes of the neighbours one step closer to the target block, with multiplicities
+};
+
+// the structures shared by all codes
+struct Blocks{
+	int L;
+	int num_blocks;
+	vector<int> block_of;	// codon (6 bits, first nucleotide least significant) -> block
+	vector<int> first_codon;	// block -> one of its codons
+	vector<vector<int> > adjacent;	// block -> neighbouring blocks
+	vector<int> power;	// num_blocks^j
+	int num_seqs;	// number of block sequences
+	vector<vector<CodonClass> > classes;	// target block -> classes of codons
+	vector<vector<int> > class_of;	// target block -> codon -> class
+	vector<vector<int> > squares;	// sampled squares (block sequences)
+};
+
+// index of a codon (6 bits, first nucleotide least significant)
+int codon_bits(const string& codon){
+	return NUCS.find(codon[0]) + 4*NUCS.find(codon[1]) + 16*NUCS.find(codon[2]);
+}
+
+// function to read genetic code from file; code[codon bits] = amino acid
+void read_code(string file_name, vector<char>& code){
+	const int lines_cnt = 64;
+	ifstream ifile;
+	ifile.open(file_name);
+
+	string s;
+	ifile >> s >> s; // the header
+	for(int i = 0; i < lines_cnt; ++i){
+		char aa;
+		string codon;
+		ifile >> aa >> codon;
+		code[codon_bits(codon)] = aa;
+	}
+
+	ifile.close();
+}
+
+// reads one code record (see code_records.h) into code, indexed by 16*b3+4*b2+b1; returns false at the end of the stream
+bool read_code_record(istream& in, vector<char>& code){
+	string aas;
+	if (!read_record(in, aas)) {
+		return false;
+	}
+	for(int i = 0; i < 64; ++i){
+		code[(i / 16) + 4*((i / 4) % 4) + 16*(i % 4)] = aas[i];
+	}
+	return true;
+}
+
+// Samples num_squares random squares of sequences (a wild-type, two single mutants and a corresponding double mutant), as
+// sample_squares of landscape_ruggedness (the same random numbers, for the same seed).
+vector<vector<int> > sample_squares(int num_seqs, int num_squares, int L){
+	vector<vector<int>> squares;	// vector to store the results
+	for (int i = 0; i<num_squares; ++i) {
+		// the wildtype
+		int seq0 = rand() % num_seqs;
+		int seq1; // first single mutant
+		int seq2; // second single mutant
+		int seq12;	// double mutant
+
+		// first mutation
+		int pos1; int mut1; char cur_val1;
+		pos1 = rand() % (L*3);
+		while(true) {
+			mut1 = rand() % 4;
+			cur_val1 = (seq0 >> (2 * pos1)) % 4;
+			int base = seq0 - (cur_val1 << (2*pos1));
+			seq1 = base + (mut1 << (2*pos1));
+			if (seq1!=seq0) break;
+		}
+
+		// second mutation
+		int pos2; int mut2; char cur_val2;
+		while(true) {
+			pos2 = rand() % (L*3);
+			if(pos2 != pos1) {
+				mut2 = rand() % 4;
+				cur_val2 = (seq0 >> (2 * pos2)) % 4;
+				int base = seq0 - (cur_val2 << (2*pos2));
+				seq2 = base + (mut2 << (2*pos2));
+				if (seq2 != seq0) break;
+			}
+		}
+
+		// combination of the two mutations
+		int base = seq0 - (cur_val1 << (2*pos1)) - (cur_val2 << (2*pos2));
+		seq12 = base + (mut1 << (2*pos1)) + (mut2 << (2*pos2));
+
+		squares.push_back({seq0, seq1, seq2, seq12});
+	}
+	return squares;
+}
+
+// the block sequence of a nucleotide sequence
+int block_seq(Blocks& B, int u){
+	int t = 0;
+	for (int j = 0; j < B.L; ++j) {
+		t += B.block_of[(u >> (6*j)) & 63] * B.power[j];
+	}
+	return t;
+}
+
+// Compiles the code-independent structures (see the header) for the codon blocks of the given code.
+void compile_blocks(Blocks& B, vector<char>& code, int L){
+	cerr << "compiling the codon blocks" << endl;
+	B.L = L;
+	// the codon graph
+	vector<vector<int> > codon_neighbors(64);
+	for (int c = 0; c < 64; ++c) {
+		for (int v : Neighbors{c, 1}) codon_neighbors[c].push_back(v);
+	}
+
+	// the blocks: connected groups of codons encoding the same amino acid
+	B.block_of.assign(64, -1);
+	B.first_codon.clear();
+	for (int c = 0; c < 64; ++c) {
+		if (B.block_of[c] != -1) continue;
+		int b = B.first_codon.size();
+		B.first_codon.push_back(c);
+		vector<int> stack = {c};
+		B.block_of[c] = b;
+		while (!stack.empty()) {
+			int u = stack.back();
+			stack.pop_back();
+			for (int v : codon_neighbors[u]) {
+				if (B.block_of[v] == -1 && code[v] == code[u]) {
+					B.block_of[v] = b;
+					stack.push_back(v);
+				}
+			}
+		}
+	}
+	B.num_blocks = B.first_codon.size();
+	B.adjacent.assign(B.num_blocks, vector<int>());
+	for (int c = 0; c < 64; ++c) {
+		for (int v : codon_neighbors[c]) {
+			vector<int>& adj = B.adjacent[B.block_of[c]];
+			if (B.block_of[v] != B.block_of[c] && find(adj.begin(), adj.end(), B.block_of[v]) == adj.end()) {
+				adj.push_back(B.block_of[v]);
+			}
+		}
+	}
+	B.power.assign(L+1, 1);
+	for (int j = 1; j <= L; ++j) B.power[j] = B.power[j-1]*B.num_blocks;
+	B.num_seqs = B.power[L];
+
+	// the classes of codons with respect to each target block
+	B.classes.assign(B.num_blocks, vector<CodonClass>());
+	B.class_of.assign(B.num_blocks, vector<int>(64, -1));
+	for (int T = 0; T < B.num_blocks; ++T) {
+		// distances to the target block
+		vector<int> dist(64, -1);
+		vector<int> order;
+		for (int c = 0; c < 64; ++c) {
+			if (B.block_of[c] == T) {
+				dist[c] = 0;
+				order.push_back(c);
+			}
+		}
+		for (int i = 0; i < order.size(); ++i) {
+			for (int v : codon_neighbors[order[i]]) {
+				if (dist[v] == -1) {
+					dist[v] = dist[order[i]] + 1;
+					order.push_back(v);
+				}
+			}
+		}
+		// classes, in the order of increasing distance (the classes of the closer neighbours are already known)
+		map<pair<pair<int, int>, vector<pair<int, int> > >, int> class_index;
+		for (int c : order) {
+			map<int, int> down_count;
+			for (int v : codon_neighbors[c]) {
+				if (dist[v] == dist[c] - 1) ++down_count[B.class_of[T][v]];
+			}
+			vector<pair<int, int> > down(down_count.begin(), down_count.end());
+			auto key = make_pair(make_pair(B.block_of[c], dist[c]), down);
+			if (!class_index.count(key)) {
+				class_index[key] = B.classes[T].size();
+				B.classes[T].push_back({B.block_of[c], dist[c], 0, down});
+			}
+			B.class_of[T][c] = class_index[key];
+			++B.classes[T][class_index[key]].size;
+		}
+	}
+
+	// the squares for the epistasis, as in landscape_ruggedness
+	srand(1);
+	B.squares = sample_squares(1 << (6*L), 1000000, L);
+	for (vector<int>& square : B.squares) {
+		for (int& u : square) u = block_seq(B, u);
+	}
+	cerr << "blocks: " << B.num_blocks << ", block sequences: " << B.num_seqs << endl;
+}
+
+// Computes the number of peaks of the landscape on the block graph and their mean score (see count_peaks of landscape_ruggedness).
+pair<int, double> count_peaks(Blocks& B, vector<double>& scores){
+	int cnt = 0;
+	vector<double> peak_scores;
+
+	vector<int> visited(scores.size(), -1); // have we seen this node before?
+	// sort the block sequences based on the scores, in descending order
+	vector<pair<double, int> > sorted_seqs;
+	for(int i = 0; i < scores.size(); ++i){
+		sorted_seqs.push_back({scores[i], i});
+	}
+	sort(sorted_seqs.begin(), sorted_seqs.end(), greater<>());
+
+	vector<int> neighbors;
+	auto get_neighbors = [&](int u) {
+		neighbors.clear();
+		for (int j = 0; j < B.L; ++j) {
+			int b = (u / B.power[j]) % B.num_blocks;
+			for (int b2 : B.adjacent[b]) neighbors.push_back(u + (b2 - b)*B.power[j]);
+		}
+	};
+
+	// iterate over the block sequences in the order of descending score
+	for(int i = 0; i < sorted_seqs.size(); ++i){
+		if(visited[sorted_seqs[i].second] == -1){
+			// this is a candidate peak
+			bool isPeak = true;
+			double peak_score = sorted_seqs[i].first;
+
+			// explore the whole plateau
+			vector<int> peak_stack;
+			peak_stack.push_back(sorted_seqs[i].second);
+			while(!peak_stack.empty()){
+				int u = peak_stack[peak_stack.size()-1];
+				peak_stack.pop_back();
+				visited[u] = i;
+
+				get_neighbors(u);
+				for(int v : neighbors){
+					if(scores[v] == peak_score){
+						if(visited[v] == -1){
+							peak_stack.push_back(v);
+						}
+						if(visited[v]!=-1 && visited[v]!=i) {
+							isPeak = false;
+						}
+					}
+					visited[v] = i;
+				}
+			}
+
+			if (isPeak==true) {	//this is a peak
+				++cnt;
+				peak_scores.push_back(peak_score);
+			}
+		}
+		else {
+			// not a peak, just visit all neighbors
+			get_neighbors(sorted_seqs[i].second);
+			for(int v : neighbors){
+				visited[v] = i;
+			}
+		}
+	}
+
+	// the mean peak score
+	double sum = std::accumulate(peak_scores.begin(), peak_scores.end(), 0.0);
+	return {cnt, sum / peak_scores.size()};
+}
+
+// Computes the prevalence of epistasis types (no epistasis, magnitude, simple-sign or reciprocal-sign) among the sampled squares.
+vector<double> epistasis_types(Blocks& B, vector<double>& scores) {
+	int num_squares = B.squares.size();
+	int mag = 0; int ss = 0; int rs = 0; int no_epi = 0;
+	for (vector<int>& square : B.squares) {
+		double score_AB = scores[square[0]];
+		double score_aB = scores[square[1]];
+		double score_ab = scores[square[3]];
+		double score_Ab = scores[square[2]];
+
+		double delta_ab_Ab = score_Ab - score_ab;
+		double delta_ab_aB = score_aB - score_ab;
+		double delta_Ab_AB = score_AB - score_Ab;
+		double delta_aB_AB = score_AB - score_aB;
+
+		if (score_AB + score_ab - score_Ab - score_aB == 0) {
+			no_epi++;
+		}
+		else if (delta_ab_Ab*delta_aB_AB >= 0 && delta_ab_aB*delta_Ab_AB>=0) {
+			mag++;
+		}
+		else if (delta_ab_Ab*delta_aB_AB < 0 && delta_ab_aB*delta_Ab_AB<0) {
+			rs++;
+		} else ss++;
+	}
+	return {((double)no_epi)/num_squares, ((double)mag)/num_squares, ((double)ss)/num_squares, ((double)rs)/num_squares};
+}
+
+// The proportion of accessible shortest paths to the global peak, averaged over the sequences without stop codons, when the
+// global peak is the single block sequence peak: counted on the sequences of codon classes (see the header).
+double prob_accessible(Blocks& B, vector<double>& scores, int peak){
+	int L = B.L;
+	// the classes of each position, with respect to the block of the peak at that position
+	vector<vector<CodonClass>*> classes(L);
+	vector<int> radix(L+1, 1);
+	for (int j = 0; j < L; ++j) {
+		classes[j] = &B.classes[(peak / B.power[j]) % B.num_blocks];
+		radix[j+1] = radix[j] * classes[j]->size();
+	}
+	int num_class_seqs = radix[L];
+
+	// block sequence, distance to the peak and number of nucleotide sequences of each sequence of classes
+	vector<int> block_seqs(num_class_seqs, 0);
+	vector<int> dist(num_class_seqs, 0);
+	vector<double> size(num_class_seqs, 1.0);
+	int max_dist = 0;
+	for (int x = 0; x < num_class_seqs; ++x) {
+		for (int j = 0; j < L; ++j) {
+			CodonClass& c = (*classes[j])[(x / radix[j]) % classes[j]->size()];
+			block_seqs[x] += c.block * B.power[j];
+			dist[x] += c.dist;
+			size[x] *= c.size;
+		}
+		max_dist = max(max_dist, dist[x]);
+	}
+	// the sequences of classes ordered by the distance to the peak
+	vector<vector<int> > by_dist(max_dist+1);
+	for (int x = 0; x < num_class_seqs; ++x) by_dist[dist[x]].push_back(x);
+
+	vector<long long> num_paths(num_class_seqs, 0);
+	vector<long long> num_accessible(num_class_seqs, 0);
+	double prob_acc = 0.0;
+	double num_nonempty = 0.0;
+	for (int d = 0; d <= max_dist; ++d) {
+		for (int x : by_dist[d]) {
+			double score = scores[block_seqs[x]];
+			if (d == 0) {
+				num_paths[x] = 1;
+				num_accessible[x] = 1;
+			}
+			else {
+				// one step closer to the peak at one of the positions
+				for (int j = 0; j < L; ++j) {
+					int cur = (x / radix[j]) % classes[j]->size();
+					for (auto& down : (*classes[j])[cur].down) {
+						int y = x + (down.first - cur) * radix[j];
+						num_paths[x] += down.second * num_paths[y];
+						if (score <= scores[block_seqs[y]]) {
+							num_accessible[x] += down.second * num_accessible[y];
+						}
+					}
+				}
+			}
+			if (score != EMPTY_VAL) {
+				prob_acc += size[x] * num_accessible[x] / num_paths[x];
+				num_nonempty += size[x];
+			}
+		}
+	}
+	return prob_acc / num_nonempty;
+}
+
+// The proportion of accessible shortest paths to the global peak(s) on the nucleotide graph (see BFS of landscape_ruggedness).
+double prob_accessible_nucleotide(Blocks& B, vector<double>& block_scores, vector<int>& peaks){
+	int L = B.L;
+	int num_nodes = 1 << (6*L);
+	vector<double> scores(num_nodes);
+	for (int i = 0; i < num_nodes; ++i) scores[i] = block_scores[block_seq(B, i)];
+
+	vector<long long> num_paths(num_nodes, 0);
+	vector<long long> num_accessible(num_nodes, 0);
+	vector<int> dist(num_nodes, -1);
+	queue<int> q;
+	for (int i = 0; i < num_nodes; ++i) {
+		if (find(peaks.begin(), peaks.end(), block_seq(B, i)) != peaks.end()) {
+			q.push(i);
+			dist[i] = 0;
+			num_paths[i] = 1;
+			num_accessible[i] = 1;
+		}
+	}
+	while (!q.empty()) {
+		int u = q.front();
+		q.pop();
+		int d = dist[u];
+		for (int v : Neighbors{u, L}) {
+			if (dist[v] == -1) {
+				q.push(v);
+				dist[v] = d+1;
+			}
+			if (dist[v] == d+1) {
+				num_paths[v] += num_paths[u];
+				if (scores[v] <= scores[u]) {
+					num_accessible[v] += num_accessible[u];
+				}
+			}
+		}
+	}
+	double prob_acc = 0.0;
+	int num_nonempty = 0;
+	for (int i=0; i<num_nodes; ++i) {
+		if (scores[i]!=EMPTY_VAL) {
+			prob_acc += 1.0*num_accessible[i]/num_paths[i];
+			num_nonempty++;
+		}
+	}
+	return prob_acc / num_nonempty;
+}
+
+// Computes the ruggedness characteristics of the landscape under one genetic code and writes them as one line to out_file.
+void evaluate_code(Blocks& B, vector<double>& aa_scores, vector<char>& code, ostream& out_file){
+	int L = B.L;
+	// the amino acid of each block
+	vector<int> block_aa(B.num_blocks);
+	for (int b = 0; b < B.num_blocks; ++b) {
+		char aa = code[B.first_codon[b]];
+		size_t index = AAS.find(aa);
+		block_aa[b] = (aa == '*') ? STOP : ((index == string::npos) ? UNKNOWN : (int) index);
+	}
+	for (int c = 0; c < 64; ++c) {
+		if (code[c] != code[B.first_codon[B.block_of[c]]]) {
+			cerr << "The code does not have the codon blocks of the first code" << endl;
+			exit(1);
+		}
+	}
+
+	// the scores of the block sequences
+	vector<double> scores(B.num_seqs, EMPTY_VAL);
+	for (int t = 0; t < B.num_seqs; ++t) {
+		long long index = 0;
+		bool stop = false;
+		bool unknown = false;
+		for (int j = L-1; j >= 0; --j) {
+			int aa = block_aa[(t / B.power[j]) % B.num_blocks];
+			if (aa == STOP) stop = true;
+			else if (aa == UNKNOWN) unknown = true;
+			else index = 20*index + aa;
+		}
+		if (!stop) {
+			scores[t] = unknown ? 0.0 : aa_scores[index];
+		}
+	}
+
+	// find global maxima
+	vector<int> global_max;
+	double max_score = -100;
+	for (int t = 0; t < B.num_seqs; ++t) {
+		if (scores[t] >= max_score) {
+			if (scores[t] == max_score) {
+				global_max.push_back(t);
+			}
+			else {
+				global_max = {t};
+			}
+			max_score = scores[t];
+		}
+	}
+
+	// number of peaks
+	pair<int, double> res_peaks = count_peaks(B, scores);
+	out_file << res_peaks.first << "\t" << res_peaks.second << "\t";
+
+	// epistasis
+	vector<double> res = epistasis_types(B, scores);
+	out_file << res[0] << "\t" << res[1] << "\t" << res[2] << "\t" << res[3] << "\t";
+
+	// proportion of accessible paths
+	double prob_acc;
+	if (global_max.size() == 1) {
+		prob_acc = prob_accessible(B, scores, global_max[0]);
+	}
+	else {
+		prob_acc = prob_accessible_nucleotide(B, scores, global_max);
+	}
+	out_file << prob_acc << endl;
+}
+
+///////////////////////////////////////////////////////////
+int main(int argc, char** argv){
+	// command line parameters
+	string data_file_str = string(argv[1]);
+	string code_file_str = string(argv[2]);
+	string output_file_str = string(argv[3]);
+	int L = atoi(argv[4]);
+
+	// read the genotype-phenotype landscape
+	vector<double> aa_scores;
+	read_landscape(data_file_str, aa_scores, L);
+
+	// output file
+	ofstream out_file;
+	out_file.open(output_file_str);
+
+	Blocks B;
+	vector<char> code(64);
+	bool from_library = code_file_str.size() >= 4 && code_file_str.substr(code_file_str.size()-4) == ".npy";
+	if (code_file_str != "-" && !from_library) {
+		read_code(code_file_str, code);
+		compile_blocks(B, code, L);
+		evaluate_code(B, aa_scores, code, out_file);
+		return 0;
+	}
+
+	// stream of codes
+	ifstream library_file;
+	long long num_codes = -1;
+	if (from_library) {
+		open_code_library(library_file, code_file_str, (argc > 6) ? parse_integer(argv[6], "first record", 0, LLONG_MAX) : 0);
+		if (argc > 5) num_codes = parse_integer(argv[5], "number of records", 0, LLONG_MAX);
+	}
+	istream& codes_in = from_library ? library_file : cin;
+	for (long long n = 0; n != num_codes && read_code_record(codes_in, code); ++n) {
+		if (n == 0) {
+			compile_blocks(B, code, L);
+		}
+		evaluate_code(B, aa_scores, code, out_file);
+	}
+}
@@ -0,0 +1,156 @@
+'''
+Persistent binary library of genetic codes of one randomization family (aa_permutation, aa_permutation_restricted,
+random or ostrov), so that the codes are generated only once and then read by all analyses.
+A library is a directory containing:
+	codes.npy ... (N, 64) uint8 array; row i is the code with seed i (for ostrov: row i of the Ostrov codes summary table,
+		row 0 being the standard code), codons ordered as in genetic_code.codons, amino acids as indices to genetic_code.aas.
+		After the .npy header, the file is a plain sequence of 64-byte records.
+	robustness.npy ... (N,) float64, robustness of each code (physicochemical groups of Pines et al.)
+	split_aa.npy ... (N,) uint8, the amino acid occupying the split serine codon block (code["UCU"])
+	representative.npy ... (N,) int64, dedup index: the first row equivalent to row i under the symmetries of the nucleotide
+		graph (see genetic_code.code_classes); a sweep of results that are the same for all codes of a class (not the sampled
+		statistics, see result_cache.py) needs to evaluate only the rows with representative[i]==i
+	header.tsv ... family, number of codes, generation mode and the encoding, as "key \t value" lines
+The arrays are memory-mapped when loaded, so reading (a part of) a library does not copy it into memory.
+
+Usage (builds a library):
+	python3 code_library.py family n_codes libDir SGCFile [mode | summaryFile]
+Parameters:
+	[1] family: aa_permutation, aa_permutation_restricted, random or ostrov
+	[2] number of codes (seeds 0 .. n_codes-1; for ostrov, the number of rows of the summary table to use, -1 for all)
+	[3] output directory
+	[4] name of the file from which the standard genetic code will be read
+	[5] (optional) for aa_permutation, aa_permutation_restricted and random: legacy (default) or fast, see genetic_code.generate_codes
+		(for aa_permutation_restricted also enumerate: row i is the code with rank i, see genetic_code.unrank_restricted);
+		for ostrov: the Ostrov codes summary table (default input/ostrov_codes_summary.tsv)
+'''
+
+import numpy as np
+import os
+import sys
+import genetic_code as gc
+
+families = ["aa_permutation", "aa_permutation_restricted", "random", "ostrov"]
+
+# codon blocks freed in the Ostrov codes
+ostrov_blocks = [["UUA", "UUG"], ["UAG"], ["AGU", "AGC"], ["AGG", "AGA"]]
+# special characters encoding the parts of split codon blocks, in the order of the columns of the summary table
+ostrov_special_chars = ["X", "Z", "B", "J"]
+
+
+'''
+Decodes one row of the Ostrov codes summary table into a genetic code dictionary (as create_ostrov_code.py does).
+parameters:
+	standard_code ... dictionary with the SGC
+	aa_blocks ... meaning of the four free codon blocks (columns Block1-Block4)
+	special_chars ... meaning of the special characters X, Z, B, J (columns X, Z, B, J)
+'O' is accepted as a stop codon (the tables read by the shell scripts encode stop codons this way).
+'''
+def decode_ostrov_code(standard_code, aa_blocks, special_chars):
+	code = standard_code.copy()
+	for i in range(4):
+		aa = aa_blocks[i]
+		if aa!="-":
+			if aa in ostrov_special_chars:
+				aa = special_chars[ostrov_special_chars.index(aa)]
+			if aa=="O":
+				aa = "*"
+			for codon in ostrov_blocks[i]:
+				code[codon] = aa
+	return code
+
+# Reads the Ostrov codes summary table and decodes the first n_codes codes (all of them if n_codes is negative).
+def read_ostrov_codes(fileName, standard_code, n_codes = -1):
+	codes = []
+	with open(fileName, 'r') as f:
+		# skip the header
+		f.readline()
+		for line in f:
+			if line.strip()=="":
+				continue
+			if len(codes)==n_codes:
+				break
+			splitLine = line.rstrip("\n").split("\t")
+			codes.append(gc.code_to_array(decode_ostrov_code(standard_code, splitLine[1:5], splitLine[5:9])))
+	return np.array(codes, dtype=np.uint8).reshape(-1, 64)
+
+
+'''
+Saves a library of codes.
+parameters:
+	libDir ... output directory (created if needed)
+	family ... randomization family
+	codes ... (N, 64) array of codes, row i = seed i
+	mode ... how the codes were generated (saved in the header)
+'''
+def save_library(libDir, family, codes, mode):
+	os.makedirs(libDir, exist_ok=True)
+	codes = np.ascontiguousarray(codes, dtype=np.uint8)
+	np.save(os.path.join(libDir, "codes.npy"), codes)
+	np.save(os.path.join(libDir, "robustness.npy"), gc.robustness(codes, gc.physchem_groups))
+	np.save(os.path.join(libDir, "split_aa.npy"), codes[:, gc.codon_index["UCU"]])
+	representatives, classes = gc.code_classes(codes)
+	np.save(os.path.join(libDir, "representative.npy"), representatives[classes])
+	with open(os.path.join(libDir, "header.tsv"), 'w') as f:
+		f.write("family\t" + family + "\n")
+		f.write("n_codes\t" + str(codes.shape[0]) + "\n")
+		f.write("mode\t" + mode + "\n")
+		f.write("codons\t" + ",".join(gc.codons) + "\n")
+		f.write("aas\t" + "".join(gc.aas) + "\n")
+
+'''
+Loads a library of codes. The arrays are memory-mapped (read-only).
+Returns a dictionary with keys "codes", "robustness", "split_aa", "representative" and "header" (dictionary with the header entries).
+'''
+def load_library(libDir):
+	lib = {}
+	for name in ["codes", "robustness", "split_aa", "representative"]:
+		lib[name] = np.load(os.path.join(libDir, name + ".npy"), mmap_mode='r')
+	lib["header"] = {}
+	with open(os.path.join(libDir, "header.tsv"), 'r') as f:
+		for line in f:
+			if line.strip()!="":
+				key, value = line.rstrip("\n").split("\t")
+				lib["header"][key] = value
+	if lib["header"]["codons"]!=",".join(gc.codons) or lib["header"]["aas"]!="".join(gc.aas):
+		raise ValueError("Unknown encoding of the code library " + libDir)
+	return lib
+
+'''
+Returns the codes with seeds 0 .. n_codes-1 of the given randomization family (aa_permutation, aa_permutation_restricted or random),
+as an (n_codes, 64) array.
+The codes are read from the library in libDir if it exists (and contains enough codes of the right family, generated in
+the given mode), otherwise they are generated.
+parameters:
+	mode ... generation mode of the codes (see genetic_code.generate_codes)
+'''
+def get_codes(randType, n_codes, standard_code, libDir = "input/code_library", mode = "legacy"):
+	if os.path.isdir(libDir):
+		lib = load_library(libDir)
+		if lib["header"]["family"]==randType and lib["header"].get("mode")==mode and lib["codes"].shape[0] >= n_codes:
+			return lib["codes"][:n_codes]
+	return gc.generate_codes(randType, range(n_codes), standard_code, mode)
+
+
+
+if __name__ == "__main__":
+	family = sys.argv[1]
+	n_codes = int(sys.argv[2])
+	libDir = sys.argv[3]
+	SGCFile = sys.argv[4]
+
+	if family not in families:
+		raise ValueError("Unknown randomization family: " + family)
+
+	# the standard code
+	standard_code = gc.read_code(SGCFile)
+
+	if family=="ostrov":
+		summaryFile = sys.argv[5] if len(sys.argv) > 5 else "input/ostrov_codes_summary.tsv"
+		codes = read_ostrov_codes(summaryFile, standard_code, n_codes)
+		mode = "summary"
+	else:
+		mode = sys.argv[5] if len(sys.argv) > 5 else "legacy"
+		codes = gc.generate_codes(family, range(n_codes), standard_code, mode)
+
+	save_library(libDir, family, codes, mode)
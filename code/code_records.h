@@ -0,0 +1,130 @@
+/*
+Reading of genetic codes given as 64-byte records, shared by the engines (landscape_ruggedness, greedy_walk, random_walk,
+block_ruggedness): from a stream (the standard input) or from a code library file (codes.npy, see code_library.py).
+A record is one code: byte i is the index (in ACDEFGHIKLMNPQRSTVWY*) of the amino acid encoded by codon i = 16*b1+4*b2+b3
+(A=0, C=1, G=2, U=3).
+Invalid input (a missing or malformed library file, a truncated record, a byte out of range, an invalid number of records
+or first record) is reported to the standard error output and the program exits with code 1.
+*/
+
+#ifndef CODE_RECORDS_H
+#define CODE_RECORDS_H
+
+#include <cctype>
+#include <cerrno>
+#include <climits>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <string>
+
+// the amino acids of the records (and the stop codon)
+const std::string RECORD_AAS = "ACDEFGHIKLMNPQRSTVWY*";
+
+// prints the error message and exits
+inline void records_error(const std::string& message){
+	std::cerr << message << std::endl;
+	exit(1);
+}
+
+// Parses an integer command line value (e.g. the number of records) in [min_value, max_value].
+inline long long parse_integer(const std::string& value, const std::string& name, long long min_value, long long max_value){
+	char* end;
+	errno = 0;
+	long long x = strtoll(value.c_str(), &end, 10);
+	if (value.empty() || isspace((unsigned char) value[0]) || *end != '\0' || errno == ERANGE || x < min_value || x > max_value) {
+		records_error("Invalid " + name + ": " + value);
+	}
+	return x;
+}
+
+// the codon of record byte i
+inline std::string record_codon(int i){
+	const std::string nucs = "ACGU";
+	return {nucs[i / 16], nucs[(i / 4) % 4], nucs[i % 4]};
+}
+
+// Reads one record from a stream into aas (aas[i] is the amino acid of codon i); returns false at the end of the stream.
+inline bool read_record(std::istream& in, std::string& aas){
+	char record[64];
+	in.read(record, 64);
+	if (in.gcount() == 0) {
+		return false;
+	}
+	if (in.gcount() < 64) {
+		records_error("Truncated code record (" + std::to_string(in.gcount()) + " bytes)");
+	}
+	aas.resize(64);
+	for (int i = 0; i < 64; ++i) {
+		unsigned char index = record[i];
+		if (index >= RECORD_AAS.size()) {
+			records_error("Invalid amino acid index " + std::to_string(index) + " in a code record");
+		}
+		aas[i] = RECORD_AAS[index];
+	}
+	return true;
+}
+
+// Reads one record from a stream into code (a map codon -> amino acid); returns false at the end of the stream.
+template <typename Map>
+bool read_code_record(std::istream& in, Map& code){
+	std::string aas;
+	if (!read_record(in, aas)) {
+		return false;
+	}
+	for (int i = 0; i < 64; ++i) {
+		code[record_codon(i)] = aas[i];
+	}
+	return true;
+}
+
+// the value of key in the dictionary of a .npy header (up to the next ',' or the end of a tuple)
+inline std::string npy_header_value(const std::string& header, const std::string& key){
+	size_t pos = header.find("'" + key + "':");
+	if (pos == std::string::npos) {
+		return "";
+	}
+	pos = header.find_first_not_of(" ", pos + key.size() + 3);
+	if (pos == std::string::npos) {
+		return "";
+	}
+	size_t end = (header[pos] == '(') ? header.find(')', pos) + 1 : header.find(',', pos);
+	return header.substr(pos, end - pos);
+}
+
+// Opens a code library file (codes.npy: an (N, 64) uint8 array) and positions it at record first. Returns N.
+inline long long open_code_library(std::ifstream& in, const std::string& file_name, long long first){
+	in.open(file_name, std::ios::binary);
+	if (!in.is_open()) {
+		records_error("Cannot open the code library file " + file_name);
+	}
+	unsigned char magic[8];	// "\x93NUMPY", major and minor version
+	in.read((char*) magic, 8);
+	if (in.gcount() < 8 || std::string((char*) magic + 1, 5) != "NUMPY") {
+		records_error(file_name + " is not a .npy file");
+	}
+	unsigned char len[4] = {0, 0, 0, 0};
+	in.read((char*) len, (magic[6] == 1) ? 2 : 4);
+	std::string header(len[0] | (len[1] << 8) | (len[2] << 16) | (len[3] << 24), ' ');
+	in.read(&header[0], header.size());
+	if (in.gcount() < (std::streamsize) header.size()) {
+		records_error(file_name + " is not a .npy file");
+	}
+
+	// the array must be (N, 64) uint8, in C order
+	std::string shape = npy_header_value(header, "shape");
+	size_t comma = shape.find(',');
+	if (npy_header_value(header, "descr") != "'|u1'" || npy_header_value(header, "fortran_order") != "False"
+			|| comma == std::string::npos || shape.find(',', comma + 1) != std::string::npos
+			|| atoi(shape.substr(comma + 1).c_str()) != 64) {
+		records_error(file_name + " is not a code library file: expected an (N, 64) uint8 array, found " + header.substr(0, header.find_last_not_of(" \n") + 1));
+	}
+	long long num_records = atoll(shape.substr(1).c_str());
+	if (first < 0 || first > num_records) {
+		records_error("The first record " + std::to_string(first) + " is not in the code library (" + std::to_string(num_records) + " codes)");
+	}
+	in.seekg(64*first, std::ios::cur);
+	return num_records;
+}
+
+#endif
@@ -1,18 +1,28 @@
 import sys
 import numpy as np
+import stratified_sampling
 
 name = sys.argv[1]
 file_name = sys.argv[2]
 output_name = sys.argv[3]
+# (optional) importance weights of the codes, "seed \t weight" per line (see stratified_sampling.py)
+weights_name = sys.argv[4] if len(sys.argv) > 4 else None
 
 data = np.genfromtxt(file_name, delimiter="\t") 
 
+if weights_name is not None:
+	weights = stratified_sampling.read_weights(weights_name)
+	w = [weights[int(x)] for x in data[:,0]]
+	corrcoef = lambda x, y: stratified_sampling.weighted_corrcoef(x, y, w)
+else:
+	corrcoef = lambda x, y: np.corrcoef(x, y)[0,1]
+
 corrs = []
 for i in range(3, data.shape[1]):
 	# if not all the values are same
 	if len(set(data[:,i])) > 1:
 		# correlation of i-th column with code robustness (3rd column)
-		corrs.append(np.corrcoef(data[:,i], data[:,2])[0,1])
+		corrs.append(corrcoef(data[:,i], data[:,2]))
 
 
 with open(output_name, 'a') as f:
@@ -1,9 +1,12 @@
 import sys
 import numpy as np
+import stratified_sampling
 
 name = sys.argv[1]
 file_name = sys.argv[2]
 output_name = sys.argv[3]
+# (optional) importance weights of the codes, "seed \t weight" per line (see stratified_sampling.py)
+weights_name = sys.argv[4] if len(sys.argv) > 4 else None
 
 # find the global peak
 input_name = "input/" + name
@@ -45,10 +48,17 @@ def prob_global(peaks_vec, global_max, num_seqs):
 			return p.split(":")[1]/num_seqs
 probs_global = [prob_global(x, global_max, num_seqs) for x in peaks]
 
-corrs = [np.corrcoef(data[:,2], mean_fit)[0,1],
-	np.corrcoef(data[:,2], mean_steps)[0,1],
-	np.corrcoef(data[:,2], entropies)[0,1],
-	np.corrcoef(data[:,2], probs_global)[0,1]]
+if weights_name is not None:
+	weights = stratified_sampling.read_weights(weights_name)
+	w = [weights[int(x)] for x in data[:,0]]
+	corrcoef = lambda x, y: stratified_sampling.weighted_corrcoef(x, y, w)
+else:
+	corrcoef = lambda x, y: np.corrcoef(x, y)[0,1]
+
+corrs = [corrcoef(data[:,2], mean_fit),
+	corrcoef(data[:,2], mean_steps),
+	corrcoef(data[:,2], entropies),
+	corrcoef(data[:,2], probs_global)]
 
 with open(output_name, 'a') as f:
 	f.write('\t'.join([str(x) for x in [name] + corrs]) + "\n")
\ No newline at end of file
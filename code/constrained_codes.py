@@ -0,0 +1,77 @@
+'''
+Selects the seeds of the randomized codes that pass the global peak filters (the size of the global peak is the same as
+under the standard code, and the split codon block is not occupied by an amino acid of the global peak; see
+genetic_code.peak_filter), so that the landscape engines are run only for the codes whose results are used by the
+analyses of the peak-dependent columns.
+The seeds are scanned in increasing order until n_valid of them pass the filters; the codes themselves are the same as
+the codes with these seeds in the unfiltered runs (generate_gen_code.py).
+Parameters:
+	[1] randomization type (aa_permutation, aa_permutation_restricted or random)
+	[2] global peak (amino acid sequence)
+	[3] number of codes passing the filters to select
+	[4] output file: the selected seeds, one per line (can be given to script_ruggedness.sh / script_greedy.sh)
+	[5] (optional) maximal number of seeds to scan (default 100000)
+	[6] (optional) directory with the code library of the randomization type (see code_library.py)
+The acceptance bookkeeping (number of scanned and selected seeds, rejections by each filter, empirical and exact
+acceptance rate) is written to the output file + "_acceptance".
+'''
+
+import numpy as np
+import sys
+import genetic_code as gc
+import code_library
+
+# number of seeds examined at once
+BLOCK = 10000
+
+
+if __name__ == "__main__":
+	randType = sys.argv[1]
+	globalPeak = sys.argv[2]
+	n_valid = int(sys.argv[3])
+	outFile = sys.argv[4]
+	max_seeds = int(sys.argv[5]) if len(sys.argv) > 5 else 100000
+	libDir = sys.argv[6] if len(sys.argv) > 6 else "input/code_library"
+
+	# the standard code
+	standard_code = gc.read_code("input/code_standard.tsv")
+
+	# the codes, read from the code library if available
+	codes = code_library.get_codes(randType, max_seeds, standard_code, libDir)
+
+	selected = []
+	n_scanned = 0
+	rejected_size = 0
+	rejected_split = 0
+	for start in range(0, max_seeds, BLOCK):
+		block = codes[start:(start+BLOCK)]
+		preserved, notSplit = gc.peak_filter(block, globalPeak, standard_code, separate=True)
+		valid = np.flatnonzero(preserved & notSplit)
+		# only count the seeds up to the last one needed
+		if len(selected) + len(valid) >= n_valid:
+			valid = valid[:(n_valid-len(selected))]
+			end = valid[-1]+1 if len(valid) > 0 else 0
+		else:
+			end = block.shape[0]
+		selected += [start+x for x in valid]
+		n_scanned += end
+		rejected_size += np.count_nonzero(~preserved[:end])
+		rejected_split += np.count_nonzero(preserved[:end] & ~notSplit[:end])
+		if len(selected)==n_valid:
+			break
+
+	with open(outFile, 'w') as f:
+		for seed in selected:
+			f.write(str(seed) + "\n")
+
+	exact = gc.peak_filter_acceptance(randType, globalPeak, standard_code)
+	with open(outFile + "_acceptance", 'w') as f:
+		f.write("scanned\t" + str(n_scanned) + "\n")
+		f.write("selected\t" + str(len(selected)) + "\n")
+		f.write("rejected_peak_size\t" + str(rejected_size) + "\n")
+		f.write("rejected_split_block\t" + str(rejected_split) + "\n")
+		f.write("acceptance\t" + str(len(selected)/n_scanned if n_scanned > 0 else float("nan")) + "\n")
+		f.write("acceptance_exact\t" + (str(exact) if exact is not None else "NA") + "\n")
+
+	if len(selected) < n_valid:
+		print("Only " + str(len(selected)) + " of " + str(max_seeds) + " codes pass the filters")
@@ -11,125 +11,8 @@ Parameters:
 
 import numpy as np
 import sys
-
-'''
-Reads the genetic code from a file.
-Format of the file: 
-	First line: header
-	Each other line: Amino acid \t Codon
-'''
-def read_code(fileName):
-	code = {}
-	with open(fileName, 'r') as f:
-		lines = f.read().split("\n")
-		# remove the header
-		lines.pop(0)
-		for l in lines:
-			if l!="":
-				splitLine = l.split("\t")
-				#print(splitLine)
-				code[splitLine[1]] = splitLine[0]
-	return code
-
-# Generates all codons neighboring (i.e., one nucleotide substituion away) codons of codon c.
-def gen_neighbouring_codons(c):
-	res = []
-	for i in range(3):
-		for b in ['A', 'C', 'G', 'U']:
-			if c[i]!=b:
-				res.append(c[:i] + b + c[(i+1):])
-	return res
-
-# Computes the number of single-nucleotide mutations leading between amino acid pairs in a given genetic code.
-def number_of_mutations(code, aa_pairs):
-	res = np.zeros(shape=len(aa_pairs))
-
-	codons = list(code.keys())
-
-	for c in codons:
-		aa = code[c]
-		if aa!="*":
-			neighs = gen_neighbouring_codons(c)
-			for n in neighs:
-				n_aa = code[n]
-				if n_aa!="*" and aa!=n_aa:
-					try:
-						ind = aa_pairs.index(aa+n_aa)
-					except ValueError:
-						ind = aa_pairs.index(n_aa+aa)
-					res[ind]+=1
-	return res
-
-# Computes the absolute differences between all pairs of values in vector v.
-def compute_diff_vector(v):
-	res = []
-	for ind1 in range(len(v)):
-		for ind2 in range(ind1+1, len(v)):
-			res += [abs(v[ind1]-v[ind2])]
-	return res
-
-''' 
-amino acid permutation: 
-Keep the blocks of codons, only randomly re-assign amino acids to them.
-Position of stop codons is fixed.
-parameters: 
-	standard_code ... dictionary providing the standard genetic code; keys = codons, values = amino acids
-	seed ... random seed (default 0)
-'''
-def rand_aa_permutation(standard_code, seed = 0):
-	np.random.seed(seed)
-	# a list of amino acids
-	aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S',
-	'T', 'V', 'W', 'Y', '*']
-	# dictionary to store the code
-	code = {}
-	# randomly shuffle the amino acids 
-	shuffled_aas = np.random.permutation(20)
-	# the last one is stop codon
-	shuffled_aas = np.append(shuffled_aas, [20])
-	# go over the standard code and always change amino acid i to shuffled_aas[i]
-	for codon, aa in standard_code.items():
-		code[codon] = aas[shuffled_aas[aas.index(aa)]]
-	return code
-
-'''
-Amino acid permutation, restricted to only those permutation that preserve the number of codons per aa.
-parameters: 
-	standard_code ... dictionary providing the standard genetic code; keys = codons, values = amino acids
-	seed ... random seed (default 0)
-'''
-def rand_aa_permutation_restricted(standard_code, seed = 0):
-	np.random.seed(seed)
-	# dictionary to store the code
-	code = {}
-	# aas, ordered by number of codons
-	aas = ["M", "W", "C", "D", "E", "F", "H", "K", "N", "Q", "Y", "I", "A", "G", "P", "T", "V", "L", "R", "S", "*"]
-	# randomly shuffle the amino acids, preserving the size
-	shuffled_aas_1 = np.random.permutation(2)
-	shuffled_aas_2 = [x+2 for x in np.random.permutation(9)]
-	shuffled_aas_3 = [11]
-	shuffled_aas_4 = [x+12 for x in np.random.permutation(5)]
-	shuffled_aas_6 = [x+17 for x in np.random.permutation(3)]
-	shuffled_aas = np.concatenate((shuffled_aas_1, shuffled_aas_2, shuffled_aas_3, shuffled_aas_4, shuffled_aas_6, [20]))
-	# the last one is stop codon
-	shuffled_aas = np.append(shuffled_aas, [20])
-	# go over the standard code and always change amino acid i to shuffled_aas[i]
-	for codon, aa in standard_code.items():
-		code[codon] = aas[shuffled_aas[aas.index(aa)]]
-	return code
-
-
-
-def gen_all_neighbors(seq):
-	aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S',
-	'T', 'V', 'W', 'Y']
-	res = []
-	for i in range(len(seq)):
-		for aa in aas:
-			new_seq = seq[:i] + aa + seq[(i+1):]
-			if new_seq != seq:
-				res.append(new_seq)
-	return res
+import genetic_code as gc
+import code_library
 
 ############## MAIN 
 
@@ -215,7 +98,7 @@ if __name__ == "__main__":
 	
 	
 	# the standard genetic code
-	standard_code = read_code("input/code_standard.tsv")
+	standard_code = gc.read_code("input/code_standard.tsv")
 
 	'''
 	# sizes of the global peak
@@ -238,25 +121,19 @@ if __name__ == "__main__":
 	presSummit = [True if notSplit[x]==True else False for x in range(n_codes)]
 
 	# create the matrix with numbers of aa-aa mutations allowed by each code
-	codes_mutations = np.zeros(shape=(n_codes, len(aa_pairs)))
-	
 	#with open("output/num_GCAs", 'w') as f:
-	for seed in range(n_codes):		
-		if seed==0:
-			# standard			
-			code = standard_code
-		else:
-			code = rand_aa_permutation_restricted(standard_code, seed)
-		# compute the number of allowed amino acid substitutions
-		codes_mutations[seed,:] = number_of_mutations(code, aa_pairs)
-		'''
-		# how many codons encode G, C, A?
-		vals = code.values()
-		n_G = sum(v=="G" for v in vals)
-		n_C = sum(v=="C" for v in vals)
-		n_A = sum(v=="A" for v in vals)
-		f.write('\t'.join([str(x) for x in [seed, n_A, n_C, n_G]]) + "\n")
-		'''
+	# the randomized codes (seed 0 = the standard code), read from the code library if available
+	codes = code_library.get_codes("aa_permutation_restricted", n_codes, standard_code)
+	# compute the number of allowed amino acid substitutions
+	codes_mutations = gc.number_of_mutations(codes, aas)
+	'''
+	# how many codons encode G, C, A?
+	vals = code.values()
+	n_G = sum(v=="G" for v in vals)
+	n_C = sum(v=="C" for v in vals)
+	n_A = sum(v=="A" for v in vals)
+	f.write('\t'.join([str(x) for x in [seed, n_A, n_C, n_G]]) + "\n")
+	'''
 	
 
 	print("codes done")
@@ -271,7 +148,7 @@ if __name__ == "__main__":
 		# for each property, compute the correlation with each results feature
 		for prop, prop_vec in aaindex.items():
 			# differences in the property among amino acid pairs
-			diff_vec = compute_diff_vector(prop_vec)
+			diff_vec = gc.compute_diff_vector(prop_vec)
 			# mean absolute change in the property upon a single-nucleotide substituion, under all the genetic codes
 			ermc = np.matmul(codes_mutations, diff_vec)
 			# the correlations
@@ -2,13 +2,19 @@
 Generates a summary table of all Ostrov codes: All combinations of amino acids in the four freed codon blocks.
 If split codon blocks are created, special characters (X, Z, B, J) are used to encode the "split" part.
 The meaning of these special characters (if used) is also saved in the resulting table.
+Every code has a stable global index (the row of the full table, 0 being the standard code, followed by the codes with
+1, 2, 3 and 4 changes), so that any range of codes can be generated independently (see ostrov_code, ostrov_codes).
 Parameters:
 	[1] Name of the output file.
 	[2] Name of the file from which the standard genetic code will be read.
+	[3], [4] (optional) Range of global indices [start, end) to generate (default: all codes, 0 .. n_ostrov_codes).
+	[5] (optional) Output format: tsv (default; the summary table, with a header) or bin (binary table, see save_binary).
 '''
 
+import itertools
 import sys
 import numpy as np
+import genetic_code as gc
 
 # a list of amino acids
 aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S',
@@ -22,48 +28,40 @@ blocks = {0: ["UUA", "UUG"],
 	1: ["UAG"],
 	2: ["AGU", "AGC"],
 	3: ["AGG", "AGA"]}
-
-
-
-# Generates all codons neighboring (i.e., one nucleotide substituion away) codons of codon c.
-def gen_neighbouring_codons(c):
-	res = []
-	for i in range(3):
-		for b in ['A', 'C', 'G', 'U']:
-			if c[i]!=b:
-				res.append(c[:i] + b + c[(i+1):])
-	return res
-
-# Checks if a given amino acid (aa) is encoded by any neighbors of a given set of codons (codons), excluding those neighbors in the forbidden_codons list.
-def isAmongNeighbours(codons, aa, forbidden_codons, code):
-	neighbours = []
-	for codon in codons:
-		neighbours += gen_neighbouring_codons(codon)
-	# remove repeated elements and codons from the codons array from neighbours
-	neighbours = set(neighbours) - set(codons) - set(forbidden_codons)
-	for n in neighbours:
-		if code[n]==aa:
-			return True
-	return False
-
-# Checks if there is at least one pair of neighboring codons (i.e., in Hamming distance 1) in lists codons1 and codons2.
-def areNeighbouring(codons1, codons2):
-	for c1 in codons1:
-		neighs = gen_neighbouring_codons(c1)
-		for c2 in codons2:
-			if c2 in neighs:
-				return True
-	return False
-
-# Generates all possible codons.
-def gen_all_codons():
-	res = []
-	bases = ['A', 'C', 'G', 'U']
-	for c1 in bases:
-		for c2 in bases:
-			for c3 in bases:
-				res = res+[c1+c2+c3]
-	return res
+# neighbouring codons of each codon
+neighbours_of = {c: gc.gen_neighbouring_codons(c) for c in gc.codons}
+# codons of all free blocks
+free_codons = [c for b in range(num_blocks) for c in blocks[b]]
+# the free blocks neighbouring each free block
+adjacent_blocks = [[c for c in range(num_blocks) if c!=b and any(n in blocks[c] for codon in blocks[b] for n in neighbours_of[codon])]
+	for b in range(num_blocks)]
+# amino acids as bits of 21-bit masks (special characters have no bit)
+aa_bit = {aa: 1 << x for x, aa in enumerate(aas)}
+
+# each reassigned block gets one of the 20 amino acids (including stop) it does not encode in the standard code
+n_choices = len(aas) - 1
+# number of codes with 0, 1, 2, 3 and 4 changes, and the global index of the first code of each group
+block_combinations = [list(itertools.combinations(range(num_blocks), n)) for n in range(num_blocks+1)]
+n_codes_changes = [len(block_combinations[n])*n_choices**n for n in range(num_blocks+1)]
+first_index = [sum(n_codes_changes[:n]) for n in range(num_blocks+1)]
+n_ostrov_codes = sum(n_codes_changes)
+
+# columns of the summary table
+header = ["Code", "Block1", "Block2", "Block3", "Block4", "X", "Z", "B", "J", "Robustness"]
+
+
+
+# Checks if a given amino acid (aa) is encoded by any neighbours of the free block b (outside of b itself), excluding the free
+# blocks in the excluded list. current ... the current meaning of each free block (a special character if not decided yet).
+# (A few bit operations per call: the mask of the neighbours outside of the free blocks is precomputed, and only the free
+# blocks adjacent to b, at most two, are checked. The case analysis of code_1 .. code_4 follows the fixed layout of the four
+# free blocks, so the checks are not vectorized across the codes; the whole table takes a few seconds.)
+def isAmongNeighbours(base, b, aa, excluded, current):
+	mask = base["outer_mask"][b]
+	for c in adjacent_blocks[b]:
+		if c not in excluded:
+			mask |= aa_bit.get(current[c], 0)
+	return mask & aa_bit[aa] != 0
 
 '''
 Computes the robustness of the code.
@@ -71,377 +69,395 @@ Robustness is defined as the proportion of single-nucleotide substitutions that
 properties of amino acids.
 '''
 def robustness(code, groups = None):
-	# number of distinct groups
-	if groups != None:
-		num_groups = len(np.unique(groups))
-	# if not specified, equivalent to number of amino acids
+	return gc.robustness(gc.code_to_array(code), groups)
+
+'''
+Precomputes the standard-code baseline used by robustness_delta and the code_* functions:
+	the number of conservative substitutions (neighbouring codon pairs, each counted once) in the standard code,
+	the change of this number for the substitutions leading out of the free blocks, when block b is reassigned to aa,
+	the pairs of neighbouring free blocks: (b, c, number of neighbouring codon pairs, whether they are conservative in the
+		standard code),
+	the amino acids each block can be reassigned to,
+	the meaning of each free block in the standard code,
+	for each free block, the 21-bit mask of the amino acids encoded by its neighbours outside of the free blocks.
+'''
+def ostrov_baseline(standard_code):
+	group_of = {aa: physchem_groups[x] for x, aa in enumerate(aas)}
+	conserved_standard = sum(group_of[standard_code[gc.codons[i]]]==group_of[standard_code[gc.codons[j]]] for i, j in gc.neighbour_pairs.T)
+	delta_out = {}
+	for b in range(num_blocks):
+		delta_out[b] = {}
+		outside = [(c, n) for c in blocks[b] for n in neighbours_of[c] if n not in free_codons]
+		for aa in aas:
+			delta_out[b][aa] = sum((group_of[aa]==group_of[standard_code[n]]) - (group_of[standard_code[c]]==group_of[standard_code[n]]) for c, n in outside)
+	pairs_between = []
+	for b in range(num_blocks):
+		for c in range(b+1, num_blocks):
+			n = sum(n in blocks[c] for codon in blocks[b] for n in neighbours_of[codon])
+			if n > 0:
+				pairs_between.append((b, c, n, group_of[standard_code[blocks[b][0]]]==group_of[standard_code[blocks[c][0]]]))
+	# the amino acids each block can be reassigned to
+	choices = [[aa for aa in aas if aa!=standard_code[blocks[b][0]]] for b in range(num_blocks)]
+	standard_blocks = [standard_code[blocks[b][0]] for b in range(num_blocks)]
+	outer_mask = []
+	for b in range(num_blocks):
+		mask = 0
+		for codon in blocks[b]:
+			for n in neighbours_of[codon]:
+				if n not in free_codons:
+					mask |= aa_bit[standard_code[n]]
+		outer_mask.append(mask)
+	return {"standard_code": standard_code, "group_of": group_of, "conserved_standard": conserved_standard,
+		"delta_out": delta_out, "pairs_between": pairs_between, "choices": choices,
+		"standard_blocks": standard_blocks, "outer_mask": outer_mask}
+
+'''
+Computes the robustness (physicochemical groups) of a code that differs from the standard code only in the free blocks,
+by correcting the number of conservative substitutions of the standard code only for the substitutions touching the
+reassigned codons (see ostrov_baseline). Gives exactly the same value as robustness(code, physchem_groups).
+parameters:
+	base ... the baseline (ostrov_baseline)
+	code ... the meaning of each free block
+	reassigned ... indices of the reassigned blocks
+'''
+def robustness_delta(base, code, reassigned):
+	group_of = base["group_of"]
+	conserved = base["conserved_standard"]
+	for b in reassigned:
+		conserved += base["delta_out"][b][code[b]]
+	for b, c, n, conserved_bc in base["pairs_between"]:
+		if b in reassigned or c in reassigned:
+			conserved += n*((group_of[code[b]]==group_of[code[c]]) - conserved_bc)
+	return 2*conserved / gc.neighbour_table.size
+
+
+# One change: block i reassigned to aa_i. Returns (reassignments of the blocks, meaning of the special characters, robustness).
+def code_1(base, i, aa_i):
+	code = base["standard_blocks"][:]
+
+	# reassignments of the codon blocks 
+	blocks_reassignments = ["-"]*num_blocks
+	blocks_reassignments[2] = "X"	# the split serine block
+	blocks_reassignments[i] = "Z"
+
+	# meaning of the special characters
+	special_chars = {"X": "S", "Z": aa_i, "B": "-", "J": "-"}
+
+	# if i==2, we don't have "X" (the split serine codon block is reassigned)
+	if i==2:
+		special_chars["X"] = "-"
+
+	# check whether we need the special character
+	# if i==3 and aa_i=="S", we can connect block 3 to block 2, both will encode "X"
+	if i==3 and aa_i=="S":
+		blocks_reassignments[i] = "X"
+		special_chars["Z"] = "-"
+	elif isAmongNeighbours(base, i, aa_i, [], code) or aa_i=="*":
+		blocks_reassignments[i] = aa_i
+		special_chars["Z"] = "-"
+
+	# compute the robustness of the code
+	code[i] = aa_i
+	rob = robustness_delta(base, code, [i])
+	return blocks_reassignments, special_chars, rob
+
+# Two changes: blocks i < j reassigned to aa_i, aa_j. Returns (reassignments of the blocks, meaning of the special characters, robustness).
+def code_2(base, i, j, aa_i, aa_j):
+	code = base["standard_blocks"][:]
+
+	# reassignments of the codon blocks
+	blocks_reassignments = ["-"]*num_blocks
+	blocks_reassignments[2] = "X"	# split serine
+	blocks_reassignments[i] = "Z"
+	blocks_reassignments[j] = "B"
+
+	# meaning of the special characters
+	special_chars = {"X": "S", "Z": aa_i, "B": aa_j, "J": "-"}
+
+	### block i
+	# we check whether the i-th block has a codon encoding aa_i among its neighbors
+	# we need to exclude the j-th block, which is also re-assigned 
+	#	(if i==0 and j==1, or i==2 and j==3, the i-th and j-th block are neighbors)
+	# if yes, then we do not need a new special character
+	if isAmongNeighbours(base, i, aa_i, [j], code) or aa_i=="*":
+		blocks_reassignments[i] = aa_i
+		special_chars["Z"] = "-"
+		code[i] = aa_i
+	else:
+		code[i] = "Z"
+	# if i==2, we don't have the serine split codon block
+	if i==2:
+		special_chars["X"] = "-"
+
+
+	### block j
+	# Special case: block 2 not reassigned (-> X) and block 3 reassigned to S -> assign to X
+	if i!=2 and j==3 and aa_j=="S":
+		blocks_reassignments[j] = "X"
+		special_chars["B"] = "-"
+	# again check whether we need the special character
+	elif isAmongNeighbours(base, j, aa_j, [], code) or aa_j=="*":
+		blocks_reassignments[j] = aa_j
+		special_chars["B"] = "-"
+		# check if we now need to reassign block i
+		if aa_i==aa_j and ((i==0 and j==1) or (i==2 and j==3)):
+			blocks_reassignments[i] = aa_i
+			special_chars["Z"] = "-"
+	else:
+		# it's still possible we can use "Z"
+		if aa_i==aa_j and ((i==0 and j==1) or (i==2 and j==3)):
+			blocks_reassignments[j] = "Z"
+			special_chars["B"] = "-"
+	# if j==2, we don't have the split serine codon block
+	if j==2:
+		special_chars["X"] = "-"
+
+	# compute the robustness of the code
+	code[i] = aa_i
+	code[j] = aa_j
+	rob = robustness_delta(base, code, [i, j])
+	return blocks_reassignments, special_chars, rob
+
+# Three changes: blocks i < j < k reassigned to aa_i, aa_j, aa_k. Returns (reassignments of the blocks, meaning of the special characters, robustness).
+def code_3(base, i, j, k, aa_i, aa_j, aa_k):
+	code = base["standard_blocks"][:]
+
+	# reassignments of the codon blocks
+	blocks_reassignments = ["-"]*num_blocks
+	blocks_reassignments[2] = "X"	# split serine
+	blocks_reassignments[i] = "Z"
+	blocks_reassignments[j] = "B"
+	blocks_reassignments[k] = "J"
+
+	# meaning of the special characters
+	special_chars = {"X": "S", "Z": aa_i, "B": aa_j, "J": aa_k}
+
+	#### the i-th block (block 0 or block 1)
+	# we check whether the i-th block has a codon encoding aa_i among its neighbors
+	# we need to exclude the j-th block, which is also re-assigned 
+	#	(if i==0 and j==1, the i-th and j-th block are neighbors)
+	# if yes, then we do not need a new special character
+	if isAmongNeighbours(base, i, aa_i, [j], code) or aa_i=="*":
+		blocks_reassignments[i] = aa_i
+		special_chars["Z"] = "-"
+		code[i] = aa_i
+	else:
+		code[i] = "Z"
+
+	#### the j-th block (block 1 or block 2)
+	if j==1:
+		# check whether we need the special character
+		if isAmongNeighbours(base, j, aa_j, [], code) or aa_j=="*":
+			blocks_reassignments[j] = aa_j
+			special_chars["B"] = "-"
+			# check if we now need to re-assign block 0 (block i)
+			#	(block j neighbors aa_j and aa_i==aa_j; blocks i (0) and j (1) are neighbors)
+			if aa_i==aa_j and special_chars["Z"]!="-":
+				special_chars["Z"] = "-"
+				blocks_reassignments[i] = aa_i
+		else:
+			# it is still possible that blocks i and j can be merged
+			#	(block i might be reassigned to Z, and thus not found by the isAmongNeighbours function)
+			# then we don't need "B", we can assign both i and j to "Z"
+			if aa_i==aa_j:
+				special_chars["B"] = "-"
+				blocks_reassignments[j] = blocks_reassignments[i]
+	else:
+		assert j==2
+		# we don't have the standard split serine codon block now
+		special_chars["X"] = "-"
+		# check if aa_j is among neighbors of block j
+		# exclude block k, because it neighbors block j and is also reassigned
+		if isAmongNeighbours(base, j, aa_j, [k], code) or aa_j=="*":
+			blocks_reassignments[j] = aa_j
+			special_chars["B"] = "-"
+			code[j] = aa_j
+		else:
+			code[j] = "B"
+
+	#### the k-th block
+	if k==2:
+		assert j==1
+		# we don't have the split serine codon block
+		special_chars["X"] = "-"
+		if isAmongNeighbours(base, k, aa_k, [], code) or aa_k=="*":
+			blocks_reassignments[k] = aa_k
+			special_chars["J"] = "-"
+	else:
+		assert k==3
+		if j==1 and aa_k=="S":
+			# the standard split serine codon block is still there and block k can be merged to it
+			#aa_k = "X"
+			blocks_reassignments[k] = "X"
+			special_chars["J"] = "-"
+		else:
+			# either j==1 and aa_k!="S", or j==2
+			if isAmongNeighbours(base, k, aa_k, [], code) or aa_k=="*":
+				blocks_reassignments[k] = aa_k
+				special_chars["J"] = "-"
+				# if j==2, we might be able to merge blocks j and k
+				if j==2 and aa_j==aa_k and special_chars["B"]!="-":
+					special_chars["B"] = "-"
+					blocks_reassignments[j] = aa_j
+			else:
+				# if j==2, blocks j and k can still be merged; then we don;t need "J" and block k is assigned to "B"
+				if j==2 and aa_j==aa_k:
+					special_chars["J"] = "-"
+					blocks_reassignments[k] = blocks_reassignments[j]
+
+	# compute the robustness of the code
+	code[i] = aa_i
+	code[j] = aa_j
+	code[k] = aa_k
+	rob = robustness_delta(base, code, [i, j, k])
+	return blocks_reassignments, special_chars, rob
+
+# Four changes: the blocks reassigned to aa_0 .. aa_3. Returns (reassignments of the blocks, meaning of the special characters, robustness).
+def code_4(base, aa_0, aa_1, aa_2, aa_3):
+	code = base["standard_blocks"][:]
+
+	blocks_reassignments = ["X", "Z", "B", "J"]
+
+	special_chars = {"X": "-", "Z": "-", "B": "-", "J": "-"}
+
+	# block 0
+	if isAmongNeighbours(base, 0, aa_0, [1], code) or aa_0=="*":
+		blocks_reassignments[0] = aa_0
+		code[0] = aa_0
+	else:
+		special_chars["X"] = aa_0
+		code[0] = "X"
+
+	# block 1
+	if isAmongNeighbours(base, 1, aa_1, [], code) or aa_1=="*":
+		blocks_reassignments[1] = aa_1
+		# check if we now need to re-assign block 0
+		if aa_0==aa_1 and special_chars["X"]!="-":
+			special_chars["X"] = "-"
+			blocks_reassignments[0] = aa_0
+	else:
+		special_chars["Z"] = aa_1
+		# check if blocks 0 and 1 can be merged
+		if aa_0==aa_1:
+			special_chars["Z"] = "-"
+			blocks_reassignments[1] = blocks_reassignments[0]
+
+	# block 2
+	if isAmongNeighbours(base, 2, aa_2, [3], code) or aa_2=="*":
+		blocks_reassignments[2] = aa_2
+		code[2] = aa_2
+	else:
+		special_chars["B"] = aa_2
+		code[2] = "B"
+
+	# block 3
+	if isAmongNeighbours(base, 3, aa_3, [], code) or aa_3=="*":
+		blocks_reassignments[3] = aa_3
+		# check if we now need to re-assign block 2
+		if aa_2==aa_3 and special_chars["B"]!="-":
+			special_chars["B"] = "-"
+			blocks_reassignments[2] = aa_2
+	else:
+		special_chars["J"] = aa_3
+		# check if blocks 2 and 3 can be merged
+		if aa_2==aa_3:
+			special_chars["J"] = "-"
+			blocks_reassignments[3] = blocks_reassignments[2]
+
+	# compute the robustness of the code
+	code[0] = aa_0
+	code[1] = aa_1
+	code[2] = aa_2
+	code[3] = aa_3
+	rob = robustness_delta(base, code, [0, 1, 2, 3])
+	return blocks_reassignments, special_chars, rob
+
+'''
+Returns the Ostrov code with the given global index, as a row of the summary table:
+	(name, reassignments of the four blocks, meanings of the special characters X, Z, B, J, robustness).
+The index is decoded directly (number of changes, reassigned blocks, amino acids as digits in base n_choices, the
+first block being the most significant), without enumerating the preceding codes.
+parameters:
+	base ... the baseline (ostrov_baseline)
+	index ... 0 .. n_ostrov_codes-1
+'''
+def ostrov_code(base, index):
+	if index < 0 or index >= n_ostrov_codes:
+		raise ValueError("Index of an Ostrov code must be in 0 .. " + str(n_ostrov_codes-1))
+	standard_code = base["standard_code"]
+	if index==0:
+		return ["standard", ["-", "-", "X", "-"], ["S", "-", "-", "-"], robustness(standard_code, physchem_groups)]
+	n = max(x for x in range(num_blocks+1) if first_index[x] <= index)
+	code_num = index - first_index[n]
+	combination, rest = divmod(code_num, n_choices**n)
+	reassigned = block_combinations[n][combination]
+	new_aas = [None]*n
+	for x in range(n-1, -1, -1):
+		rest, digit = divmod(rest, n_choices)
+		new_aas[x] = base["choices"][reassigned[x]][digit]
+	if n==1:
+		res = code_1(base, *reassigned, *new_aas)
+	elif n==2:
+		res = code_2(base, *reassigned, *new_aas)
+	elif n==3:
+		res = code_3(base, *reassigned, *new_aas)
+	else:
+		res = code_4(base, *new_aas)
+	blocks_reassignments, special_chars, rob = res
+	return [str(n) + "-" + str(code_num), blocks_reassignments,
+		[special_chars["X"], special_chars["Z"], special_chars["B"], special_chars["J"]], rob]
+
+# Generates the Ostrov codes with global indices start .. end-1 (rows as returned by ostrov_code).
+def ostrov_codes(base, start = 0, end = None):
+	if end is None:
+		end = n_ostrov_codes
+	for index in range(start, end):
+		yield ostrov_code(base, index)
+
+# Reads the standard code (the split serine codon block, encoded as X, is read as S).
+def read_standard_code(SGCFile):
+	standard_code = gc.read_code(SGCFile)
+	for codon, aa in standard_code.items():
+		if aa=="X":
+			standard_code[codon] = "S"
+	return standard_code
+
+'''
+Saves Ostrov codes in a binary table: a numpy structured array (.npy) with fields
+	index ... global index of the code (uint32)
+	blocks ... reassignments of the four blocks, one character each (S4; "-" not reassigned)
+	special ... meanings of the special characters X, Z, B, J (S4; "-" not used)
+	robustness ... robustness of the code (float64)
+parameters:
+	rows ... rows as returned by ostrov_codes
+	start ... global index of the first row
+	fileName ... name of the output file
+'''
+def save_binary(rows, start, fileName):
+	rows = list(rows)
+	table = np.zeros(len(rows), dtype=[("index", "<u4"), ("blocks", "S4"), ("special", "S4"), ("robustness", "<f8")])
+	table["index"] = np.arange(start, start+len(rows))
+	table["blocks"] = ["".join(row[1]) for row in rows]
+	table["special"] = ["".join(row[2]) for row in rows]
+	table["robustness"] = [row[3] for row in rows]
+	with open(fileName, 'wb') as f:
+		np.save(f, table)
+
+
+
+if __name__ == "__main__":
+	outFile = sys.argv[1]
+	SGCFile = sys.argv[2]
+	start = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+	end = int(sys.argv[4]) if len(sys.argv) > 4 else n_ostrov_codes
+	outFormat = sys.argv[5] if len(sys.argv) > 5 else "tsv"
+
+	base = ostrov_baseline(read_standard_code(SGCFile))
+
+	if outFormat=="bin":
+		save_binary(ostrov_codes(base, start, end), start, outFile)
 	else:
-		groups = range(21)
-		num_groups = 21
-	# all codons
-	codons = gen_all_codons()
-	# all substitutions
-	num_subs = 0
-	# conservative substitutions
-	num_con = 0
-
-	for i in range(len(codons)):
-		codon = codons[i]
-		aa = code[codon]
-		group = groups[aas.index(aa)]
-		neighbours = gen_neighbouring_codons(codon)
-		for n in neighbours:
-			num_subs += 1
-			if groups[aas.index(code[n])] == group:
-				num_con += 1
-
-	return num_con/num_subs
-
-
-################ MAIN
-# parameters
-outFile = sys.argv[1]
-SGCFile = sys.argv[2]
-
-# the standard code
-standard_code = {}
-with open(SGCFile, 'r') as f:
-	lines = f.read().split("\n")
-	# remove the header
-	lines.pop(0)
-	for l in lines:
-		if l!="":
-			splitLine = l.split("\t")
-			aa = splitLine[0]
-			if aa=="X":
-				aa="S"
-			standard_code[splitLine[1]] = aa
-
-
-
-with open(outFile, 'w') as f:
-	# write the header
-	f.write('\t'.join(["Code", "Block1", "Block2", "Block3", "Block4", "X", "Z", "B", "J", "Robustness"])+"\n")
-	
-	####### standard
-	rob = robustness(standard_code, physchem_groups)
-	f.write('\t'.join(["standard", "-", "-", "X", "-", "S", "-", "-", "-", str(rob)])+"\n")
-
-	####### 1 change
-	code_num = 0
-	# for all blocks
-	for i in range(num_blocks):
-		block_i = blocks[i]
-		# for all amino acids
-		for aa_i in aas:
-			# this is a change relative to the SGC
-			if standard_code[block_i[0]]!=aa_i:
-				code = standard_code.copy()
-
-				# reassignments of the codon blocks 
-				blocks_reassignments = ["-"]*4
-				blocks_reassignments[2] = "X"	# the split serine block
-				blocks_reassignments[i] = "Z"
-
-				# meaning of the special characters
-				special_chars = {"X": "S", "Z": aa_i, "B": "-", "J": "-"}
-
-				# if i==2, we don't have "X" (the split serine codon block is reassigned)
-				if i==2:
-					special_chars["X"] = "-"
-
-				# check whether we need the special character
-				# if i==3 and aa_i=="S", we can connect block 3 to block 2, both will encode "X"
-				if i==3 and aa_i=="S":
-					blocks_reassignments[i] = "X"
-					special_chars["Z"] = "-"
-				elif isAmongNeighbours(blocks[i], aa_i, [], code) or aa_i=="*":
-					blocks_reassignments[i] = aa_i
-					special_chars["Z"] = "-"
-
-				# compute the robustness of the code
-				for codon in blocks[i]:
-					code[codon] = aa_i
-				rob = robustness(code, physchem_groups)
-
-				f.write("\t".join(["1-"+str(code_num)] + blocks_reassignments + 
-					[special_chars["X"], special_chars["Z"], special_chars["B"], special_chars["J"], str(rob)]) + "\n")
-				code_num += 1
-
-
-	####### 2 changes
-	code_num = 0
-	for i in range(num_blocks):
-		for j in range(i+1, num_blocks):
-			block_i = blocks[i]
-			block_j = blocks[j]
-
-			for aa_i in aas:
-				for aa_j in aas:
-					# not SGC
-					if standard_code[block_i[0]]!=aa_i and standard_code[block_j[0]]!=aa_j:
-						code = standard_code.copy()
-
-						# reassignments of the codon blocks
-						blocks_reassignments = ["-"]*4
-						blocks_reassignments[2] = "X"	# split serine
-						blocks_reassignments[i] = "Z"
-						blocks_reassignments[j] = "B"
-
-						# meaning of the special characters
-						special_chars = {"X": "S", "Z": aa_i, "B": aa_j, "J": "-"}
-
-						### block i
-						# we check whether the i-th block has a codon encoding aa_i among its neighbors
-						# we need to exclude the j-th block, which is also re-assigned 
-						#	(if i==0 and j==1, or i==2 and j==3, the i-th and j-th block are neighbors)
-						# if yes, then we do not need a new special character
-						if isAmongNeighbours(blocks[i], aa_i, blocks[j], code) or aa_i=="*":
-							blocks_reassignments[i] = aa_i
-							special_chars["Z"] = "-"
-							for codon in blocks[i]:
-								code[codon] = aa_i
-						else:
-							for codon in blocks[i]:
-								code[codon] = "Z"
-						# if i==2, we don't have the serine split codon block
-						if i==2:
-							special_chars["X"] = "-"
-
-
-						### block j
-						# Special case: block 2 not reassigned (-> X) and block 3 reassigned to S -> assign to X
-						if i!=2 and j==3 and aa_j=="S":
-							blocks_reassignments[j] = "X"
-							special_chars["B"] = "-"
-						# again check whether we need the special character
-						elif isAmongNeighbours(blocks[j], aa_j, [], code) or aa_j=="*":
-							blocks_reassignments[j] = aa_j
-							special_chars["B"] = "-"
-							# check if we now need to reassign block i
-							if aa_i==aa_j and ((i==0 and j==1) or (i==2 and j==3)):
-								blocks_reassignments[i] = aa_i
-								special_chars["Z"] = "-"
-						else:
-							# it's still possible we can use "Z"
-							if aa_i==aa_j and ((i==0 and j==1) or (i==2 and j==3)):
-								blocks_reassignments[j] = "Z"
-								special_chars["B"] = "-"
-						# if j==2, we don't have the split serine codon block
-						if j==2:
-							special_chars["X"] = "-"
-
-						# compute the robustness of the code
-						for codon in blocks[i]:
-							code[codon] = aa_i
-						for codon in blocks[j]:
-							code[codon] = aa_j
-						rob = robustness(code, physchem_groups)
-
-						# write to output
-						f.write("\t".join(["2-"+str(code_num)] + blocks_reassignments + 
-							[special_chars["X"], special_chars["Z"], special_chars["B"], special_chars["J"], str(rob)]) + "\n")
-						code_num += 1
-
-
-
-
-	########## 3 changes
-	code_num = 0
-	for i in range(num_blocks):
-		for j in range(i+1, num_blocks):
-			for k in range(j+1, num_blocks):
-				block_i = blocks[i]
-				block_j = blocks[j]
-				block_k = blocks[k]
-
-				for aa_i in aas:
-					for aa_j in aas:
-						for aa_k in aas:
-							if standard_code[block_i[0]]!=aa_i and standard_code[block_j[0]]!=aa_j and standard_code[block_k[0]]!=aa_k:
-								code = standard_code.copy()
-
-								# reassignments of the codon blocks
-								blocks_reassignments = ["-"]*4
-								blocks_reassignments[2] = "X"	# split serine
-								blocks_reassignments[i] = "Z"
-								blocks_reassignments[j] = "B"
-								blocks_reassignments[k] = "J"
-
-								# meaning of the special characters
-								special_chars = {"X": "S", "Z": aa_i, "B": aa_j, "J": aa_k}
-
-								#### the i-th block (block 0 or block 1)
-								# we check whether the i-th block has a codon encoding aa_i among its neighbors
-								# we need to exclude the j-th block, which is also re-assigned 
-								#	(if i==0 and j==1, the i-th and j-th block are neighbors)
-								# if yes, then we do not need a new special character
-								if isAmongNeighbours(blocks[i], aa_i, blocks[j], code) or aa_i=="*":
-									blocks_reassignments[i] = aa_i
-									special_chars["Z"] = "-"
-									for codon in blocks[i]:
-										code[codon] = aa_i
-								else:
-									for codon in blocks[i]:
-										code[codon] = "Z"
-
-								#### the j-th block (block 1 or block 2)
-								if j==1:
-									# check whether we need the special character
-									if isAmongNeighbours(blocks[j], aa_j, [], code) or aa_j=="*":
-										blocks_reassignments[j] = aa_j
-										special_chars["B"] = "-"
-										# check if we now need to re-assign block 0 (block i)
-										#	(block j neighbors aa_j and aa_i==aa_j; blocks i (0) and j (1) are neighbors)
-										if aa_i==aa_j and special_chars["Z"]!="-":
-											special_chars["Z"] = "-"
-											blocks_reassignments[i] = aa_i
-									else:
-										# it is still possible that blocks i and j can be merged
-										#	(block i might be reassigned to Z, and thus not found by the isAmongNeighbours function)
-										# then we don't need "B", we can assign both i and j to "Z"
-										if aa_i==aa_j:
-											special_chars["B"] = "-"
-											blocks_reassignments[j] = blocks_reassignments[i]
-								else:
-									assert j==2
-									# we don't have the standard split serine codon block now
-									special_chars["X"] = "-"
-									# check if aa_j is among neighbors of block j
-									# exclude block k, because it neighbors block j and is also reassigned
-									if isAmongNeighbours(blocks[j], aa_j, blocks[k], code) or aa_j=="*":
-										blocks_reassignments[j] = aa_j
-										special_chars["B"] = "-"
-										for codon in blocks[j]:
-											code[codon] = aa_j
-									else:
-										for codon in blocks[j]:
-											code[codon] = "B"
-
-								#### the k-th block
-								if k==2:
-									assert j==1
-									# we don't have the split serine codon block
-									special_chars["X"] = "-"
-									if isAmongNeighbours(blocks[k], aa_k, [], code) or aa_k=="*":
-										blocks_reassignments[k] = aa_k
-										special_chars["J"] = "-"
-								else:
-									assert k==3
-									if j==1 and aa_k=="S":
-										# the standard split serine codon block is still there and block k can be merged to it
-										#aa_k = "X"
-										blocks_reassignments[k] = "X"
-										special_chars["J"] = "-"
-									else:
-										# either j==1 and aa_k!="S", or j==2
-										if isAmongNeighbours(blocks[k], aa_k, [], code) or aa_k=="*":
-											blocks_reassignments[k] = aa_k
-											special_chars["J"] = "-"
-											# if j==2, we might be able to merge blocks j and k
-											if j==2 and aa_j==aa_k and special_chars["B"]!="-":
-												special_chars["B"] = "-"
-												blocks_reassignments[j] = aa_j
-										else:
-											# if j==2, blocks j and k can still be merged; then we don;t need "J" and block k is assigned to "B"
-											if j==2 and aa_j==aa_k:
-												special_chars["J"] = "-"
-												blocks_reassignments[k] = blocks_reassignments[j]
-
-								# compute the robustness of the code
-								for codon in blocks[i]:
-									code[codon] = aa_i
-								for codon in blocks[j]:
-									code[codon] = aa_j
-								for codon in blocks[k]:
-									code[codon] = aa_k;
-								rob = robustness(code, physchem_groups)
-
-								# write to output
-								f.write("\t".join(["3-"+str(code_num)] + blocks_reassignments + 
-									[special_chars["X"], special_chars["Z"], special_chars["B"], special_chars["J"], str(rob)]) + "\n")
-								code_num += 1
-
-
-
-	########### 4 changes
-	code_num = 0
-
-	for aa_0 in aas:
-		for aa_1 in aas:
-			for aa_2 in aas:
-				for aa_3 in aas:
-					if (	standard_code[blocks[0][0]]!=aa_0 and 
-							standard_code[blocks[1][0]]!=aa_1 and 
-							standard_code[blocks[2][0]]!=aa_2 and
-							standard_code[blocks[3][0]]!=aa_3):
-
-						code = standard_code.copy()
-
-						blocks_reassignments = ["X", "Z", "B", "J"]
-
-						special_chars = {"X": "-", "Z": "-", "B": "-", "J": "-"}
-
-						# block 0
-						if isAmongNeighbours(blocks[0], aa_0, blocks[1], code) or aa_0=="*":
-							blocks_reassignments[0] = aa_0
-							for codon in blocks[0]:
-								code[codon] = aa_0
-						else:
-							special_chars["X"] = aa_0
-							for codon in blocks[0]:
-								code[codon] = "X"
-
-						# block 1
-						if isAmongNeighbours(blocks[1], aa_1, [], code) or aa_1=="*":
-							blocks_reassignments[1] = aa_1
-							# check if we now need to re-assign block 0
-							if aa_0==aa_1 and special_chars["X"]!="-":
-								special_chars["X"] = "-"
-								blocks_reassignments[0] = aa_0
-						else:
-							special_chars["Z"] = aa_1
-							# check if blocks 0 and 1 can be merged
-							if aa_0==aa_1:
-								special_chars["Z"] = "-"
-								blocks_reassignments[1] = blocks_reassignments[0]
-
-						# block 2
-						if isAmongNeighbours(blocks[2], aa_2, blocks[3], code) or aa_2=="*":
-							blocks_reassignments[2] = aa_2
-							for codon in blocks[2]:
-								code[codon] = aa_2
-						else:
-							special_chars["B"] = aa_2
-							for codon in blocks[2]:
-								code[codon] = "B"
-
-						# block 3
-						if isAmongNeighbours(blocks[3], aa_3, [], code) or aa_3=="*":
-							blocks_reassignments[3] = aa_3
-							# check if we now need to re-assign block 2
-							if aa_2==aa_3 and special_chars["B"]!="-":
-								special_chars["B"] = "-"
-								blocks_reassignments[2] = aa_2
-						else:
-							special_chars["J"] = aa_3
-							# check if blocks 2 and 3 can be merged
-							if aa_2==aa_3:
-								special_chars["J"] = "-"
-								blocks_reassignments[3] = blocks_reassignments[2]
-
-						# compute the robustness of the code
-						for codon in blocks[0]:
-							code[codon] = aa_0
-						for codon in blocks[1]:
-							code[codon] = aa_1
-						for codon in blocks[2]:
-							code[codon] = aa_2;
-						for codon in blocks[3]:
-							code[codon] = aa_3;
-						rob = robustness(code, physchem_groups)
-
-						# write to output
-						f.write("\t".join(["4-"+str(code_num)] + blocks_reassignments + 
-							[special_chars["X"], special_chars["Z"], special_chars["B"], special_chars["J"], str(rob)]) + "\n")
-						code_num += 1
+		with open(outFile, 'w') as f:
+			f.write('\t'.join(header)+"\n")
+			for name, blocks_reassignments, special_chars, rob in ostrov_codes(base, start, end):
+				f.write("\t".join([name] + blocks_reassignments + special_chars + [str(rob)]) + "\n")
@@ -2,215 +2,107 @@
 Generates a randomized genetic code (using amino acid permutaiton or random codon assignment), using a specified random seed,
 computes its robustness and saves it to a file.
 Parameters:
-	[1] randomization type (aa_permutation or random)
-	[2] seed 
+	[1] randomization type (aa_permutation, aa_permutation_restricted, aa_permutation_restricted_exhaustive or random)
+		(aa_permutation_restricted_exhaustive: the seed is the rank of the code in the enumeration of all restricted
+		amino acid permutation codes, 0 .. 522547199, see genetic_code.unrank_restricted)
+	[2] seed
 	[3] output file; the value of the code robustness will be saved here
 	[4] code output file; the genetic code will be saved here
+	[5] (optional) directory with the code library of the randomization type (see code_library.py); if given, the code
+		is read from the library instead of being generated (seeds beyond the size of the library are generated); ignored
+		for aa_permutation_restricted_exhaustive
+The codes of many seeds are obtained at once by seed_codes (used by sweep.py).
 '''
 
 import numpy as np
-import math
+import genetic_code as gc
+import code_library
 import sys
 
-# a list of amino acids
-aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S',
-	'T', 'V', 'W', 'Y', '*']
-
-# assignment of amino acids to physicochemical groups, according to Fig. 1A in Pines et al., mBio, 2017
-# 0 - basic, 1 - proline, 2 - aromatic, 3 - aliphatic, 4 - polar, 5 - glycine, 6 - acidic, 7 - stop
-physchem_groups = [3, 4, 6, 6, 2, 5, 0, 3, 0, 3, 4, 4, 1, 4, 0, 4, 4, 3, 2, 2, 7]
-
-
-# Generates all codons.
-def gen_all_codons():
-	res = []
-	bases = ['A', 'C', 'G', 'U']
-	for c1 in bases:
-		for c2 in bases:
-			for c3 in bases:
-				res = res+[c1+c2+c3]
-	return res
-
-# Generates all codons neighboring (i.e., one nucleotide substituion away) codons of codon c.
-def gen_neighbouring_codons(c):
-	res = []
-	for i in range(3):
-		for b in ['A', 'C', 'G', 'U']:
-			if c[i]!=b:
-				res.append(c[:i] + b + c[(i+1):])
-	return res
-
-
-
-''' 
-amino acid permutation: 
-Keep the blocks of codons, only randomly re-assign amino acids to them.
-Position of stop codons is fixed.
-parameters: 
-	standard_code ... dictionary providing the standard genetic code; keys = codons, values = amino acids
-	seed ... random seed (default 0)
-'''
-def rand_aa_permutation(standard_code, seed = 0):
-	np.random.seed(seed)
-	# dictionary to store the code
-	code = {}
-	# randomly shuffle the amino acids 
-	shuffled_aas = np.random.permutation(20)
-	# the last one is stop codon
-	shuffled_aas = np.append(shuffled_aas, [20])
-	# go over the standard code and always change amino acid i to shuffled_aas[i]
-	for codon, aa in standard_code.items():
-		code[codon] = aas[shuffled_aas[aas.index(aa)]]
-	return code
-
 
 '''
-Amino acid permutation, restricted to only those permutation that preserve the number of codons per aa.
-parameters: 
-	standard_code ... dictionary providing the standard genetic code; keys = codons, values = amino acids
-	seed ... random seed (default 0)
+Loads the code library of the randomization type (None for aa_permutation_restricted_exhaustive, whose codes are
+unranked directly: the library of aa_permutation_restricted passed by the sweeps does not apply).
+Returns the library (see code_library.load_library) and the generation mode of the codes (see genetic_code.generate_codes).
+parameters:
+	randType ... randomization type
+	libDir ... directory with the code library, or None
 '''
-def rand_aa_permutation_restricted(standard_code, seed = 0):
-	np.random.seed(seed)
-	# dictionary to store the code
-	code = {}
-	# aas, ordered by number of codons
-	aas = ["M", "W", "C", "D", "E", "F", "H", "K", "N", "Q", "Y", "I", "A", "G", "P", "T", "V", "L", "R", "S", "*"]
-	# randomly shuffle the amino acids, preserving the size
-	shuffled_aas_1 = np.random.permutation(2)
-	shuffled_aas_2 = [x+2 for x in np.random.permutation(9)]
-	shuffled_aas_3 = [11]
-	shuffled_aas_4 = [x+12 for x in np.random.permutation(5)]
-	shuffled_aas_6 = [x+17 for x in np.random.permutation(3)]
-	shuffled_aas = np.concatenate((shuffled_aas_1, shuffled_aas_2, shuffled_aas_3, shuffled_aas_4, shuffled_aas_6, [20]))
-	# the last one is stop codon
-	shuffled_aas = np.append(shuffled_aas, [20])
-	# go over the standard code and always change amino acid i to shuffled_aas[i]
-	for codon, aa in standard_code.items():
-		code[codon] = aas[shuffled_aas[aas.index(aa)]]
-	return code
-
-
-
-''' 
-Random codon assignemnt:
-Assign codons to amino acids independently and randomly, no requirements on degeneracy.
-The only requirement is that all 20 amino acids have at least one codon assigned to them.
-parameters: 
-	standard_code ... dictionary with the SGC 
-	seed ... random seed (default 0)
-'''
-def rand_randomAssignment(standard_code, seed = 0):
-	np.random.seed(seed)
-	# dictionary to store the code
-	code = {}
-	# list of amino acids
-	aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
-	# fix stop codons
-	code['UAA'] = "*"
-	code['UAG'] = "*"
-	code['UGA'] = "*"
-	# shuffle the codons
-	# stop codons are fixed - don't include them in the permutation
-	codons = list(standard_code.keys())
-	perm = np.random.permutation(64)
-	codons = [codons[x] for x in perm if codons[x] not in ['UAA', 'UAG', 'UGA']]
-	# the first 20 codons are assigned each to the corresponding amino acid
-	# to fulfill the requirement that each amino acid has at least one codon
-	for i in range(20):
-		code[codons[i]] = aas[i]
-	# the remaining codons are assigned to amino acids randomly
-	for i in range(41):
-		codon = codons[20+i]
-		aa = aas[np.random.randint(0,20)]
-		code[codon] = aa
-
-	return code
-
+def load_seed_library(randType, libDir):
+	if randType=="aa_permutation_restricted_exhaustive":
+		return None, "enumerate"
+	if libDir is None:
+		return None, "legacy"
+	lib = code_library.load_library(libDir)
+	if lib["header"]["family"]!=randType:
+		raise ValueError("The code library " + libDir + " does not contain " + randType + " codes")
+	return lib, lib["header"].get("mode", "legacy")
 
 '''
-Computes the robustness of the code.
-Robustness is defined as the proportion of single-nucleotide substitutions that do not change the physicochemical 
-properties of amino acids.
+Returns the codes with the given seeds, as an (N, 64) array, their robustness and the amino acids occupying the split
+codon block (UCU). The codes are read from the library if it contains the seed, otherwise they are generated (seed 0 is
+the standard code; seeds beyond the library in the generation mode of the library).
+parameters:
+	randType ... randomization type
+	seeds ... list of seeds
+	standard_code ... dictionary with the standard code
+	lib, mode ... the code library (or None) and the generation mode (see load_seed_library)
 '''
-def robustness(code, groups = None):
-	# number of distinct groups
-	if groups != None:
-		num_groups = len(np.unique(groups))
-	# if not specified, equivalent to number of amino acids
+def seed_codes(randType, seeds, standard_code, lib = None, mode = "legacy"):
+	seeds = np.asarray(seeds, dtype=np.int64)
+	codes = np.zeros((len(seeds), 64), dtype=np.uint8)
+	rob = np.zeros(len(seeds))
+	from_lib = np.zeros(len(seeds), dtype=bool)
+	if lib is not None:
+		from_lib = seeds < len(lib["codes"])
+		codes[from_lib] = lib["codes"][seeds[from_lib]]
+		rob[from_lib] = lib["robustness"][seeds[from_lib]]
+
+	# generate the other codes
+	generated = np.flatnonzero(~from_lib)
+	if len(generated) > 0:
+		if randType=="aa_permutation_restricted_exhaustive":
+			codes[generated] = gc.unrank_restricted(seeds[generated], standard_code)
+		else:
+			codes[generated] = gc.generate_codes(randType, seeds[generated], standard_code, mode)
+		codes[generated[seeds[generated]==0]] = gc.code_to_array(standard_code)
+		# compute robustnes of the codes
+		rob[generated] = gc.robustness(codes[generated], gc.physchem_groups)
+
+	# for aa permutation: the amino acid occupying the split codon block
+	X = [gc.aas[x] for x in codes[:, gc.codon_index["UCU"]]]
+	return codes, rob, X
+
+# The statistics of a code written before the results of the engine (seed, split-block amino acid for the permutations,
+# robustness), tab-separated and followed by a tab.
+def code_stats(randType, seed, X, rob):
+	if randType in ["aa_permutation", "aa_permutation_restricted", "aa_permutation_restricted_exhaustive"]:
+		return '\t'.join([str(x) for x in [seed, X, float(rob)]]) + "\t"
+	return '\t'.join([str(x) for x in [seed, float(rob)]]) + "\t"
+
+
+
+if __name__ == "__main__":
+	#####################
+	# parameters
+	randType = sys.argv[1]
+	seed = int(sys.argv[2])
+	outFile = sys.argv[3]
+	codeFile = sys.argv[4]
+	libDir = sys.argv[5] if len(sys.argv) > 5 else None
+
+	# the standard code
+	standard_code = gc.read_code("input/code_standard.tsv")
+
+	lib, mode = load_seed_library(randType, libDir)
+	codes, rob, X = seed_codes(randType, [seed], standard_code, lib, mode)
+
+	# save the code to file (legacy codes: with the rows in the order of the legacy generate_gen_code.py)
+	if mode=="legacy":
+		gc.save_code(codes[0], codeFile, gc.legacy_codon_order(randType, seed, standard_code))
 	else:
-		groups = range(21)
-		num_groups = 21
-	# all codons
-	codons = gen_all_codons()
-	# all substitutions
-	num_subs = 0
-	# conservative substitutions
-	num_con = 0
-
-	for i in range(len(codons)):
-		codon = codons[i]
-		aa = code[codon]
-		group = groups[aas.index(aa)]
-		neighbours = gen_neighbouring_codons(codon)
-		for n in neighbours:
-			num_subs += 1
-			if groups[aas.index(code[n])] == group:
-				num_con += 1
-
-	return num_con/num_subs
-
-
-
-#####################
-# parameters
-randType = sys.argv[1]
-seed = int(sys.argv[2])
-outFile = sys.argv[3]
-of = open(outFile, 'a')
-codeFile = sys.argv[4]
-
-
-# the standard code
-standard_code={}
-file = "input/code_standard.tsv"
-with open(file, 'r') as f:
-	lines = f.read().split("\n")
-	# remove the header
-	lines.pop(0)
-	for l in lines:
-		if l!="":
-			splitLine = l.split("\t")
-			standard_code[splitLine[1]] = splitLine[0]
-
-
-# generate the randomized code
-if seed==0:
-	code = standard_code
-elif randType=="aa_permutation":
-	code = rand_aa_permutation(standard_code, seed)
-elif randType=="aa_permutation_restricted":
-	code = rand_aa_permutation_restricted(standard_code, seed)
-elif randType=="random":
-	code = rand_randomAssignment(standard_code, seed)
-
-# compute robustnes of the code
-rob = robustness(code, physchem_groups)	
-# for aa permutation: the amino acid occupying the split codon block
-if randType=="aa_permutation" or randType=="aa_permutation_restricted":
-	X = code["UCU"]		
-
-# save the code to file
-with open(codeFile, 'w') as f:
-	f.write("Aa\tCodon\n")
-	for codon,aa in code.items():
-		f.write(aa+"\t"+codon+"\n")
-
-# write the statistics to outputFile
-if randType=="aa_permutation" or randType=="aa_permutation_restricted":
-	of.write('\t'.join([str(x) for x in [seed, X, rob]]) + "\t")
-else:
-	of.write('\t'.join([str(x) for x in [seed, rob]]) + "\t")
-
+		gc.save_code(codes[0], codeFile, list(standard_code.keys()))
 
-of.close()
\ No newline at end of file
+	# write the statistics to outputFile
+	with open(outFile, 'a') as of:
+		of.write(code_stats(randType, seed, X[0], rob[0]))
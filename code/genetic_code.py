@@ -0,0 +1,680 @@
+'''
+Batch generation of randomized genetic codes.
+Codes are represented as integer arrays: a code is a vector of 64 amino acid indices (into the list aas below),
+one per codon, with codons ordered as in gen_all_codons() (AAA, AAC, ..., UUU).
+A batch of N codes is an (N, 64) uint8 array.
+
+Example:
+	import genetic_code as gc
+	standard_code = gc.read_code("input/code_standard.tsv")
+	codes = gc.generate_codes("aa_permutation", range(100000), standard_code)
+'''
+
+import itertools
+import numpy as np
+
+# a list of amino acids
+aas = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S',
+	'T', 'V', 'W', 'Y', '*']
+# index of the stop "amino acid"
+STOP = 20
+
+# assignment of amino acids to physicochemical groups, according to Fig. 1A in Pines et al., mBio, 2017
+# 0 - basic, 1 - proline, 2 - aromatic, 3 - aliphatic, 4 - polar, 5 - glycine, 6 - acidic, 7 - stop
+physchem_groups = [3, 4, 6, 6, 2, 5, 0, 3, 0, 3, 4, 4, 1, 4, 0, 4, 4, 3, 2, 2, 7]
+
+# aas, ordered by number of codons (used by the restricted amino acid permutation)
+aas_by_size = ["M", "W", "C", "D", "E", "F", "H", "K", "N", "Q", "Y", "I", "A", "G", "P", "T", "V", "L", "R", "S", "*"]
+# classes of amino acids with 1, 2, 4 and 6 codons, as (offset, size) in aas_by_size (isoleucine, the only amino acid
+# with 3 codons, and stop are fixed)
+restricted_classes = [(0, 2), (2, 9), (12, 5), (17, 3)]
+# number of restricted amino acid permutation codes: 2!*9!*5!*3!
+n_restricted_codes = 2*362880*120*6
+
+
+# Generates all codons.
+def gen_all_codons():
+	res = []
+	bases = ['A', 'C', 'G', 'U']
+	for c1 in bases:
+		for c2 in bases:
+			for c3 in bases:
+				res = res+[c1+c2+c3]
+	return res
+
+# Generates all codons neighboring (i.e., one nucleotide substituion away) codons of codon c.
+def gen_neighbouring_codons(c):
+	res = []
+	for i in range(3):
+		for b in ['A', 'C', 'G', 'U']:
+			if c[i]!=b:
+				res.append(c[:i] + b + c[(i+1):])
+	return res
+
+# all codons; position in this list = codon index in the code arrays
+codons = gen_all_codons()
+codon_index = {c: i for i, c in enumerate(codons)}
+# neighbour table: row i contains the indices of the 9 codons neighbouring codon i
+neighbour_table = np.array([[codon_index[n] for n in gen_neighbouring_codons(c)] for c in codons], dtype=np.intp)
+# each pair of neighbouring codons once (288 pairs); both directions of a substitution are equally conservative
+neighbour_pairs = np.array([(i, j) for i in range(64) for j in neighbour_table[i] if i < j], dtype=np.intp).T
+
+
+'''
+Reads the genetic code from a file.
+Format of the file:
+	First line: header
+	Each other line: Amino acid \t Codon
+Returns a dictionary (keys = codons, values = amino acids), in the order of the file.
+'''
+def read_code(fileName):
+	code = {}
+	with open(fileName, 'r') as f:
+		lines = f.read().split("\n")
+		# remove the header
+		lines.pop(0)
+		for l in lines:
+			if l!="":
+				splitLine = l.split("\t")
+				code[splitLine[1]] = splitLine[0]
+	return code
+
+# Converts a genetic code given as a dictionary (codon -> amino acid) to an array of 64 amino acid indices.
+def code_to_array(code):
+	res = np.zeros(64, dtype=np.uint8)
+	for codon, aa in code.items():
+		res[codon_index[codon]] = aas.index(aa)
+	return res
+
+# Converts an array of 64 amino acid indices to a genetic code dictionary (codon -> amino acid).
+def array_to_code(code_arr):
+	return {codons[i]: aas[code_arr[i]] for i in range(64)}
+
+'''
+Saves a genetic code (array of 64 amino acid indices) to a file, in the format read by the landscape engines.
+parameters:
+	code_arr ... the code
+	fileName ... name of the output file
+	codon_order ... order in which the codons are written (default: gen_all_codons() order)
+'''
+def save_code(code_arr, fileName, codon_order = None):
+	if codon_order is None:
+		codon_order = codons
+	with open(fileName, 'w') as f:
+		f.write("Aa\tCodon\n")
+		for codon in codon_order:
+			f.write(aas[code_arr[codon_index[codon]]]+"\t"+codon+"\n")
+
+'''
+The order of the codons in the code files of the legacy generate_gen_code.py: the order of the standard code file, and
+for random codon assignment the stop codons followed by the shuffled codons (the same shuffle as generate_codes, legacy mode).
+parameters:
+	randType ... randomization type
+	seed ... random seed
+	standard_code ... dictionary with the standard code, in the order of the standard code file
+'''
+def legacy_codon_order(randType, seed, standard_code):
+	order = list(standard_code.keys())
+	if randType!="random" or seed==0:
+		return order
+	stops = ['UAA', 'UAG', 'UGA']
+	np.random.seed(seed)
+	perm = np.random.permutation(64)
+	return stops + [order[x] for x in perm if order[x] not in stops]
+
+
+########### sequences and substitutions
+# Nucleotide sequences are integer arrays (A=0, C=1, G=2, U=3), one row per sequence; a sequence of L codons has 3L
+# nucleotides, codon k being formed by the nucleotides 3k, 3k+1, 3k+2 (its index is 16*n1 + 4*n2 + n3, as in codons).
+
+bases = ['A', 'C', 'G', 'U']
+aa_index = {aa: i for i, aa in enumerate(aas)}
+
+# Converts nucleotide sequences (strings) to an (M, 3L) uint8 array.
+def encode_seqs(seqs):
+	lookup = np.zeros(256, dtype=np.uint8)
+	for i, b in enumerate(bases):
+		lookup[ord(b)] = i
+	return lookup[np.frombuffer("".join(seqs).encode(), dtype=np.uint8)].reshape(len(seqs), -1)
+
+'''
+Translates nucleotide sequences using a genetic code.
+parameters:
+	nuc ... (M, 3L) array of nucleotide sequences (or a single sequence, shape (3L,))
+	code_arr ... the code (array of 64 amino acid indices)
+Returns an (M, L) array of amino acid indices.
+'''
+def translate(nuc, code_arr):
+	nuc = np.asarray(nuc)
+	return np.asarray(code_arr)[16*nuc[..., 0::3].astype(np.intp) + 4*nuc[..., 1::3] + nuc[..., 2::3]]
+
+# Converts arrays of amino acid indices (one row per sequence) to amino acid sequences (strings).
+def aa_strings(aa_seqs):
+	aa_seqs = np.atleast_2d(aa_seqs)
+	letters = np.array([ord(aa) for aa in aas], dtype=np.uint8)
+	return [s.decode() for s in letters[aa_seqs].view("S" + str(aa_seqs.shape[1])).reshape(-1)]
+
+'''
+Single-nucleotide substitutions of a batch of sequences: nucleotide pos[i] of sequence i is replaced by base[i].
+Returns a new array, nuc is not modified.
+'''
+def mutate(nuc, pos, base):
+	res = np.array(nuc, copy=True)
+	res[np.arange(res.shape[0]), pos] = base
+	return res
+
+'''
+Returns the table of unordered amino acid pairs: (aa_pairs, pair_table), aa_pairs being the pairs as strings in the order
+used by the analyses (pairs_aas[i1]+pairs_aas[i2] for i1 < i2), and pair_table a (21, 21) array with the index of the pair
+of two amino acids (given as indices into aas) in aa_pairs, or -1 (same amino acid, or an amino acid not in pairs_aas).
+'''
+def pair_table(pairs_aas):
+	aa_pairs = [pairs_aas[i1]+pairs_aas[i2] for i1 in range(len(pairs_aas)) for i2 in range((i1+1), len(pairs_aas))]
+	table = np.full((21, 21), -1, dtype=np.intp)
+	for i, pair in enumerate(aa_pairs):
+		table[aa_index[pair[0]], aa_index[pair[1]]] = i
+		table[aa_index[pair[1]], aa_index[pair[0]]] = i
+	return aa_pairs, table
+
+'''
+Computes the number of single-nucleotide substitutions leading between amino acid pairs under each code (substitutions
+from and to stop codons, and synonymous substitutions, are not counted; each substitution counts in both directions).
+parameters:
+	codes ... (N, 64) array of codes (or a single code)
+	pairs_aas ... amino acids, in the order defining the order of the pairs (see pair_table)
+	chunk_size ... number of codes processed at once
+Returns an (N, number of pairs) array (a vector, if a single code was given).
+'''
+def number_of_mutations(codes, pairs_aas, chunk_size = 1 << 14):
+	codes = np.asarray(codes)
+	single = codes.ndim == 1
+	codes = np.atleast_2d(codes)
+	aa_pairs, table = pair_table(pairs_aas)
+	n_pairs = len(aa_pairs)
+	res = np.zeros((codes.shape[0], n_pairs), dtype=np.int64)
+	for start in range(0, codes.shape[0], chunk_size):
+		chunk = codes[start:(start+chunk_size)]
+		pairs = table[chunk[:, neighbour_pairs[0]], chunk[:, neighbour_pairs[1]]]
+		rows = np.broadcast_to(np.arange(chunk.shape[0])[:, None], pairs.shape)
+		valid = pairs >= 0
+		res[start:(start+chunk.shape[0])] = 2*np.bincount(rows[valid]*n_pairs + pairs[valid],
+			minlength=chunk.shape[0]*n_pairs).reshape(chunk.shape[0], n_pairs)
+	if single:
+		return res[0]
+	return res
+
+'''
+Computes the absolute differences of a property between all pairs of amino acids, in the order of the pairs of pair_table.
+parameters:
+	v ... vector of values of the property (or an (M, n) array, one property per row)
+'''
+def compute_diff_vector(v):
+	v = np.asarray(v, dtype=float)
+	i1, i2 = np.triu_indices(v.shape[-1], 1)
+	return np.abs(v[..., i1] - v[..., i2])
+
+# Pearson correlations between each column of a (N, k) and each column of b (N, m), as a (k, m) array.
+def corr_columns(a, b):
+	a = np.asarray(a, dtype=float)
+	b = np.asarray(b, dtype=float)
+	a = a - a.mean(axis=0)
+	b = b - b.mean(axis=0)
+	return np.matmul(a.T, b) / np.outer(np.sqrt(np.sum(a*a, axis=0)), np.sqrt(np.sum(b*b, axis=0)))
+
+
+########### legacy shuffles, one per seed
+# Each function draws from the global numpy random state (np.random), which has to be seeded beforehand.
+
+# amino acid permutation: new index of each amino acid (stop codons fixed)
+def _legacy_aa_permutation():
+	return np.append(np.random.permutation(20), [STOP])
+
+# restricted amino acid permutation: permutation within the classes of amino acids with the same number of codons;
+# indices refer to aas_by_size
+def _legacy_aa_permutation_restricted():
+	shuffled_aas_1 = np.random.permutation(2)
+	shuffled_aas_2 = [x+2 for x in np.random.permutation(9)]
+	shuffled_aas_3 = [11]
+	shuffled_aas_4 = [x+12 for x in np.random.permutation(5)]
+	shuffled_aas_6 = [x+17 for x in np.random.permutation(3)]
+	return np.concatenate((shuffled_aas_1, shuffled_aas_2, shuffled_aas_3, shuffled_aas_4, shuffled_aas_6, [STOP]))
+
+# random codon assignment: permutation of all 64 codons (in the order of the standard code file), and the amino acids
+# assigned to the 41 codons that follow the first 20 non-stop codons
+def _legacy_random():
+	perm = np.random.permutation(64)
+	extra = [np.random.randint(0,20) for i in range(41)]
+	return perm, extra
+
+
+########### fast shuffles, one block of seeds at a time
+# Seeds are grouped into blocks of FAST_BLOCK consecutive seeds. Each block has its own independent np.random.Generator
+# stream and all its shuffles are drawn at once, so the code of a seed does not depend on which other seeds are generated.
+FAST_BLOCK = 1024
+# identifiers of the randomization types, so that each type has its own streams
+rand_type_ids = {"aa_permutation": 0, "aa_permutation_restricted": 1, "random": 2}
+
+# Random permutations of n elements, one per row.
+def _permutations(rng, num, n):
+	return np.argsort(rng.random((num, n)), axis=1)
+
+'''
+Draws the shuffles of all seeds in a block.
+Returns an array with one row per seed: the relabelling of amino acids (aa permutations, indices refer to aas),
+or the permutation of the 61 non-stop codons followed by the amino acids of the last 41 of them (random assignment).
+'''
+def _fast_block(randType, block):
+	rng = np.random.default_rng([rand_type_ids[randType], block])
+	if randType == "aa_permutation":
+		return np.hstack((_permutations(rng, FAST_BLOCK, 20), np.full((FAST_BLOCK, 1), STOP)))
+	elif randType == "aa_permutation_restricted":
+		# permutation within each class, indices refer to aas_by_size
+		shuffled = np.hstack((_permutations(rng, FAST_BLOCK, 2), _permutations(rng, FAST_BLOCK, 9)+2,
+			np.full((FAST_BLOCK, 1), 11), _permutations(rng, FAST_BLOCK, 5)+12, _permutations(rng, FAST_BLOCK, 3)+17,
+			np.full((FAST_BLOCK, 1), STOP)))
+		# convert to indices to aas
+		to_size = np.array([aas_by_size.index(aa) for aa in aas])
+		from_size = np.array([aas.index(aa) for aa in aas_by_size])
+		return from_size[shuffled[:, to_size]]
+	else:
+		return np.hstack((_permutations(rng, FAST_BLOCK, 61), rng.integers(0, 20, size=(FAST_BLOCK, 41))))
+
+# Shuffles of the given seeds, generated block by block.
+def _fast_shuffles(randType, seeds):
+	seeds = np.asarray(seeds, dtype=np.int64)
+	res = None
+	for block in np.unique(seeds // FAST_BLOCK):
+		in_block = seeds // FAST_BLOCK == block
+		shuffles = _fast_block(randType, int(block))
+		if res is None:
+			res = np.zeros((len(seeds), shuffles.shape[1]), dtype=np.int64)
+		res[in_block] = shuffles[seeds[in_block] % FAST_BLOCK]
+	return res
+
+
+'''
+Generates a batch of randomized genetic codes.
+parameters:
+	randType ... randomization type: aa_permutation, aa_permutation_restricted or random
+	seeds ... random seeds (non-negative integers); seed 0 is always the standard genetic code
+	standard_code ... dictionary providing the standard genetic code (as returned by read_code)
+	mode ... "legacy": reseeds the global numpy random state with each seed, so that the codes are identical to those of
+				rand_aa_permutation / rand_aa_permutation_restricted / rand_randomAssignment in generate_gen_code.py
+			 "fast": draws the codes from independent np.random.Generator streams, one per block of FAST_BLOCK seeds
+				(the codes differ from the legacy ones)
+			 "enumerate": (aa_permutation_restricted only) the seeds are ranks, code i is unrank_restricted(seeds[i]);
+				seeds 0 .. n_restricted_codes-1 enumerate every code exactly once
+Returns an (N, 64) uint8 array, row i is the code of seeds[i].
+'''
+def generate_codes(randType, seeds, standard_code, mode = "legacy"):
+	if randType not in rand_type_ids:
+		raise ValueError("Unknown randomization type: " + randType)
+	if mode not in ["legacy", "fast", "enumerate"]:
+		raise ValueError("Unknown mode: " + mode)
+	if mode=="enumerate":
+		if randType!="aa_permutation_restricted":
+			raise ValueError("Only aa_permutation_restricted codes can be enumerated")
+		return unrank_restricted(seeds, standard_code)
+	seeds = list(seeds)
+	standard = code_to_array(standard_code)
+	codes = np.tile(standard, (len(seeds), 1))
+	if len(seeds)==0:
+		return codes
+	if mode=="fast":
+		shuffles = _fast_shuffles(randType, seeds)
+
+	if randType == "random":
+		# codons in the order of the standard code file; stop codons are fixed
+		codon_order = np.array([codon_index[c] for c in standard_code.keys()])
+		is_stop = np.isin(codon_order, [codon_index[c] for c in ['UAA', 'UAG', 'UGA']])
+		non_stop = codon_order[~is_stop]
+		# each amino acid is assigned to one of the first 20 codons of the permutation
+		first_aas = np.arange(20, dtype=np.uint8)
+		for i, seed in enumerate(seeds):
+			if seed==0:
+				continue
+			if mode=="legacy":
+				np.random.seed(seed)
+				perm, extra = _legacy_random()
+				shuffled = codon_order[perm[~is_stop[perm]]]
+			else:
+				shuffled = non_stop[shuffles[i, :61]]
+				extra = shuffles[i, 61:]
+			codes[i, shuffled[:20]] = first_aas
+			codes[i, shuffled[20:]] = extra
+		return codes
+
+	# aa permutations: relabelling of the amino acids for each seed, applied to all codes at once
+	if mode=="legacy":
+		relabel = np.tile(np.arange(21), (len(seeds), 1))
+		to_size = np.array([aas_by_size.index(aa) for aa in aas])
+		from_size = np.array([aas.index(aa) for aa in aas_by_size])
+		for i, seed in enumerate(seeds):
+			if seed==0:
+				continue
+			np.random.seed(seed)
+			if randType == "aa_permutation":
+				relabel[i,:] = _legacy_aa_permutation()
+			else:
+				relabel[i,:] = from_size[_legacy_aa_permutation_restricted()[to_size]]
+	else:
+		relabel = shuffles
+		relabel[np.array(seeds)==0] = np.arange(21)
+	return np.take_along_axis(relabel, codes.astype(np.intp), axis=1).astype(np.uint8)
+
+
+'''
+Computes the robustness of a batch of codes.
+Robustness is defined as the proportion of single-nucleotide substitutions that do not change the physicochemical
+properties of amino acids.
+parameters:
+	codes ... array of codes, shape (N, 64) (or a single code, shape (64,))
+	groups ... group of each amino acid (list of 21 integers, indexed as aas), e.g. physchem_groups;
+		if not specified, every amino acid is its own group
+	chunk_size ... number of codes processed at once (limits the memory used by the temporary arrays)
+Returns an array with the robustness of each code (a float, if a single code was given).
+'''
+def robustness(codes, groups = None, chunk_size = 1 << 14):
+	codes = np.asarray(codes)
+	if groups is None:
+		groups = range(21)
+	groups = np.asarray(groups, dtype=np.uint8)
+	single = codes.ndim == 1
+	codes = np.atleast_2d(codes)
+	num_con = np.zeros(codes.shape[0], dtype=np.int64)
+	for start in range(0, codes.shape[0], chunk_size):
+		# group of the amino acid encoded by each codon; one row per codon, so that gathering the codon pairs reads whole rows
+		g = np.ascontiguousarray(groups[codes[start:(start+chunk_size)]].T)
+		num_con[start:(start+chunk_size)] = 2*np.count_nonzero(g[neighbour_pairs[0]] == g[neighbour_pairs[1]], axis=0)
+	res = num_con / neighbour_table.size
+	if single:
+		return float(res[0])
+	return res
+
+
+'''
+Computes a panel of robustness measures of a batch of codes in one pass.
+Each metric is either
+	a grouping of the amino acids (21 integers, indexed as aas, e.g. physchem_groups): the value is the robustness, i.e. the
+		proportion of single-nucleotide substitutions that do not change the group (as computed by robustness()), or
+	a (21, 21) cost matrix (indexed as aas): the value is the total cost of all single-nucleotide substitutions, the
+		substitution of amino acid a by b costing cost[a, b] (see pair_cost_matrix).
+The codes are first reduced to the counts of neighbouring codon pairs encoding each pair of amino acids (at most 288
+non-zero counts per code), and all metrics are then evaluated on the counts at once.
+parameters:
+	codes ... (N, 64) array of codes (or a single code)
+	metrics ... list of groupings and / or cost matrices
+	chunk_size ... number of codes processed at once
+Returns an (N, number of metrics) array (a vector, if a single code was given).
+'''
+def robustness_panel(codes, metrics, chunk_size = 1 << 12):
+	codes = np.asarray(codes)
+	single = codes.ndim == 1
+	codes = np.atleast_2d(codes)
+	# weight of each (unordered) pair of amino acids of neighbouring codons, for each metric
+	weights = np.zeros((21*21, len(metrics)))
+	for m, metric in enumerate(metrics):
+		metric = np.asarray(metric)
+		if metric.ndim == 1:
+			# both directions of a substitution are equally conservative
+			weights[:, m] = 2*(metric[:, None] == metric[None, :]).reshape(-1) / neighbour_table.size
+		else:
+			weights[:, m] = (metric + metric.T).reshape(-1)
+	res = np.zeros((codes.shape[0], len(metrics)))
+	for start in range(0, codes.shape[0], chunk_size):
+		chunk = codes[start:(start+chunk_size)].astype(np.intp)
+		pairs = 21*chunk[:, neighbour_pairs[0]] + chunk[:, neighbour_pairs[1]]
+		counts = np.bincount((np.arange(chunk.shape[0])[:, None]*(21*21) + pairs).reshape(-1),
+			minlength=chunk.shape[0]*21*21).reshape(chunk.shape[0], 21*21)
+		res[start:(start+chunk.shape[0])] = np.matmul(counts, weights)
+	if single:
+		return res[0]
+	return res
+
+'''
+Converts a vector of costs of the unordered amino acid pairs (in the order of pair_table(pairs_aas), e.g. the output of
+compute_diff_vector) to a symmetric (21, 21) cost matrix for robustness_panel. Substitutions involving amino acids not in
+pairs_aas (stop) cost 0, as in number_of_mutations.
+'''
+def pair_cost_matrix(pair_costs, pairs_aas):
+	_, table = pair_table(pairs_aas)
+	res = np.zeros((21, 21))
+	res[table >= 0] = np.asarray(pair_costs, dtype=float)[table[table >= 0]]
+	return res
+
+
+########### enumeration of the restricted amino acid permutation codes
+# Each code is identified by its rank 0 .. n_restricted_codes-1: the permutation within each class of amino acids
+# (restricted_classes) is encoded by its Lehmer code, and the classes are combined as digits of a mixed-radix number
+# (the class of the amino acids with 1 codon is the most significant one). Rank 0 is the standard code.
+
+# Lehmer ranks of the permutations of 0 .. n-1 given as the rows of perms.
+def _lehmer_rank(perms):
+	n = perms.shape[1]
+	res = np.zeros(perms.shape[0], dtype=np.int64)
+	for i in range(n):
+		# number of smaller elements to the right of position i
+		digit = np.count_nonzero(perms[:, (i+1):] < perms[:, i:(i+1)], axis=1)
+		res = res*(n-i) + digit
+	return res
+
+# Permutations of 0 .. n-1 with the given Lehmer ranks, one per row.
+def _lehmer_unrank(ranks, n):
+	ranks = ranks.copy()
+	digits = np.zeros((len(ranks), n), dtype=np.int64)
+	for i in range(n-1, -1, -1):
+		digits[:, i] = ranks % (n-i)
+		ranks //= (n-i)
+	perms = np.zeros((len(ranks), n), dtype=np.int64)
+	available = np.ones((len(ranks), n), dtype=bool)
+	rows = np.arange(len(ranks))
+	for i in range(n):
+		# the digits[i]-th smallest element that has not been used yet
+		perms[:, i] = np.argmax(np.cumsum(available, axis=1) > digits[:, i:(i+1)], axis=1)
+		available[rows, perms[:, i]] = False
+	return perms
+
+'''
+Returns the restricted amino acid permutation codes with the given ranks, as an (N, 64) array.
+parameters:
+	ranks ... integers in 0 .. n_restricted_codes-1
+	standard_code ... dictionary providing the standard genetic code
+'''
+def unrank_restricted(ranks, standard_code):
+	ranks = np.asarray(list(ranks), dtype=np.int64).reshape(-1)
+	if np.any(ranks < 0) or np.any(ranks >= n_restricted_codes):
+		raise ValueError("Ranks of restricted amino acid permutation codes must be in 0 .. " + str(n_restricted_codes-1))
+	# relabelling of the amino acids, in the order of aas_by_size
+	shuffled = np.tile(np.arange(21), (len(ranks), 1))
+	rest = ranks.copy()
+	for offset, size in reversed(restricted_classes):
+		radix = int(np.prod(np.arange(1, size+1)))
+		shuffled[:, offset:(offset+size)] = offset + _lehmer_unrank(rest % radix, size)
+		rest //= radix
+	to_size = np.array([aas_by_size.index(aa) for aa in aas])
+	from_size = np.array([aas.index(aa) for aa in aas_by_size])
+	relabel = from_size[shuffled[:, to_size]]
+	standard = code_to_array(standard_code)
+	return relabel[:, standard].astype(np.uint8)
+
+'''
+Returns the ranks of restricted amino acid permutation codes (inverse of unrank_restricted).
+parameters:
+	codes ... (N, 64) array of codes (or a single code)
+	standard_code ... dictionary providing the standard genetic code
+Raises ValueError if a code is not a restricted amino acid permutation of the standard code.
+'''
+def rank_restricted(codes, standard_code):
+	codes = np.atleast_2d(np.asarray(codes))
+	standard = code_to_array(standard_code)
+	# the new amino acid of each amino acid, read at one of its codons in the standard code
+	first_codon = np.array([list(standard).index(a) for a in range(21)])
+	relabel = codes[:, first_codon].astype(np.int64)
+	if np.any(relabel[:, standard] != codes):
+		raise ValueError("Not an amino acid permutation of the standard code")
+	to_size = np.array([aas_by_size.index(aa) for aa in aas])
+	# relabelling in the order of aas_by_size
+	shuffled = np.zeros_like(relabel)
+	shuffled[:, to_size] = to_size[relabel]
+	if np.any(shuffled[:, 11] != 11) or np.any(shuffled[:, STOP] != STOP):
+		raise ValueError("Not a restricted amino acid permutation code")
+	ranks = np.zeros(codes.shape[0], dtype=np.int64)
+	for offset, size in restricted_classes:
+		perms = shuffled[:, offset:(offset+size)] - offset
+		if np.any(perms < 0) or np.any(perms >= size):
+			raise ValueError("Not a restricted amino acid permutation code")
+		ranks = ranks*int(np.prod(np.arange(1, size+1))) + _lehmer_rank(perms)
+	return ranks
+
+# Range of ranks [start, end) of shard number shard (0-based) when all restricted codes are split into n_shards contiguous shards.
+def restricted_shard(shard, n_shards):
+	start = shard*n_restricted_codes // n_shards
+	end = (shard+1)*n_restricted_codes // n_shards
+	return start, end
+
+
+########### symmetries of the nucleotide graph
+# The graph of nucleotide sequences built by the landscape engines is a Hamming graph; relabelling the bases independently
+# at each of the three codon positions, and permuting the codon positions (the same way in every codon of the sequence),
+# are automorphisms of it. Two codes related by such a symmetry (code2[c] = code1[g(c)]) thus give isomorphic landscapes:
+# the same peaks and the same distribution of all sampled statistics (epistasis, accessibility, greedy walks).
+# The group has 3!*(4!)^3 = 82944 elements.
+
+_automorphisms = None
+
+'''
+Returns all the symmetries as an (82944, 64) array of codon indices: row g maps codon i to codon g[i],
+i.e. the code transformed by g is code[g]. Row 0 is the identity.
+'''
+def codon_automorphisms():
+	global _automorphisms
+	if _automorphisms is None:
+		base_perms = np.array(list(itertools.permutations(range(4))))
+		pos_perms = np.array(list(itertools.permutations(range(3))))
+		# bases of each codon, one column per codon position
+		bases = np.array([[(i >> 2*(2-k)) % 4 for k in range(3)] for i in range(64)])
+		res = []
+		for p in pos_perms:
+			# relabel the bases of the permuted positions: new base at position k is s_k[old base at position p[k]]
+			b = [base_perms[:, bases[:, p[k]]] for k in range(3)]
+			res.append((16*b[0][:, None, None, :] + 4*b[1][None, :, None, :] + b[2][None, None, :, :]).reshape(-1, 64))
+		_automorphisms = np.concatenate(res).astype(np.uint8)
+	return _automorphisms
+
+'''
+Returns the canonical form of each code: the lexicographically smallest code among all codes related to it by a symmetry
+of the nucleotide graph (see codon_automorphisms). Two codes have the same canonical form iff they are equivalent.
+parameters:
+	codes ... (N, 64) array of codes (or a single code, shape (64,))
+'''
+def canonical_form(codes):
+	codes = np.asarray(codes, dtype=np.uint8)
+	single = codes.ndim == 1
+	codes = np.atleast_2d(codes)
+	auto = codon_automorphisms()
+	res = np.zeros_like(codes)
+	for n in range(codes.shape[0]):
+		code = codes[n]
+		# refine the candidate symmetries codon by codon, keeping those giving the smallest amino acid
+		candidates = auto
+		for i in range(64):
+			if len(candidates)==1:
+				res[n, i:] = code[candidates[0, i:]]
+				break
+			col = code[candidates[:, i]]
+			best = col.min()
+			res[n, i] = best
+			candidates = candidates[col == best]
+	if single:
+		return res[0]
+	return res
+
+'''
+Dedup index of a batch of codes under the symmetries of the nucleotide graph.
+Returns (representatives, classes): classes[i] is the equivalence class of code i (0 .. K-1, in the order of the first
+occurrence), and representatives[k] is the index of the first code of class k, so that the results computed for the codes
+representatives only can be fanned out to all codes as results[classes].
+'''
+def code_classes(codes):
+	canonical = canonical_form(codes)
+	_, first, inverse = np.unique(canonical, axis=0, return_index=True, return_inverse=True)
+	inverse = inverse.reshape(-1)
+	# renumber the classes in the order of their first occurrence
+	order = np.argsort(first)
+	rank = np.empty_like(order)
+	rank[order] = np.arange(len(order))
+	return first[order], rank[inverse]
+
+
+########### global peak filters
+# The analyses of the columns that depend on the global peak (correlations_aaindex.py, ...) only use codes under which
+# the global peak has the same size (number of nucleotide sequences) as under the standard code, and under which
+# the split serine codon block (code["UCU"]) is not occupied by an amino acid of the global peak.
+
+'''
+Returns the size of the global peak (number of nucleotide sequences encoding it) under each code.
+parameters:
+	codes ... (N, 64) array of codes
+	globalPeak ... amino acid sequence of the global peak, e.g. "KEM"
+'''
+def global_peak_size(codes, globalPeak):
+	codes = np.atleast_2d(np.asarray(codes))
+	res = np.ones(codes.shape[0], dtype=np.int64)
+	for aa in globalPeak:
+		res *= np.count_nonzero(codes == aas.index(aa), axis=1)
+	return res
+
+'''
+Returns a boolean mask of the codes passing the global peak filters (see above).
+parameters:
+	codes ... (N, 64) array of codes
+	globalPeak ... amino acid sequence of the global peak
+	standard_code ... dictionary providing the standard genetic code
+	separate ... if True, returns the masks of the two filters (size of the global peak preserved, split codon block not
+		occupied by an amino acid of the global peak) instead of their conjunction
+'''
+def peak_filter(codes, globalPeak, standard_code, separate = False):
+	codes = np.atleast_2d(np.asarray(codes))
+	size_standard = global_peak_size(code_to_array(standard_code), globalPeak)[0]
+	summit = [aas.index(aa) for aa in set(globalPeak)]
+	preserved = global_peak_size(codes, globalPeak) == size_standard
+	notSplit = ~np.isin(codes[:, codon_index["UCU"]], summit)
+	if separate:
+		return preserved, notSplit
+	return preserved & notSplit
+
+'''
+Exact probability that a code of the randomization family passes the global peak filters.
+For the amino acid permutations, the filters only depend on which amino acids are mapped to the amino acids of the global
+peak (all such assignments are equally likely), so the probability is computed by enumerating them.
+Returns None for the random codon assignment (no closed form; use the empirical acceptance rate).
+parameters:
+	randType ... aa_permutation or aa_permutation_restricted
+	globalPeak ... amino acid sequence of the global peak
+	standard_code ... dictionary providing the standard genetic code
+'''
+def peak_filter_acceptance(randType, globalPeak, standard_code):
+	if randType not in ["aa_permutation", "aa_permutation_restricted"]:
+		return None
+	standard = code_to_array(standard_code)
+	num_codons = np.bincount(standard, minlength=21)
+	summit = sorted(set(aas.index(aa) for aa in globalPeak))
+	size_standard = global_peak_size(standard, globalPeak)[0]
+	split = standard[codon_index["UCU"]]
+	if randType=="aa_permutation":
+		# stop is fixed, the amino acids are permuted freely
+		allowed = [[a for a in range(20)] if t!=STOP else [STOP] for t in summit]
+	else:
+		# only amino acids with the same number of codons are exchanged; isoleucine and stop are fixed
+		allowed = [[t] if num_codons[t]==3 or t==STOP else [a for a in range(20) if num_codons[a]==num_codons[t]] for t in summit]
+	total = 0
+	valid = 0
+	for sources in itertools.product(*allowed):
+		if len(set(sources)) < len(sources):
+			continue
+		total += 1
+		# the new size of the global peak, and whether the split block gets an amino acid of the peak
+		size = np.prod([num_codons[sources[summit.index(aas.index(aa))]] for aa in globalPeak])
+		if size==size_standard and split not in sources:
+			valid += 1
+	return valid / total
@@ -4,6 +4,15 @@ Parameters:
 	[1] Name of the file containing the genotype-phenotype map. Format of the file: First line header, each other line contains one sequence and its phenotype, tab-delimited.
 	[2] Name of the file containing the genetic code. Format of the file: First line header, each other line tab-delimited aa (one-letter code) and a corresponding codon.
 	[3] Name of the output file.
+	[4] Number of amino acid positions L.
+Several codes can be evaluated by one run (the landscape is read and the genotype network is built only once):
+	if [2] is "-", the codes are read from the standard input as a stream of 64-byte records,
+	if [2] ends with ".npy", the codes are read from a code library file (codes.npy, see code_library.py); optionally only
+		[5] number of records starting with record [6] (default: all).
+	A record is one code: byte i is the index (in ACDEFGHIKLMNPQRSTVWY*) of the amino acid encoded by codon i = 16*b1+4*b2+b3
+	(A=0, C=1, G=2, U=3). One line of results is written to the output file for each code.
+	The codes are read by code_records.h; invalid records, library files or record ranges ([5], [6]) stop the engine with exit code 1.
+The landscape is read (and the neighbours in the genotype network are generated) by landscape.h.
 
 Compile as
 g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o greedy_walk greedy_walk.cpp
@@ -21,14 +30,13 @@ g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o greedy_walk greedy_walk.cpp
 #include <algorithm>
 #include <string>
 #include <queue>
+#include "code_records.h"
+#include "landscape.h"
 
 using namespace std;
 
-const double EMPTY_VAL = -100.0;
-
+// a node of the genotype network (the neighbours are not stored, see Neighbors)
 struct Node{
-	vector<int> neighbors;
-	
 	//computed in the algorithm
 	vector<int> peaks; // indices of accessible peaks
 	vector<double> path; // we use lexicographical order on these values in the alg.  
@@ -94,62 +102,46 @@ string translate(string nuc_seq, unordered_map<string, char>& code){
 	return res;
 }
 
-//read the phenotypic scores of the sequences
-void read_scores(string file_name, vector<double>& scores, unordered_map<string, char>& code, int L){
-	cerr << "reading scores" << endl;	
+//compute the phenotypic scores of the sequences
+void read_scores(vector<double>& aa_scores, vector<double>& scores, unordered_map<string, char>& code, int L){
 	// here we will store the scores of each nucleotide sequence
 	scores.clear();
 	scores.resize(1 << (6*L), EMPTY_VAL); // -100 for empty entries because of the stop codon
 
-	// read the input data - scores for the protein sequences
-	ifstream data_file;
-	data_file.open(file_name); 
-	string s;
-	data_file >> s >> s;
-	unordered_map<string, double> aa_scores;
-	while(true){
-		string sseq;
-		double val;
-		data_file >> sseq >> val;
-		if(sseq.size() == 0){
-			break;
-		}
-		aa_scores[sseq] = val;
+	// translation table: the 6 bits of a codon in a nucleotide sequence (first nucleotide least significant) -> index
+	// of the amino acid in AAS, STOP or UNKNOWN
+	const string nucs = "ACGU";
+	int codon_aa[64];
+	for (int c = 0; c < 64; ++c) {
+		string codon = {nucs[c % 4], nucs[(c / 4) % 4], nucs[c / 16]};
+		char aa = code[codon];
+		size_t index = AAS.find(aa);
+		codon_aa[c] = (aa == '*') ? STOP : ((index == string::npos) ? UNKNOWN : (int) index);
 	}
 
 	cerr << "scores loaded, converting" << endl;
 	// for each nucleotide sequence, find its translation and store the corresponding score
 	for(int i = 0; i < (1 << (6*L)); ++i){
-		string str = int_to_string(i, L);
-		string aa_str = translate(str, code);
-		if (aa_str.find('*') == string::npos) {
-			scores[i] = aa_scores[aa_str];
+		long long index = 0;
+		bool stop = false;
+		bool unknown = false;
+		for (int j = L-1; j >= 0; --j) {
+			int aa = codon_aa[(i >> (6*j)) & 63];
+			if (aa == STOP) stop = true;
+			else if (aa == UNKNOWN) unknown = true;
+			else index = 20*index + aa;
+		}
+		if (!stop) {
+			scores[i] = unknown ? 0.0 : aa_scores[index];
 		}
-
 	}
-
-	cerr << "num of nodes: " << aa_scores.size() << " " << scores.size() << endl;
 }
 
 // build the genotype network
-void build_graph(vector<Node >& G, unordered_map<string, char>& code, unordered_map<string, int>& node_names, vector<double>& scores, int L){
+void build_graph(vector<Node >& G, int L){
 	cerr << "building the graph" << endl;	
 	G.clear();
 	G.resize((1 << (6*L)), Node());
-
-	for(int i = 0; i < G.size(); ++i){
-		// generate all possible neighbors
-		for(int j = 0; j < (3*L); ++j){
-			char cur_val = (i >> (2 * j)) % 4;
-			int base = i - (cur_val << (2*j));
-
-			for(char new_val : {0, 1, 2, 3}){
-				if(new_val == cur_val) continue;				
-				int neighbor = base + (new_val << (2*j));
-				G[i].neighbors.push_back(neighbor);
-			}
-		}
-	}
 }
 
 
@@ -203,7 +195,7 @@ void find_paths(vector<Node>& G, vector<double>& scores, int L){
 			// add neighbors to the queue, if 
 			// 1) we are not just moving within a local peak
 			// 2) neighbor v is not already in the queue with a better parent
-			for(int v : G[e.u].neighbors){
+			for(int v : Neighbors{e.u, L}){
 				if(!(G[e.u].path.size() == 1 && scores[v] == G[e.u].path[0]) &&	parent_score[v] <= scores[e.u]){
 					Event new_e = Event();
 					
@@ -230,28 +222,17 @@ void find_paths(vector<Node>& G, vector<double>& scores, int L){
 
 
 
-int main(int argc, char** argv){
-	// command line parameters
-	string data_file_str = string(argv[1]);
-	string code_file_str = string(argv[2]);
-	string output_file_str = string(argv[3]);
-	int L = atoi(argv[4]);
-	
-	//read the genetic code
-	unordered_map<string, char> code; //GCA -> A
-	read_code(code_file_str, code);
-
-	
+// Runs the greedy walks on the landscape under one genetic code and writes the results as one line to out_file.
+void evaluate_code(vector<Node>& G, vector<double>& aa_scores, unordered_map<string, char>& code, int L, ostream& out_file){
 	// genotype-phenotype map
 	vector<double> scores;
-	read_scores(data_file_str, scores, code, L);
-	
-
-	// the genotype network
-	vector<Node> G;
-	unordered_map<string, int> node_names;
-	build_graph(G, code, node_names, scores, L);
+	read_scores(aa_scores, scores, code, L);
 
+	// forget the paths of the previous code
+	for (Node& node : G) {
+		node.peaks.clear();
+		node.path.clear();
+	}
 
 	// the main computation
 	find_paths(G, scores, L);
@@ -285,18 +266,54 @@ int main(int argc, char** argv){
 	}
 	
 	// output
-	ofstream out_file;
-	out_file.open(output_file_str);
+	out_file << defaultfloat << setprecision(6);
 	out_file << sum/num_vert << "\t" << sum_len/num_vert << "\t";
 	for (auto it = reached_peaks.begin(); it!= reached_peaks.end(); ++it) {
 		out_file << std::fixed << setprecision(2) <<  it->first << ":" << it->second << ",";
 	}
 	out_file << "\t" << ent;
 	out_file << endl;
+}
 
 
-}
 
+int main(int argc, char** argv){
+	// command line parameters
+	string data_file_str = string(argv[1]);
+	string code_file_str = string(argv[2]);
+	string output_file_str = string(argv[3]);
+	int L = atoi(argv[4]);
+	
+	// genotype-phenotype map
+	vector<double> aa_scores;
+	read_landscape(data_file_str, aa_scores, L);
 
+	// the genotype network (the same for all codes)
+	vector<Node> G;
+	build_graph(G, L);
 
+	// output file
+	ofstream out_file;
+	out_file.open(output_file_str);
 
+	unordered_map<string, char> code; //GCA -> A
+	bool from_library = code_file_str.size() >= 4 && code_file_str.substr(code_file_str.size()-4) == ".npy";
+	if (code_file_str != "-" && !from_library) {
+		//read the genetic code
+		read_code(code_file_str, code);
+		evaluate_code(G, aa_scores, code, L, out_file);
+		return 0;
+	}
+
+	// stream of codes
+	ifstream library_file;
+	long long num_codes = -1;
+	if (from_library) {
+		open_code_library(library_file, code_file_str, (argc > 6) ? parse_integer(argv[6], "first record", 0, LLONG_MAX) : 0);
+		if (argc > 5) num_codes = parse_integer(argv[5], "number of records", 0, LLONG_MAX);
+	}
+	istream& codes_in = from_library ? library_file : cin;
+	for (long long n = 0; n != num_codes && read_code_record(codes_in, code); ++n) {
+		evaluate_code(G, aa_scores, code, L, out_file);
+	}
+}
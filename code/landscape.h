@@ -0,0 +1,90 @@
+/*
+The genotype-phenotype landscape and the genotype network, shared by the engines (landscape_ruggedness, greedy_walk,
+block_ruggedness): reading of the landscape into a dense array of scores of the protein sequences, and the neighbours of
+a nucleotide sequence (genotype) in the genotype network.
+A nucleotide sequence of L codons is a 6L-bit integer: 2 bits per nucleotide (A=0, C=1, G=2, U=3), the first nucleotide
+being the least significant.
+*/
+
+#ifndef LANDSCAPE_H
+#define LANDSCAPE_H
+
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <vector>
+
+// This value is used for sequences containing stop codons.
+const double EMPTY_VAL = -100.0;
+
+// the amino acids of the landscape, in the order used for the indices of the protein sequences
+const std::string AAS = "ACDEFGHIKLMNPQRSTVWY";
+// translations of codons other than amino acids
+const int STOP = -1;
+const int UNKNOWN = -2;
+
+// The neighbours of genotype u (all single-nucleotide substitutions), generated on the fly by bit operations instead of
+// being stored: positions 0 .. 3L-1, at each position the other three nucleotides in the order A, C, G, U.
+struct Neighbors{
+	int u;
+	int L;
+
+	struct iterator{
+		int u;
+		int k;	// k/3 = position, k%3 = which of the other nucleotides
+		int operator*() const {
+			int j = k / 3;
+			int cur_val = (u >> (2*j)) & 3;
+			int new_val = k % 3;
+			if (new_val >= cur_val) ++new_val;
+			return u ^ ((cur_val ^ new_val) << (2*j));
+		}
+		iterator& operator++() { ++k; return *this; }
+		bool operator!=(const iterator& other) const { return k != other.k; }
+	};
+	iterator begin() const { return {u, 0}; }
+	iterator end() const { return {u, 9*L}; }
+};
+
+// index of a protein sequence in the dense array of scores (digits in base 20, the first position being the least
+// significant); -1 if the sequence contains other letters than the 20 amino acids
+inline long long protein_index(const std::string& seq){
+	long long index = 0;
+	for (int i = seq.size()-1; i >= 0; --i) {
+		size_t aa = AAS.find(seq[i]);
+		if (aa == std::string::npos) return -1;
+		index = 20*index + aa;
+	}
+	return index;
+}
+
+// read the input data - scores for the protein sequences of length L, as a dense array indexed by protein_index
+// (sequences not in the data have score 0)
+inline void read_landscape(std::string file_name, std::vector<double>& aa_scores, int L){
+	std::cerr << "reading scores" << std::endl;
+	long long num_proteins = 1;
+	for (int i = 0; i < L; ++i) num_proteins *= 20;
+	aa_scores.assign(num_proteins, 0.0);
+
+	std::ifstream data_file;
+	data_file.open(file_name);
+	std::string s;
+	data_file >> s >> s;
+	int num_read = 0;
+	while(true){
+		std::string sseq;
+		double val;
+		data_file >> sseq >> val;
+		if(sseq.size() == 0){
+			break;
+		}
+		long long index = protein_index(sseq);
+		if ((int) sseq.size() == L && index >= 0) {
+			aa_scores[index] = val;
+			++num_read;
+		}
+	}
+	std::cerr << "num of sequences: " << num_read << std::endl;
+}
+
+#endif
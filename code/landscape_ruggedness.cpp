@@ -5,9 +5,36 @@ Parameters:
 	[1] Name of the file containing the genotype-phenotype map. Format of the file: First line header, each other line contains one sequence and its phenotype, tab-delimited.
 	[2] Name of the file containing the genetic code. Format of the file: First line header, each other line tab-delimited aa (one-letter code) and a corresponding codon.
 	[3] Name of the output file.
+	[4] Number of amino acid positions L.
+Several codes can be evaluated by one run (the landscape is read only once):
+	if [2] is "-", the codes are read from the standard input as a stream of 64-byte records,
+	if [2] ends with ".npy", the codes are read from a code library file (codes.npy, see code_library.py); optionally only
+		[5] number of records starting with record [6] (default: all).
+	A record is one code: byte i is the index (in ACDEFGHIKLMNPQRSTVWY*) of the amino acid encoded by codon i = 16*b1+4*b2+b3
+	(A=0, C=1, G=2, U=3). One line of results is written to the output file for each code.
+	The codes are read by code_records.h; invalid records, library files or record ranges ([5], [6]) stop the engine with exit code 1.
+The landscape is read (and the neighbours in the genotype network are generated) by landscape.h.
+Options, given as name=value after [4] (in any order, also between [5] and [6]):
+	threads=N ... number of threads (only if compiled with OpenMP; default, or N=0: OMP_NUM_THREADS, or all cores). The
+		results do not depend on the number of threads.
+	seed=S ... sample the squares for the epistasis from independent random streams seeded by S >= 0 (one stream per block of
+		squares, so that the blocks can be sampled in parallel and the result depends only on S), instead of the legacy
+		sequence of rand() with seed 1.
+	squares=N ... number of squares sampled for the epistasis (default 1e6; the squares are classified as they are sampled,
+		so e.g. squares=1e8 needs no more memory)
+		squares=all ... exact census: the epistasis types of all squares of the genotype network, without sampling noise
+			(about 21 million squares for L=3)
+	precision=H ... adaptive sample of squares: the squares are sampled in blocks until the 95% confidence interval (Wilson)
+		of every epistasis-type fraction has a half-width of at most H (0 < H < 1, e.g. 0.001), at most squares=N of them.
+		Two columns are added at the end of the output line: the achieved half-width and the number of sampled squares.
+	greedy=1 ... also run the greedy walks (as greedy_walk) on the same translated landscape, so that one run gives the
+		results of both engines; the four columns of greedy_walk (mean fitness reached, mean number of steps, reached
+		peaks, entropy) are added to the output line after the proportion of accessible paths.
 
 Compile as
 g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o landscape_ruggedness landscape_ruggedness.cpp
+or, multi-threaded,
+g++ -std=c++14 -fmax-errors=1 -O3 -Wall -fopenmp -o landscape_ruggedness landscape_ruggedness.cpp
 */
 
 #include <vector>
@@ -24,32 +51,71 @@ g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o landscape_ruggedness landscape_rugged
 #include <queue>
 #include <climits>
 #include <numeric>
+#include <cstdint>
+#include <cstdlib>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "code_records.h"
+#include "landscape.h"
 
 using namespace std;
 
-// This value is used for sequences containing stop codons.
-const double EMPTY_VAL = -100.0;
-
-struct Node{
-	vector<int> neighbors;  
+// number of squares sampled from one random stream (with option seed)
+const long long SQUARES_PER_STREAM = 1 << 14;
+// number of squares sampled between the checks of the precision (with option precision)
+const long long ADAPTIVE_BLOCK = 1 << 16;
+
+// options of the computation (see the header)
+struct Options{
+	int threads = 0;	// 0 ... default
+	long long seed = -1;	// -1 ... legacy rand()
+	long long num_squares = 1000000;	// number of squares sampled for the epistasis
+	bool census = false;	// all squares instead of a sample
+	double precision = 0;	// > 0 ... adaptive sample of squares, target half-width of the confidence intervals
+	bool greedy = false;	// also the greedy walks
 };
 
+// SplitMix64 random number generator
+struct SplitMix64{
+	uint64_t x;
 
-// Converts an integer to a DNA sequence of length 12.
-string int_to_string(int u, int L){
-	string ret = "";
-	for(int i = 0; i < L*3; ++i){
-		switch(u % 4){
-			case 0: ret += "A"; break;
-			case 1: ret += "C"; break;
-			case 2: ret += "G"; break;
-			case 3: ret += "U"; break;
-		}
-		u >>= 2;
+	uint64_t next(){
+		uint64_t z = (x += 0x9e3779b97f4a7c15ULL);
+		z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+		z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+		return z ^ (z >> 31);
 	}
-	return ret;
+	// uniform random integer in 0 .. n-1
+	int below(int n){
+		return (int) (((next() >> 32) * (uint64_t) n) >> 32);
+	}
+};
+
+// index of the calling thread and number of threads
+int thread_num(){
+#ifdef _OPENMP
+	return omp_get_thread_num();
+#else
+	return 0;
+#endif
+}
+int max_threads(){
+#ifdef _OPENMP
+	return omp_get_max_threads();
+#else
+	return 1;
+#endif
 }
 
+// the genotype network: the 4^(3L) nucleotide sequences, neighbouring if they differ in a single nucleotide
+struct Graph{
+	int L;
+	int size() const { return 1 << (6*L); }
+	Neighbors neighbors(int u) const { return {u, L}; }
+};
+
+
 // function to read genetic code from file
 void read_code(string file_name, unordered_map<string, char>& code){
 	cerr << "reading code" << endl;	
@@ -69,70 +135,38 @@ void read_code(string file_name, unordered_map<string, char>& code){
 	ifile.close();
 }
 
-// translates a nucleotide sequence to protein, using the given genetic code
-string translate(string nuc_seq, unordered_map<string, char>& code){
-	string res = "";
-	for (int i = 0; i<nuc_seq.size()/3; ++i) {
-		string codon = nuc_seq.substr(3*i,3);
-		res += string(1, code[codon]);
-	}
-	return res;
-}
-
-//read the phenotypic scores of the sequences
-void read_scores(string file_name, vector<double>& scores, unordered_map<string, char>& code, int L){
-	cerr << "reading scores" << endl;	
+//compute the phenotypic scores of the sequences
+void read_scores(vector<double>& aa_scores, vector<double>& scores, unordered_map<string, char>& code, int L){
 	// here we will store the scores of each nucleotide sequence
 	scores.clear();
 	scores.resize(1 << (6*L), EMPTY_VAL); // -100 for empty entries because of the stop codon
 
-	// read the input data - scores for the protein sequences
-	ifstream data_file;
-	data_file.open(file_name); 
-	string s;
-	data_file >> s >> s;
-	unordered_map<string, double> aa_scores;
-	while(true){
-		string sseq;
-		double val;
-		data_file >> sseq >> val;
-		if(sseq.size() == 0){
-			break;
-		}
-		aa_scores[sseq] = val;
+	// translation table: the 6 bits of a codon in a nucleotide sequence (first nucleotide least significant) -> index
+	// of the amino acid in AAS, STOP or UNKNOWN
+	const string nucs = "ACGU";
+	int codon_aa[64];
+	for (int c = 0; c < 64; ++c) {
+		string codon = {nucs[c % 4], nucs[(c / 4) % 4], nucs[c / 16]};
+		char aa = code[codon];
+		size_t index = AAS.find(aa);
+		codon_aa[c] = (aa == '*') ? STOP : ((index == string::npos) ? UNKNOWN : (int) index);
 	}
 
 	cerr << "scores loaded, converting" << endl;
 	// for each nucleotide sequence, find its translation and store the corresponding score
+	#pragma omp parallel for schedule(static)
 	for(int i = 0; i < (1 << (6*L)); ++i){
-		string str = int_to_string(i, L);
-		string aa_str = translate(str, code);
-		if (aa_str.find('*') == string::npos) {
-			scores[i] = aa_scores[aa_str];
+		long long index = 0;
+		bool stop = false;
+		bool unknown = false;
+		for (int j = L-1; j >= 0; --j) {
+			int aa = codon_aa[(i >> (6*j)) & 63];
+			if (aa == STOP) stop = true;
+			else if (aa == UNKNOWN) unknown = true;
+			else index = 20*index + aa;
 		}
-
-	}
-
-	cerr << "num of nodes: " << aa_scores.size() << " " << scores.size() << endl;
-}
-
-// build the genotype network
-void build_graph(vector<Node >& G, unordered_map<string, char>& code, unordered_map<string, int>& node_names, vector<double>& scores, int L){
-	cerr << "building the graph" << endl;	
-	G.clear();
-	G.resize((1 << (6*L)), Node());
-
-	for(int i = 0; i < G.size(); ++i){
-		// generate all possible neighbors
-		for(int j = 0; j < (3*L); ++j){
-			char cur_val = (i >> (2 * j)) % 4;
-			int base = i - (cur_val << (2*j));
-
-			for(char new_val : {0, 1, 2, 3}){
-				if(new_val == cur_val) continue;				
-				int neighbor = base + (new_val << (2*j));
-				G[i].neighbors.push_back(neighbor);
-			}
+		if (!stop) {
+			scores[i] = unknown ? 0.0 : aa_scores[index];
 		}
 	}
 }
@@ -150,62 +184,58 @@ pair<double, double> mean_var(vector<double> v) {
 
 //////////////////////////////////// Landscape ruggedness functions
 
+// root of the set containing u in the union-find forest parent (with path halving)
+int find_root(vector<int>& parent, int u){
+	while(parent[u] != u){
+		parent[u] = parent[parent[u]];
+		u = parent[u];
+	}
+	return u;
+}
+
 // Computes the number of peaks in the landscape and their mean score
-pair<int, double> count_peaks(vector<Node>& G, vector<double>& scores){
+pair<int, double> count_peaks(Graph& G, vector<double>& scores){
 	int cnt = 0;
 	vector<double> peak_scores;
 	
-	vector<int> visited(scores.size(), -1); // have we seen this node before?
-	// sort the sequences based on the scores, in descending order
-	vector<pair<double, int> > sorted_seqs;
-	for(int i = 0; i < scores.size(); ++i){
-		sorted_seqs.push_back({scores[i], i});
-	}
-	sort(sorted_seqs.begin(), sorted_seqs.end(), greater<>());
-
-	// iterate over the sequences in the order of descending score
-	for(int i = 0; i < sorted_seqs.size(); ++i){
-		// if we haven't visited this sequence before
-		if(visited[sorted_seqs[i].second] == -1){			
-			// this is a candidate peak	
-			bool isPeak = true;		
-			double peak_score = sorted_seqs[i].first;
-			
-			// explore the whole plateau (in case some neighbors have the same fitness, check that none of them was already visited)
-			vector<int> peak_stack;
-			peak_stack.push_back(sorted_seqs[i].second);			
-			while(!peak_stack.empty()){
-				int u = peak_stack[peak_stack.size()-1];
-				peak_stack.pop_back();
-				visited[u] = i;
-
-				for(int v : G[u].neighbors){
-					if(scores[v] == peak_score){
-						if(visited[v] == -1){
-							peak_stack.push_back(v);
-						}	
-						if(visited[v]!=-1 && visited[v]!=i) {
-							isPeak = false;
-						}				
-					}
-					visited[v] = i;		// this node was visited in iteration i
-				}
+	// plateaus (connected sets of sequences with the same score) as a union-find forest
+	vector<int> parent(scores.size());
+	iota(parent.begin(), parent.end(), 0);
+	// does the sequence (for roots: the plateau) have a neighbor with a higher score?
+	vector<char> has_higher(scores.size(), 0);
+	for(int u = 0; u < scores.size(); ++u){
+		for(int v : G.neighbors(u)){
+			if(scores[v] > scores[u]){
+				has_higher[u] = 1;
 			}
-
-			if (isPeak==true) {	//this is a peak
-				++cnt;
-				peak_scores.push_back(peak_score);
+			else if(scores[v] == scores[u] && v < u){
+				// merge the plateaus
+				int ru = find_root(parent, u);
+				int rv = find_root(parent, v);
+				if(ru != rv){
+					if(ru < rv) swap(ru, rv);
+					parent[ru] = rv;
+					has_higher[rv] |= has_higher[ru];
+				}
 			}
-			
 		}
-		else {
-			// not a peak
-			// just visit all neighbors
-			for(int v : G[sorted_seqs[i].second].neighbors){
-				visited[v] = i;
-			}
+	}
+	// a plateau has a higher neighbor if any of its members has one
+	for(int u = 0; u < scores.size(); ++u){
+		if(has_higher[u]){
+			has_higher[find_root(parent, u)] = 1;
+		}
+	}
+
+	// the plateaus without a higher neighbor are the peaks
+	for(int u = 0; u < scores.size(); ++u){
+		if(parent[u] == u && !has_higher[u]){
+			++cnt;
+			peak_scores.push_back(scores[u]);
 		}
 	}
+	// in the order of descending score
+	sort(peak_scores.begin(), peak_scores.end(), greater<>());
 
 	// compute the mean peak score
 	pair<double, double> scores_mean = mean_var(peak_scores);
@@ -213,51 +243,191 @@ pair<int, double> count_peaks(vector<Node>& G, vector<double>& scores){
 	return {cnt, scores_mean.first};
 }
 
-// runs BFS on the landscape and computes the number of paths and the number of accessible paths from each node to the global peak
-void BFS(vector<Node>& G, vector<double>& scores, vector<int>& dist, vector<long long>& num_paths, vector<long long>& num_accessible, vector<int>& global_max, bool oriented){
-	// number of paths (regardless of accessibility) from each node to the global peak
-	num_paths = vector<long long>(G.size(), 0);
-	// number of accessible paths
-	num_accessible = vector<long long>(G.size(), 0);
-	// distances of the nodes from the global peak
-	dist = vector<int>(G.size(), -1);
-
-	// initialize the queue; add the global peak
-	queue<int> q;
+// set of nodes 0 .. n-1 as a bitset, with the ranks of the nodes (their positions in the sorted set)
+struct Bitset{
+	vector<uint64_t> words;
+	vector<int> rank_prefix;	// number of nodes in the preceding words
+
+	Bitset(int n) : words((n + 63) / 64, 0) {}
+	bool test(int i){ return (words[i >> 6] >> (i & 63)) & 1; }
+	void set(int i){ words[i >> 6] |= 1ULL << (i & 63); }
+	// (several threads may set nodes of the same word)
+	void set_atomic(int i){ __sync_fetch_and_or(&words[i >> 6], 1ULL << (i & 63)); }
+	// computes the ranks, returns the size of the set
+	int build_rank(){
+		rank_prefix.resize(words.size());
+		int cnt = 0;
+		for (int w = 0; w < words.size(); ++w) {
+			rank_prefix[w] = cnt;
+			cnt += __builtin_popcountll(words[w]);
+		}
+		return cnt;
+	}
+	// position of node i (in the set) in the sorted set
+	int rank(int i){ return rank_prefix[i >> 6] + __builtin_popcountll(words[i >> 6] & ((1ULL << (i & 63)) - 1)); }
+};
+
+// Runs BFS on the landscape from the global peak and computes the proportion of accessible paths prob_acc: the mean, over the
+// sequences without stop codons, of (number of accessible paths) / (number of paths) from the sequence to the global peak.
+// The BFS is level-synchronous, with the levels as bitsets; the next level is found from the current one (top-down) while it
+// is small and from the unvisited nodes (bottom-up) when it is large. The path counts are kept (indexed by the ranks) only
+// for the current and the next level, in type T. Returns false if the counts overflow T.
+template <typename T>
+bool accessible_paths(Graph& G, vector<double>& scores, vector<int>& global_max, double& prob_acc){
+	// switch to bottom-up when the frontier is larger than this fraction of the unvisited nodes
+	const int BOTTOM_UP_RATIO = 14;
+	int n = G.size();
+	int num_words = (n + 63) / 64;
+	Bitset visited(n), frontier(n);
+	// the first level: the global peak
 	for (int i = 0; i<global_max.size(); ++i) {
-		q.push(global_max[i]);
-		dist[global_max[i]] = 0;
-		num_paths[global_max[i]] = 1;
-		num_accessible[global_max[i]] = 1;
-	}	
-
-	// run BFS
-	while (!q.empty()) {
-		int u = q.front();
-		q.pop();
-		int d = dist[u];
-		// add all neighbors to the queue
-		for (int v : G[u].neighbors) {
-			if (dist[v] == -1) {
-				q.push(v);
-				dist[v] = d+1;
+		frontier.set(global_max[i]);
+	}
+	visited.words = frontier.words;
+	int frontier_size = frontier.build_rank();
+	int num_unvisited = n - frontier_size;
+	// number of paths (regardless of accessibility) and of accessible paths from the nodes of the level to the global peak
+	vector<T> paths(frontier_size, 1), accessible(frontier_size, 1);
+	// sum of the proportions of accessible paths
+	double sum_acc = 0.0;
+	int num_nonempty = 0;
+	for (int u : global_max) {
+		if (scores[u]!=EMPTY_VAL) {
+			sum_acc += 1.0;
+			num_nonempty++;
+		}
+	}
+
+	bool overflow = false;
+	while (num_unvisited > 0 && frontier_size > 0) {
+		// the next level
+		Bitset next(n);
+		if ((long long) frontier_size * BOTTOM_UP_RATIO > num_unvisited) {
+			// bottom-up: the unvisited nodes with a neighbour in the frontier
+			#pragma omp parallel for schedule(dynamic, 256)
+			for (int w = 0; w < num_words; ++w) {
+				uint64_t unvisited = ~visited.words[w];
+				uint64_t found = 0;
+				for (; unvisited; unvisited &= unvisited - 1) {
+					int b = __builtin_ctzll(unvisited);
+					int v = (w << 6) + b;
+					if (v >= n) break;
+					for (int u : G.neighbors(v)) {
+						if (frontier.test(u)) {
+							found |= 1ULL << b;
+							break;
+						}
+					}
+				}
+				next.words[w] = found;
+			}
+		}
+		else {
+			// top-down: the unvisited neighbours of the frontier
+			#pragma omp parallel for schedule(dynamic, 256)
+			for (int w = 0; w < num_words; ++w) {
+				for (uint64_t bits = frontier.words[w]; bits; bits &= bits - 1) {
+					int u = (w << 6) + __builtin_ctzll(bits);
+					for (int v : G.neighbors(u)) {
+						if (!visited.test(v) && !next.test(v)) next.set_atomic(v);
+					}
+				}
 			}
-			// if this is the shortest possible way how to reach node v, update number of paths
-			if (dist[v] == d+1) {
-				num_paths[v] += num_paths[u];	// all paths
-				if (scores[v] <= scores[u]) {	// accessible paths
-					num_accessible[v] += num_accessible[u];
+		}
+		int next_size = next.build_rank();
+
+		// the path counts of the next level, summed over the neighbours in the frontier
+		vector<T> next_paths(next_size, 0), next_accessible(next_size, 0);
+		vector<double> ratios(next_size);
+		#pragma omp parallel for schedule(dynamic, 256) reduction(||:overflow)
+		for (int w = 0; w < num_words; ++w) {
+			int r = next.rank_prefix[w];
+			for (uint64_t bits = next.words[w]; bits; bits &= bits - 1, ++r) {
+				int v = (w << 6) + __builtin_ctzll(bits);
+				T num_paths = 0, num_accessible = 0;
+				for (int u : G.neighbors(v)) {
+					if (frontier.test(u)) {
+						int ru = frontier.rank(u);
+						overflow |= __builtin_add_overflow(num_paths, paths[ru], &num_paths);	// all paths
+						if (scores[v] <= scores[u]) {	// accessible paths
+							overflow |= __builtin_add_overflow(num_accessible, accessible[ru], &num_accessible);
+						}
+					}
 				}
-				
+				next_paths[r] = num_paths;
+				next_accessible[r] = num_accessible;
+				ratios[r] = 1.0*num_accessible/num_paths;
 			}
 		}
+		if (overflow) return false;
+		// (in the order of the nodes, so that the result does not depend on the number of threads)
+		int r = 0;
+		for (int w = 0; w < num_words; ++w) {
+			for (uint64_t bits = next.words[w]; bits; bits &= bits - 1, ++r) {
+				int v = (w << 6) + __builtin_ctzll(bits);
+				if (scores[v]!=EMPTY_VAL) {
+					sum_acc += ratios[r];
+					num_nonempty++;
+				}
+			}
+		}
+
+		for (int w = 0; w < num_words; ++w) visited.words[w] |= next.words[w];
+		num_unvisited -= next_size;
+		frontier = move(next);
+		frontier_size = next_size;
+		paths = move(next_paths);
+		accessible = move(next_accessible);
+	}
+	prob_acc = sum_acc / num_nonempty;
+	return true;
+}
+
+// Computes the proportion of accessible paths to the global peak (see accessible_paths), with 32-bit path counts if they
+// suffice, else with 64-bit ones.
+double BFS(Graph& G, vector<double>& scores, vector<int>& global_max){
+	double prob_acc;
+	if (accessible_paths<uint32_t>(G, scores, global_max, prob_acc) || accessible_paths<uint64_t>(G, scores, global_max, prob_acc)) {
+		return prob_acc;
+	}
+	cerr << "The number of paths to the global peak overflows 64 bits" << endl;
+	exit(1);
+}
+
+// Type of epistasis in a square of sequences with epistasis: 1 magnitude, 2 simple-sign, 3 reciprocal-sign.
+// (Unlike the test for no epistasis, which depends on the rounding, the type does not depend on the corner taken as AB.)
+int sign_epistasis_type(double score_AB, double score_aB, double score_Ab, double score_ab){
+	// score differences
+	double delta_ab_Ab = score_Ab - score_ab;
+	double delta_ab_aB = score_aB - score_ab;
+	double delta_Ab_AB = score_AB - score_Ab;
+	double delta_aB_AB = score_AB - score_aB;
+
+	// magnitude epistasis
+	if (delta_ab_Ab*delta_aB_AB >= 0 && delta_ab_aB*delta_Ab_AB>=0) {
+		return 1;
+	}
+	// reciprocal sign epistasis
+	else if (delta_ab_Ab*delta_aB_AB < 0 && delta_ab_aB*delta_Ab_AB<0) {
+		return 3;
 	}
+	return 2; // otherwise it simple-sign epistasis
 }
 
-// Samples num_squares random squares of sequences (a wild-type, two single mutants and a corresponding double mutant) from the genotype network.
-vector<vector<int> > sample_squares(vector<Node>& G, vector<double>& scores, int num_squares, int L){
-	vector<vector<int>> squares;	// vector to store the results
-	for (int i = 0; i<num_squares; ++i) {
+// Type of epistasis in a square of sequences: 0 no epistasis, 1 magnitude, 2 simple-sign, 3 reciprocal-sign.
+int epistasis_type(double score_AB, double score_aB, double score_Ab, double score_ab){
+	// no epistasis
+	if (score_AB + score_ab - score_Ab - score_aB == 0) {
+		return 0;
+	}
+	return sign_epistasis_type(score_AB, score_aB, score_Ab, score_ab);
+}
+
+// Samples num_squares random squares of sequences (a wild-type, two single mutants and a corresponding double mutant) from the
+// genotype network with rand() and adds the numbers of squares of each epistasis type (no epistasis, magnitude, simple-sign
+// or reciprocal-sign) to counts. The squares are classified as they are sampled, none is stored.
+void count_squares(vector<double>& scores, long long num_squares, int L, vector<long long>& counts) {
+	for (long long i = 0; i<num_squares; ++i) {
 		// the wildtype
 		int seq0 = rand() % scores.size();
 		int seq1; // first single mutant 
@@ -298,68 +468,291 @@ vector<vector<int> > sample_squares(vector<Node>& G, vector<double>& scores, int
 		int base = seq0 - (cur_val1 << (2*pos1)) - (cur_val2 << (2*pos2));
 		seq12 = base + (mut1 << (2*pos1)) + (mut2 << (2*pos2));			
 		
-		squares.push_back({seq0, seq1, seq2, seq12});
+		counts[epistasis_type(scores[seq0], scores[seq1], scores[seq2], scores[seq12])]++;
 	}
-	return squares;
 }
 
-// Computes the prevalence of epistasis type (no epistasis, magnitude, simple-sign or reciprocal-sign) among the squares in vectore squares.
-vector<double> epistasis_types(vector<vector<int>> squares, vector<double>& scores) {
-	int num_squares = squares.size();
-	int mag = 0; int ss = 0; int rs = 0; int no_epi = 0;
-	for (int i = 0; i < squares.size(); i++) {
-		vector<int> square = squares[i];
-		
-		// scores of the sequences
-		double score_AB = scores[square[0]];
-		double score_aB = scores[square[1]];
-		double score_ab = scores[square[3]];
-		double score_Ab = scores[square[2]];
-
-		// score differences
-		double delta_ab_Ab = score_Ab - score_ab;
-		double delta_ab_aB = score_aB - score_ab;
-		double delta_Ab_AB = score_AB - score_Ab;
-		double delta_aB_AB = score_AB - score_aB;
-
-		// no epistasis
-		if (score_AB + score_ab - score_Ab - score_aB == 0) {
-			no_epi++;
+// Samples the squares first .. last-1 (first is a multiple of SQUARES_PER_STREAM) and adds the numbers of squares of each
+// epistasis type to counts, as count_squares, but with the random numbers drawn from independent streams (one per
+// SQUARES_PER_STREAM squares) seeded by seed, in parallel.
+void count_squares_seeded(vector<double>& scores, long long first, long long last, int L, long long seed, vector<long long>& counts) {
+	assert(first % SQUARES_PER_STREAM == 0);
+	long long first_stream = first / SQUARES_PER_STREAM;
+	long long last_stream = (last + SQUARES_PER_STREAM - 1) / SQUARES_PER_STREAM;
+	#pragma omp parallel
+	{
+		vector<long long> thread_counts(4, 0);
+		#pragma omp for schedule(static)
+		for (long long stream = first_stream; stream < last_stream; ++stream) {
+			SplitMix64 rng = {SplitMix64{(uint64_t) seed ^ ((uint64_t) stream * 0xd1b54a32d192ed03ULL)}.next()};
+			long long end = min(last, (stream+1) * SQUARES_PER_STREAM);
+			for (long long i = stream * SQUARES_PER_STREAM; i < end; ++i) {
+				// the wildtype and two mutations at different positions, to different nucleotides
+				int seq0 = rng.below(scores.size());
+				int pos1 = rng.below(3*L);
+				int pos2 = rng.below(3*L-1);
+				if (pos2 >= pos1) ++pos2;
+				int shift1 = (1 + rng.below(3)) << (2*pos1);
+				int shift2 = (1 + rng.below(3)) << (2*pos2);
+				// mutating by xor with a non-zero 2-bit value gives a uniformly chosen different nucleotide
+				int seq1 = seq0 ^ shift1;
+				int seq2 = seq0 ^ shift2;
+				int seq12 = seq1 ^ shift2;
+				thread_counts[epistasis_type(scores[seq0], scores[seq1], scores[seq2], scores[seq12])]++;
+			}
+		}
+		#pragma omp critical
+		for (int t = 0; t < 4; ++t) counts[t] += thread_counts[t];
+	}
+}
+
+// Half-width of the 95% Wilson score confidence interval of a proportion, count successes out of n trials.
+double wilson_half_width(long long count, long long n) {
+	const double z = 1.959964;
+	double p = ((double) count)/n;
+	return z/(1 + z*z/n) * sqrt(p*(1-p)/n + z*z/(4.0*n*n));
+}
+
+// Samples random squares (with rand(), or from the streams seeded by options.seed) and computes the prevalence of the
+// epistasis types among them. Without options.precision, options.num_squares squares are sampled. Otherwise the squares
+// are sampled in blocks of ADAPTIVE_BLOCK until the half-width of the 95% confidence interval of every fraction is at most
+// options.precision, or options.num_squares squares were sampled; the achieved half-width and the number of sampled
+// squares are stored in half_width and num_sampled.
+vector<double> epistasis_types(vector<double>& scores, int L, Options& options, double& half_width, long long& num_sampled) {
+	vector<long long> counts(4, 0);
+	num_sampled = 0;
+	while (num_sampled < options.num_squares) {
+		long long block = options.precision > 0 ? min(ADAPTIVE_BLOCK, options.num_squares - num_sampled) : options.num_squares;
+		if (options.seed >= 0) {
+			count_squares_seeded(scores, num_sampled, num_sampled + block, L, options.seed, counts);
 		}
-		// magnitude epistasis
-		else if (delta_ab_Ab*delta_aB_AB >= 0 && delta_ab_aB*delta_Ab_AB>=0) {
-			mag++;
+		else {
+			count_squares(scores, block, L, counts);
 		}
-		// reciprocal sign epistasis
-		else if (delta_ab_Ab*delta_aB_AB < 0 && delta_ab_aB*delta_Ab_AB<0) {
-			rs++;
-		} else ss++; // otherwise it simple-sign epistasis
+		num_sampled += block;
+		half_width = 0;
+		for (int t = 0; t < 4; ++t) half_width = max(half_width, wilson_half_width(counts[t], num_sampled));
+		if (half_width <= options.precision) break;
 	}
-	vector<double> res = {((double)no_epi)/num_squares, ((double)mag)/num_squares, ((double)ss)/num_squares, ((double)rs)/num_squares};
+	vector<double> res;
+	for (int t = 0; t < 4; ++t) res.push_back(((double)counts[t])/num_sampled);
 	return res;
 }
 
-///////////////////////////////////////////////////////////
-int main(int argc, char** argv){
-	srand(1);
-	// command line parameters
-	string data_file_str = string(argv[1]);
-	string code_file_str = string(argv[2]);
-	string output_file_str = string(argv[3]);
-	int L = atoi(argv[4]);
-	
-	//read the genetic code
-	unordered_map<string, char> code; //GCA -> A
-	read_code(code_file_str, code);
+// Computes the exact prevalence of the epistasis types among all squares of the genotype network (the expected result of
+// epistasis_types, which samples each square with the same probability). Each square is enumerated once, from its corner
+// with the smaller nucleotides at both mutated positions. The test for no epistasis depends on the rounding, i.e. on the
+// corner taken as the wildtype (the corners AB and ab give the same sum, as do aB and Ab), so a square is counted as
+// a quarter for each of the 4 distinct sums.
+vector<double> epistasis_census(vector<double>& scores, int L) {
+	long long counts[4] = {0, 0, 0, 0};	// in quarters of squares
+	int num_seqs = scores.size();
+	for (int pos1 = 0; pos1 < 3*L; ++pos1) {
+		for (int pos2 = pos1+1; pos2 < 3*L; ++pos2) {
+			#pragma omp parallel for schedule(static) reduction(+:counts[:4])
+			for (int seq0 = 0; seq0 < num_seqs; ++seq0) {
+				int cur_val1 = (seq0 >> (2*pos1)) & 3;
+				int cur_val2 = (seq0 >> (2*pos2)) & 3;
+				for (int mut1 = cur_val1+1; mut1 < 4; ++mut1) {
+					int seq1 = seq0 + ((mut1-cur_val1) << (2*pos1));
+					for (int mut2 = cur_val2+1; mut2 < 4; ++mut2) {
+						int shift2 = (mut2-cur_val2) << (2*pos2);
+						double s0 = scores[seq0], s1 = scores[seq1], s2 = scores[seq0+shift2], s12 = scores[seq1+shift2];
+						// number of the sums giving no epistasis
+						int zeros = (s0 + s12 - s2 - s1 == 0) + (s0 + s12 - s1 - s2 == 0) + (s1 + s2 - s12 - s0 == 0) + (s1 + s2 - s0 - s12 == 0);
+						counts[0] += zeros;
+						if (zeros < 4) {
+							counts[sign_epistasis_type(s0, s1, s2, s12)] += 4 - zeros;
+						}
+					}
+				}
+			}
+		}
+	}
+	long long num_squares = counts[0] + counts[1] + counts[2] + counts[3];
+	vector<double> res;
+	for (int t = 0; t < 4; ++t) res.push_back(((double)counts[t])/num_squares);
+	return res;
+}
+
+// The greedy walks (option greedy), as in greedy_walk.cpp.
+
+// a node of the genotype network for the greedy walks
+struct Node{
+	vector<int> peaks; // indices of accessible peaks
+	vector<double> path; // we use lexicographical order on these values in the alg.  
+};
+
+struct Event{
+	vector<double> path; // path from a peak to node u
+	int u; //node to relax
+	int par_u; // parent that relaxed u
+};
+
+// how to compare two paths
+class Compare
+{
+public:
+    bool operator() (Event u, Event v)
+    {
+    	return lexicographical_compare(u.path.begin(), u.path.end(), v.path.begin(), v.path.end());
+	}
+};
+
+// Converts an integer to a DNA sequence.
+string int_to_string(int u, int L){
+	string ret = "";
+	for(int i = 0; i < L*3; ++i){
+		switch(u % 4){
+			case 0: ret += "A"; break;
+			case 1: ret += "C"; break;
+			case 2: ret += "G"; break;
+			case 3: ret += "U"; break;
+		}
+		u >>= 2;
+	}
+	return ret;
+}
+
+// translates a nucleotide sequence to protein, using the given genetic code
+string translate(string nuc_seq, unordered_map<string, char>& code){
+	string res = "";
+	for (int i = 0; i<nuc_seq.size()/3; ++i) {
+		string codon = nuc_seq.substr(3*i,3);
+		res += string(1, code[codon]);
+	}
+	return res;
+}
+
+// find the greedy paths
+void find_paths(vector<Node>& G, vector<double>& scores, int L){
+	cerr << "finding paths" << endl;
+	priority_queue<Event, vector<Event>, Compare> q;
+	vector<double> parent_score(1<<(6*L), -1);
+
+	// initialize the queue: add all nodes; the queue is sorted based on the scores
+	for(int i = 0; i < (1 << (6*L)); ++i){
+		if(scores[i] == EMPTY_VAL) continue;
+		Event e = Event();
+		e.path = {scores[i]};
+		e.u = i;
+		e.par_u = -1;
+		q.push(e);
+
+		parent_score[i] = scores[i];
+	}
+
+	vector<bool> relaxed(1<<(6*L), false);
+
+	while(!q.empty()){
+		// the path in the queue beginning with the highest score
+		Event e = q.top();
+		q.pop();
+
+		if(relaxed[e.u]){	
+			// if there are two equally good paths starting from u
+			if(G[e.u].path == e.path){ // by construction of the priority queue, e.path is always <= G[e.u].path
+				// add the peaks that are reached by the current parent of u
+				G[e.u].peaks.insert(G[e.u].peaks.end(), G[e.par_u].peaks.begin(), G[e.par_u].peaks.end());
+				sort(G[e.u].peaks.begin(), G[e.u].peaks.end());
+				auto it = unique(G[e.u].peaks.begin(), G[e.u].peaks.end());
+				G[e.u].peaks.erase(it, G[e.u].peaks.end());
+			}
+		}
+		else{
+			// relax
+			relaxed[e.u] = true;
+			// update G
+			G[e.u].path = e.path;
+			if(e.par_u == -1){
+				G[e.u].peaks = {e.u};
+			}
+			else{
+				G[e.u].peaks = G[e.par_u].peaks;
+			}
+
+			// add neighbors to the queue, if 
+			// 1) we are not just moving within a local peak
+			// 2) neighbor v is not already in the queue with a better parent
+			for(int v : Neighbors{e.u, L}){
+				if(!(G[e.u].path.size() == 1 && scores[v] == G[e.u].path[0]) &&	parent_score[v] <= scores[e.u]){
+					Event new_e = Event();
+					
+					new_e.u = v;
+					new_e.par_u = e.u;
+
+					vector<double> new_path = {scores[v]};
+					new_path.insert(new_path.end(), G[e.u].path.begin(), G[e.u].path.end());
+					new_e.path = new_path;
+
+					// only add if v is not relaxed, or if the current path of v is the same as new_path 
+					if (!relaxed[v] || new_path == G[v].path) {
+						q.push(new_e);
+						parent_score[v] = scores[e.u];
+					}				
+				} 
+			}
+		}
+	}
+}
+
+// Runs the greedy walks on the landscape (scores, under the genetic code code) and writes the results (mean fitness reached,
+// mean number of steps, the reached peaks and the entropy of their distribution, as greedy_walk) to out_file.
+void greedy_walks(vector<Node>& G, vector<double>& scores, unordered_map<string, char>& code, int L, ostream& out_file){
+	// forget the paths of the previous code
+	for (Node& node : G) {
+		node.peaks.clear();
+		node.path.clear();
+	}
+
+	// the main computation
+	find_paths(G, scores, L);
+
+	// compute mean fitness reached and report which peaks are reached
+	cout << "Computing mean number of steps, mean fitness and counting peaks." << endl;
+	double sum = 0;
+	double sum_len = 0;
+	int num_vert = 0;
+	map<string,double> reached_peaks;
+	for (int i = 0; i < 1<<(6*L); ++i) {
+		if(scores[i] == EMPTY_VAL) continue;
+		sum += G[i].path[G[i].path.size()-1];
+		sum_len += G[i].path.size()-1;
+		num_vert += 1;
+
+		for (int j = 0; j<G[i].peaks.size(); ++j) {
+			string translation = translate(int_to_string(G[i].peaks[j], L), code);
+			if (reached_peaks.count(translation)) reached_peaks[translation] += 1.0/G[i].peaks.size();
+			else reached_peaks[translation] = 1.0/G[i].peaks.size();
+		}
+
+		assert(G[i].path[G[i].path.size()-1] == scores[G[i].peaks[0]]);
+	}
+
+	// compute the entropy of distribution of reached peaks
+	double ent = 0;
+	for (auto it = reached_peaks.begin(); it!=reached_peaks.end(); ++it) {
+		double prob = it->second/num_vert;
+		ent -= prob*log(prob);
+	}
 	
-	// read the genotype-phenotype landscape
-	vector<double> scores;
-	read_scores(data_file_str, scores, code, L);
+	// output
+	out_file << sum/num_vert << "\t" << sum_len/num_vert << "\t";
+	for (auto it = reached_peaks.begin(); it!= reached_peaks.end(); ++it) {
+		out_file << std::fixed << setprecision(2) <<  it->first << ":" << it->second << ",";
+	}
+	out_file << "\t" << ent;
+	out_file << defaultfloat << setprecision(6);
+}
 
-	//construct the genotype network
-	vector<Node> G;
-	unordered_map<string, int> node_names;
-	build_graph(G, code, node_names, scores, L);
+// Computes the ruggedness characteristics of the landscape under one genetic code and writes them as one line to out_file.
+// With option greedy, the results of the greedy walks (see greedy_walks) are added to the line; greedy_G is their network.
+void evaluate_code(Graph& G, vector<Node>& greedy_G, vector<double>& aa_scores, unordered_map<string, char>& code, int L, Options& options, ostream& out_file){
+	srand(1);
+
+	// the genotype-phenotype landscape under the code
+	vector<double> scores;
+	read_scores(aa_scores, scores, code, L);
 
 	// find global maxima
 	vector<int> global_max;
@@ -376,10 +769,6 @@ int main(int argc, char** argv){
 		}
 	}
 
-	// output file
-	ofstream out_file;
-	out_file.open(output_file_str);
-	
 	// number of peaks
 	cout << "Peaks" << endl;
 	pair<int, double> res_peaks = count_peaks(G, scores);
@@ -387,25 +776,122 @@ int main(int argc, char** argv){
 
 	// epistasis
 	cout << "Epistasis" << endl;
-	vector<vector<int> > squares = sample_squares(G, scores, 1000000, L);
-	vector<double> res = epistasis_types(squares, scores);
+	vector<double> res;
+	double half_width = 0;
+	long long num_sampled = 0;
+	if (options.census) {
+		res = epistasis_census(scores, L);
+	}
+	else {
+		res = epistasis_types(scores, L, options, half_width, num_sampled);
+	}
 	out_file << res[0] << "\t" << res[1] << "\t" << res[2] << "\t" << res[3] << "\t";
 
 	// proportion of accessible paths
 	cout << "Accessible paths" << endl;
-	vector<long long> num_paths;
-	vector<long long> num_accessible;
-	vector<int> dist;
-	BFS(G, scores, dist, num_paths, num_accessible, global_max, false);
-	double prob_acc = 0.0;
-	int num_nonempty = 0;
-	for (int i=0; i<scores.size(); ++i) {
-		if (scores[i]!=EMPTY_VAL) {
-			prob_acc += 1.0*num_accessible[i]/num_paths[i];
-			num_nonempty++;
-		}		
+	double prob_acc = BFS(G, scores, global_max);
+
+	out_file << prob_acc;
+
+	// greedy walks on the same landscape
+	if (options.greedy) {
+		cout << "Greedy walks" << endl;
+		out_file << "\t";
+		greedy_walks(greedy_G, scores, code, L, out_file);
 	}
-	prob_acc /= num_nonempty;
 
-	out_file << prob_acc << endl;
-}
\ No newline at end of file
+	// precision of the adaptive sample of squares
+	if (options.precision > 0 && !options.census) {
+		out_file << "\t" << half_width << "\t" << num_sampled;
+	}
+	out_file << endl;
+}
+
+///////////////////////////////////////////////////////////
+int main(int argc, char** argv){
+	// command line parameters
+	string data_file_str = string(argv[1]);
+	string code_file_str = string(argv[2]);
+	string output_file_str = string(argv[3]);
+	int L = atoi(argv[4]);
+	// options (name=value) and the other parameters
+	Options options;
+	vector<string> params;
+	for (int i = 5; i < argc; ++i) {
+		string arg = string(argv[i]);
+		size_t eq = arg.find('=');
+		if (eq == string::npos) {
+			params.push_back(arg);
+			continue;
+		}
+		string name = arg.substr(0, eq);
+		string value = arg.substr(eq+1);
+		if (name == "threads") options.threads = parse_integer(value, "number of threads", 0, INT_MAX);
+		else if (name == "seed") options.seed = parse_integer(value, "seed", 0, LLONG_MAX);
+		else if (name == "squares" && value == "all") options.census = true;
+		else if (name == "greedy") options.greedy = parse_integer(value, "value of greedy (0 or 1)", 0, 1) != 0;
+		else if (name == "squares") {
+			// a positive number of squares (e.g. 1e8)
+			char* end;
+			double num_squares = strtod(value.c_str(), &end);
+			if (value.empty() || *end != '\0' || !(num_squares >= 1) || num_squares > 1e18) {
+				cerr << "Invalid number of squares: " << value << endl;
+				return 1;
+			}
+			options.num_squares = (long long) num_squares;
+		}
+		else if (name == "precision") {
+			// a half-width of the confidence intervals of the fractions, 0 < H < 1
+			char* end;
+			double precision = strtod(value.c_str(), &end);
+			if (value.empty() || *end != '\0' || !(precision > 0) || !(precision < 1)) {
+				cerr << "Invalid precision: " << value << endl;
+				return 1;
+			}
+			options.precision = precision;
+		}
+		else {
+			cerr << "Unknown option: " << name << endl;
+			return 1;
+		}
+	}
+#ifdef _OPENMP
+	if (options.threads > 0) omp_set_num_threads(options.threads);
+#else
+	if (options.threads > 1) cerr << "Compiled without OpenMP, running single-threaded" << endl;
+#endif
+	
+	// read the genotype-phenotype landscape
+	vector<double> aa_scores;
+	read_landscape(data_file_str, aa_scores, L);
+
+	// the genotype network (the same for all codes)
+	Graph G = {L};
+	// the nodes of the greedy walks (only with option greedy)
+	vector<Node> greedy_G(options.greedy ? (1 << (6*L)) : 0);
+
+	// output file
+	ofstream out_file;
+	out_file.open(output_file_str);
+
+	unordered_map<string, char> code; //GCA -> A
+	bool from_library = code_file_str.size() >= 4 && code_file_str.substr(code_file_str.size()-4) == ".npy";
+	if (code_file_str != "-" && !from_library) {
+		//read the genetic code
+		read_code(code_file_str, code);
+		evaluate_code(G, greedy_G, aa_scores, code, L, options, out_file);
+		return 0;
+	}
+
+	// stream of codes
+	ifstream library_file;
+	long long num_codes = -1;
+	if (from_library) {
+		open_code_library(library_file, code_file_str, (params.size() > 1) ? parse_integer(params[1], "first record", 0, LLONG_MAX) : 0);
+		if (params.size() > 0) num_codes = parse_integer(params[0], "number of records", 0, LLONG_MAX);
+	}
+	istream& codes_in = from_library ? library_file : cin;
+	for (long long n = 0; n != num_codes && read_code_record(codes_in, code); ++n) {
+		evaluate_code(G, greedy_G, aa_scores, code, L, options, out_file);
+	}
+}
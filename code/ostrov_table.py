@@ -0,0 +1,114 @@
+'''
+Runs a landscape engine (landscape_ruggedness, greedy_walk, random_walk) for a range of rows of the Ostrov codes summary
+table, without creating a code file per row (used by script_ruggedness_ostrov.sh, script_greedy_ostrov.sh and
+script_random_ostrov.sh).
+The rows are located through an index of byte offsets of the lines of the table (saved next to the table as
+summaryFile + ".idx.npy", rebuilt when the table changes), decoded in-process (see code_library.decode_ostrov_code) and
+the results are looked up in the result cache (see result_cache.py). The codes not found in the cache are all evaluated by
+a single run of the engine, reading them from its standard input as 64-byte records (see the engines), and the new
+results are added to the cache.
+Parameters:
+	[1] the Ostrov codes summary table
+	[2], [3] first and last line of the table to use (1-based, inclusive, as head -n [3] | tail -n +[2]; the header, line 1,
+		is skipped)
+	[4] path to the engine binary
+	[5] the landscape file passed to the engine
+	[6] output file: the lines of the table, each followed by a tab and the result of the engine
+	[7] directory of the result cache ("-" or a nonexistent directory: no cache)
+	[8] ... other parameters passed to the engine
+'''
+
+import numpy as np
+import os
+import sys
+import tempfile
+import genetic_code as gc
+import code_library
+import result_cache
+
+
+'''
+Builds the index of the summary table: byte offsets of the starts of all lines, followed by the size of the file.
+The index is saved to summaryFile + ".idx.npy" (next to the table itself, if summaryFile is a symbolic link).
+'''
+def build_index(summaryFile):
+	offsets = [0]
+	with open(summaryFile, 'rb') as f:
+		for line in f:
+			offsets.append(offsets[-1] + len(line))
+	index = np.array(offsets, dtype=np.int64)
+	indexFile = index_file(summaryFile)
+	# several jobs may build the index at the same time
+	fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(indexFile), suffix=".npy")
+	os.close(fd)
+	np.save(tmpPath, index)
+	os.replace(tmpPath, indexFile)
+	return index
+
+# Name of the index file of the summary table.
+def index_file(summaryFile):
+	return os.path.realpath(summaryFile) + ".idx.npy"
+
+# Loads the index of the summary table, (re)building it if it does not exist or is older than the table.
+def load_index(summaryFile):
+	indexFile = index_file(summaryFile)
+	if os.path.exists(indexFile) and os.path.getmtime(indexFile) >= os.path.getmtime(summaryFile):
+		index = np.load(indexFile)
+		if index[-1]==os.path.getsize(summaryFile):
+			return index
+	return build_index(summaryFile)
+
+'''
+Reads lines first .. last (1-based, inclusive) of the summary table, without the line ends.
+Lines beyond the end of the table are ignored.
+'''
+def read_rows(summaryFile, first, last, index = None):
+	if index is None:
+		index = load_index(summaryFile)
+	n_lines = len(index)-1
+	first = max(first, 1)
+	last = min(last, n_lines)
+	if first > last:
+		return []
+	with open(summaryFile, 'rb') as f:
+		f.seek(index[first-1])
+		content = f.read(index[last]-index[first-1]).decode()
+	return content.split("\n")[:(last-first+1)]
+
+'''
+Decodes one row of the summary table into a code array (see genetic_code.py).
+'''
+def decode_row(standard_code, row):
+	splitLine = row.split("\t")
+	return gc.code_to_array(code_library.decode_ostrov_code(standard_code, splitLine[1:5], splitLine[5:9]))
+
+
+if __name__ == "__main__":
+	summaryFile = sys.argv[1]
+	first = int(sys.argv[2])
+	last = int(sys.argv[3])
+	engine = sys.argv[4]
+	mapFile = sys.argv[5]
+	resultsFile = sys.argv[6]
+	cacheDir = sys.argv[7]
+	params = sys.argv[8:]
+	useCache = cacheDir!="-" and os.path.isdir(cacheDir)
+
+	standard_code = gc.read_code("input/code_standard.tsv")
+	tmpResults = resultsFile + ".tmp"
+
+	# skip the header
+	rows = read_rows(summaryFile, max(first, 2), last)
+	codes = np.array([decode_row(standard_code, row) for row in rows], dtype=np.uint8).reshape(-1, 64)
+
+	# results found in the cache; the other codes are evaluated by one run of the engine
+	results = result_cache.cached_results(engine, mapFile, codes, params, cacheDir if useCache else None, tmpResults)
+	if results is None:
+		sys.exit(1)
+
+	with open(resultsFile, 'w') as out:
+		for row, result in zip(rows, results):
+			out.write(row + "\t" + result + "\n")
+
+	if os.path.exists(tmpResults):
+		os.remove(tmpResults)
@@ -5,6 +5,13 @@ Parameters:
 	[2] Name of the file containing the genetic code. Format of the file: First line header, each other line tab-delimited aa (one-letter code) and a corresponding codon.
 	[3] Name of the output file.
 	[4] Population size (integer).
+Several codes can be evaluated by one run (the landscape is read only once):
+	if [2] is "-", the codes are read from the standard input as a stream of 64-byte records,
+	if [2] ends with ".npy", the codes are read from a code library file (codes.npy, see code_library.py); optionally only
+		[5] number of records starting with record [6] (default: all).
+	A record is one code: byte i is the index (in ACDEFGHIKLMNPQRSTVWY*) of the amino acid encoded by codon i = 16*b1+4*b2+b3
+	(A=0, C=1, G=2, U=3). One line of results is written to the output file for each code.
+	The codes are read by code_records.h; invalid records, library files or record ranges ([5], [6]) stop the engine with exit code 1.
 
 Compile as
 g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o random_walk random_walk.cpp
@@ -21,6 +28,7 @@ g++ -std=c++14 -fmax-errors=1 -O3 -Wall -o random_walk random_walk.cpp
 #include <cmath>
 #include <algorithm>
 #include <string>
+#include "code_records.h"
 
 using namespace std;
 
@@ -140,6 +148,28 @@ pair< vector<double>, map<string,int>> run_random_walks(int num_starts, int walk
 	return {scores, reached_seqs};
 }
 
+// Runs the random walks under the current genetic code and writes the results as one line to out_file.
+void evaluate_code(int pop_size, ostream& out_file){
+	srand(0); // seed
+
+	// run the random walks
+	//int num_starts = 100000;	// for the main analysis
+	int num_starts = 1000;		// for the dimensionality analysis
+	int walk_length = 1000;
+	pair< vector<double>, map<string,int>> res = run_random_walks(num_starts, walk_length, pop_size);
+		
+	// output
+	for(int i = 0; i < (res.first).size(); ++i){
+		out_file << res.first[i] << "\t";	 
+	} 
+	// uncomment this if you also want to output which sequences were reached (caution! easily generates very large files!)
+	/*
+	for(auto it=(res.second).begin(); it!=(res.second).end(); ++it) {
+		out_file << it->first << ":" << it->second << ",\n"[it==(res.second).end()];
+	}*/
+	out_file << endl;
+}
+
 ////////////////////////////////////////////
 int main(int argc, char** argv){
 	// command line parameters
@@ -170,27 +200,26 @@ int main(int argc, char** argv){
 	ofstream out_file;
 	out_file.open(output_file_str);
 
-	srand(0); // seed
 	nucs[0]='A'; nucs[1]='C'; nucs[2]='G'; nucs[3]='U';
 
-	// the genetic code
-	cerr << "Reading code" << endl;	
-	read_code(code_file_str);
+	bool from_library = code_file_str.size() >= 4 && code_file_str.substr(code_file_str.size()-4) == ".npy";
+	if (code_file_str != "-" && !from_library) {
+		// the genetic code
+		cerr << "Reading code" << endl;	
+		read_code(code_file_str);
+		evaluate_code(pop_size, out_file);
+		return 0;
+	}
 
-	// run the random walks
-	//int num_starts = 100000;	// for the main analysis
-	int num_starts = 1000;		// for the dimensionality analysis
-	int walk_length = 1000;
-	pair< vector<double>, map<string,int>> res = run_random_walks(num_starts, walk_length, pop_size);
-		
-	// output
-	for(int i = 0; i < (res.first).size(); ++i){
-		out_file << res.first[i] << "\t";	 
-	} 
-	// uncomment this if you also want to output which sequences were reached (caution! easily generates very large files!)
-	/*
-	for(auto it=(res.second).begin(); it!=(res.second).end(); ++it) {
-		out_file << it->first << ":" << it->second << ",\n"[it==(res.second).end()];
-	}*/
-	out_file << endl;
-}
\ No newline at end of file
+	// stream of codes
+	ifstream library_file;
+	long long num_codes = -1;
+	if (from_library) {
+		open_code_library(library_file, code_file_str, (argc > 6) ? parse_integer(argv[6], "first record", 0, LLONG_MAX) : 0);
+		if (argc > 5) num_codes = parse_integer(argv[5], "number of records", 0, LLONG_MAX);
+	}
+	istream& codes_in = from_library ? library_file : cin;
+	for (long long n = 0; n != num_codes && read_code_record(codes_in, code); ++n) {
+		evaluate_code(pop_size, out_file);
+	}
+}
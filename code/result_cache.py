@@ -0,0 +1,241 @@
+'''
+On-disk cache of the results of the landscape engines (landscape_ruggedness, greedy_walk, random_walk), so that a code is
+never evaluated twice on the same landscape by the same engine build (reruns after a crash, the standard code and
+duplicate codes shared between randomization families, ...).
+A result is stored under a hash of
+	the genetic code (the 64 amino acids in the order of genetic_code.codons, independent of the order of the lines of the
+		code file; with --canonical, its canonical form under the symmetries of the nucleotide graph, see
+		genetic_code.canonical_form, so that all codes of one equivalence class share a single evaluation),
+	the content of the landscape file,
+	the content of the engine binary,
+	the remaining engine parameters (e.g. L, population size).
+The size of the cache is bounded: when it exceeds the limit, the least recently used results are removed.
+
+Usage:
+	python3 result_cache.py get [--canonical] cacheDir engine mapFile codeFile outFile [params ...]
+		copies the cached result to outFile; exit code 0 if the result was found, 1 otherwise
+	python3 result_cache.py put [--canonical] cacheDir engine mapFile codeFile resultFile [params ...]
+		stores resultFile in the cache
+	python3 result_cache.py prune cacheDir
+		removes the least recently used results until the cache is within its size limit
+The batch drivers (sweep.py, ostrov_table.py) look up and store the results of many codes in one process, see
+cached_results.
+Parameters:
+	cacheDir ... directory of the cache; its maximal size in bytes can be set in the file cacheDir/max_size (default 10 GB)
+	engine ... path to the engine binary
+	mapFile, codeFile ... the landscape and the genetic code passed to the engine
+	outFile / resultFile ... the result file of the engine
+	params ... other parameters passed to the engine
+	--canonical ... key the result on the equivalence class of the code. Only for results that are the same for all codes
+		of a class (e.g. landscape_ruggedness with squares=all): the sampled statistics (epistasis, random walks) and the
+		tie-breaks of the greedy walks differ between the codes of a class, and the cached result would be that of
+		whichever code was evaluated first.
+'''
+
+import functools
+import hashlib
+import numpy as np
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import genetic_code as gc
+
+# default maximal size of the cache, in bytes
+DEFAULT_MAX_SIZE = 10*(1 << 30)
+# after pruning, the cache is filled to this fraction of the maximal size
+PRUNE_TO = 0.9
+
+'''
+Reads a genetic code file and returns it as a code array (see genetic_code.py).
+Stop codons encoded as 'O' are converted to '*'.
+'''
+def read_code_array(fileName):
+	code = {}
+	with open(fileName, 'r') as f:
+		lines = f.read().split("\n")
+		# remove the header
+		lines.pop(0)
+		for l in lines:
+			if l.strip()!="":
+				splitLine = l.split()
+				code[splitLine[1]] = "*" if splitLine[0]=="O" else splitLine[0]
+	return gc.code_to_array(code)
+
+# SHA-256 of the content of a file (computed once per process).
+@functools.lru_cache(maxsize=None)
+def file_hash(fileName):
+	h = hashlib.sha256()
+	with open(fileName, 'rb') as f:
+		for block in iter(lambda: f.read(1 << 20), b""):
+			h.update(block)
+	return h.hexdigest()
+
+# The cache key of one engine run (canonical: keyed on the equivalence class of the code, see the header).
+def result_key(engine, mapFile, codeFile, params, canonical = False):
+	return result_key_array(engine, mapFile, read_code_array(codeFile), params, canonical)
+
+# The cache key of one engine run, for a code given as an array (see genetic_code.py).
+def result_key_array(engine, mapFile, code_arr, params, canonical = False):
+	if canonical:
+		code_arr = gc.canonical_form(code_arr)
+	h = hashlib.sha256()
+	for part in [os.path.basename(engine), file_hash(engine), file_hash(mapFile)] + list(params):
+		h.update(part.encode() + b"\0")
+	# (the keys of the classes differ from the keys of their canonical codes)
+	if canonical:
+		h.update(b"canonical\0")
+	h.update(np.asarray(code_arr, dtype=np.uint8).tobytes())
+	return h.hexdigest()
+
+# Path of the cached result with the given key.
+def result_path(cacheDir, key):
+	return os.path.join(cacheDir, "results", key[:2], key)
+
+# Maximal size of the cache, in bytes.
+def max_size(cacheDir):
+	sizeFile = os.path.join(cacheDir, "max_size")
+	if os.path.exists(sizeFile):
+		with open(sizeFile, 'r') as f:
+			return int(f.read().strip())
+	return DEFAULT_MAX_SIZE
+
+# Copies the cached result to outFile. Returns False if there is no such result.
+def get(cacheDir, key, outFile):
+	path = result_path(cacheDir, key)
+	try:
+		shutil.copyfile(path, outFile)
+	except FileNotFoundError:
+		return False
+	# mark as recently used
+	os.utime(path)
+	return True
+
+# Stores resultFile in the cache (atomically, several jobs may share the cache).
+def put(cacheDir, key, resultFile):
+	path = result_path(cacheDir, key)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(path))
+	os.close(fd)
+	shutil.copyfile(resultFile, tmpPath)
+	os.replace(tmpPath, path)
+
+# Removes the least recently used results until the cache is within its size limit.
+def prune(cacheDir):
+	results = []
+	total = 0
+	for root, dirs, files in os.walk(os.path.join(cacheDir, "results")):
+		for name in files:
+			path = os.path.join(root, name)
+			try:
+				st = os.stat(path)
+			except FileNotFoundError:
+				continue
+			results.append((st.st_mtime, st.st_size, path))
+			total += st.st_size
+	limit = max_size(cacheDir)
+	if total <= limit:
+		return
+	results.sort()
+	for mtime, size, path in results:
+		if total <= PRUNE_TO*limit:
+			break
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			pass
+		total -= size
+
+'''
+Runs the engine for a sequence of codes (an (N, 64) array) in a single process: passed as a stream of records on the
+standard input, or, if libraryFile is given, read by the engine from the code library file (the codes being its records
+first .. first+N-1). Returns the lines of results, one per code, or None if the engine failed.
+'''
+def run_engine(engine, mapFile, codes, params, tmpResults, libraryFile = None, first = 0):
+	codes = np.ascontiguousarray(codes, dtype=np.uint8)
+	if libraryFile is not None:
+		command = [engine, mapFile, libraryFile, tmpResults] + list(params) + [str(codes.shape[0]), str(first)]
+		returncode = subprocess.run(command).returncode
+	else:
+		returncode = subprocess.run([engine, mapFile, "-", tmpResults] + list(params), input=codes.tobytes()).returncode
+	if returncode!=0:
+		return None
+	with open(tmpResults, 'r') as f:
+		results = f.read().split("\n")[:codes.shape[0]]
+	if len(results) < codes.shape[0]:
+		return None
+	return results
+
+'''
+Evaluates the codes (an (N, 64) array) by the engine, in one run for all codes whose results are not in the cache (the
+new results are added to the cache). The map file and the engine binary are hashed only once.
+Returns the lines of results, one per code, or None if the engine failed.
+parameters:
+	cacheDir ... directory of the cache (None: no cache)
+	tmpResults ... temporary file for the results of the engine
+	libraryFile, libraryRows ... (optional) a code library file containing the codes, and the row of each code in it; if
+		the codes to evaluate are consecutive rows, the engine reads them from the library instead of the standard input
+	canonical ... key the results on the equivalence classes of the codes (see the header)
+'''
+def cached_results(engine, mapFile, codes, params, cacheDir, tmpResults, libraryFile = None, libraryRows = None, canonical = False):
+	results = [None]*codes.shape[0]
+	keys = [None]*codes.shape[0]
+	if cacheDir is not None:
+		for i in range(codes.shape[0]):
+			keys[i] = result_key_array(engine, mapFile, codes[i], params, canonical)
+			if get(cacheDir, keys[i], tmpResults):
+				with open(tmpResults, 'r') as f:
+					results[i] = f.read().rstrip("\n")
+
+	# evaluate the remaining codes
+	missing = [i for i in range(codes.shape[0]) if results[i] is None]
+	if len(missing)==0:
+		return results
+	rows = None if libraryRows is None else np.asarray(libraryRows)[missing]
+	if libraryFile is not None and rows is not None and np.all(rows >= 0) and np.all(np.diff(rows)==1):
+		new_results = run_engine(engine, mapFile, codes[missing], params, tmpResults, libraryFile, rows[0])
+	else:
+		new_results = run_engine(engine, mapFile, codes[missing], params, tmpResults)
+	if new_results is None:
+		return None
+	for i, result in zip(missing, new_results):
+		results[i] = result
+		if cacheDir is not None:
+			with open(tmpResults, 'w') as f:
+				f.write(result + "\n")
+			put(cacheDir, keys[i], tmpResults)
+			# check the size of the cache after roughly every 256th new result
+			if keys[i].startswith("00"):
+				prune(cacheDir)
+	return results
+
+
+if __name__ == "__main__":
+	args = sys.argv[1:]
+	canonical = "--canonical" in args
+	if canonical:
+		args.remove("--canonical")
+	command = args[0]
+	cacheDir = args[1]
+
+	if command=="prune":
+		prune(cacheDir)
+		sys.exit(0)
+
+	engine = args[2]
+	mapFile = args[3]
+	codeFile = args[4]
+	resFile = args[5]
+	params = args[6:]
+	key = result_key(engine, mapFile, codeFile, params, canonical)
+
+	if command=="get":
+		sys.exit(0 if get(cacheDir, key, resFile) else 1)
+	elif command=="put":
+		put(cacheDir, key, resFile)
+		# check the size of the cache after roughly every 256th new result
+		if key.startswith("00"):
+			prune(cacheDir)
+	else:
+		raise ValueError("Unknown command: " + command)
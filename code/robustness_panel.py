@@ -0,0 +1,64 @@
+'''
+Computes a panel of robustness measures for all codes of a code library (see genetic_code.robustness_panel):
+	physchem ... robustness with respect to the physicochemical groups of Pines et al.
+	identity ... proportion of synonymous single-nucleotide substitutions
+	one column per property of the aaindex database (without missing values): total absolute change of the property over
+		all single-nucleotide substitutions (as the "ermc" of correlations_aaindex.py)
+	empirical ... the same for the empirical exchangeabilities (output/empirical_diffs.tsv of correlations_aaindex.py /
+		compute_emp_robustness.py), if given
+Parameters:
+	[1] directory with the code library (see code_library.py)
+	[2] output file (.npy); an (N codes x M metrics) float64 array, the names of the metrics are saved to the output file + "_metrics.tsv"
+	[3] (optional) the aaindex database (default input/aaindex1)
+	[4] (optional) file with the empirical exchangeabilities ("pair \t value" lines)
+'''
+
+import numpy as np
+import sys
+import genetic_code as gc
+import code_library
+
+# the order of amino acids in the aaindex database
+aaindex_aas = ['A', 'R', 'N', 'D', 'C', 'Q', 'E', 'G', 'H', 'I', 'L', 'K', 'M', 'F', 'P', 'S', 'T', 'W', 'Y', 'V']
+
+# Reads the aaindex database; returns a dictionary (property name -> vector of values), without properties with missing values.
+def read_aaindex(fileName):
+	with open(fileName, 'r') as f:
+		content = f.read().split("\nH ")
+	aaindex = {}
+	for item in content:
+		if item != "":
+			name = item.split()[0]
+			props = item.split("I/V")[-1].split()[:-1]
+			if "NA" not in props:
+				aaindex[name] = [float(x) for x in props]
+	return aaindex
+
+
+if __name__ == "__main__":
+	libDir = sys.argv[1]
+	outFile = sys.argv[2]
+	aaIndexFile = sys.argv[3] if len(sys.argv) > 3 else "input/aaindex1"
+	empiricalFile = sys.argv[4] if len(sys.argv) > 4 else None
+
+	codes = code_library.load_library(libDir)["codes"]
+
+	names = ["physchem", "identity"]
+	metrics = [gc.physchem_groups, list(range(21))]
+	for prop, prop_vec in read_aaindex(aaIndexFile).items():
+		names.append(prop)
+		metrics.append(gc.pair_cost_matrix(gc.compute_diff_vector(prop_vec), aaindex_aas))
+	if empiricalFile is not None:
+		aa_pairs, _ = gc.pair_table(aaindex_aas)
+		empirical_diffs = {}
+		with open(empiricalFile, 'r') as f:
+			for line in f:
+				if line.strip()!="":
+					empirical_diffs[line.split()[0]] = float(line.split()[1])
+		names.append("empirical")
+		metrics.append(gc.pair_cost_matrix([empirical_diffs[p] for p in aa_pairs], aaindex_aas))
+
+	np.save(outFile, gc.robustness_panel(codes, metrics))
+	with open(outFile + "_metrics.tsv", 'w') as f:
+		for i, name in enumerate(names):
+			f.write(str(i) + "\t" + name + "\n")
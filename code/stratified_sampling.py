@@ -0,0 +1,109 @@
+'''
+Stratified sampling of randomized genetic codes by robustness.
+The codes with seeds 0 .. n_pool-1 are binned into strata of equal width in robustness (physicochemical groups of
+Pines et al.), and the same number of codes is drawn from every stratum (or the whole stratum, if it is smaller; the
+remaining budget goes to the other strata). The sparse strata in the tails of the robustness distribution are thus
+oversampled. Each selected code gets the importance weight N_h/n_h (the number of codes of the pool it stands for,
+N_h and n_h being the size of its stratum in the pool and in the sample), so that weighted statistics of the sample
+estimate the statistics of the pool.
+Parameters:
+	[1] randomization type (aa_permutation, aa_permutation_restricted or random)
+	[2] size of the pool (seeds 0 .. n_pool-1)
+	[3] number of codes to select
+	[4] number of strata
+	[5] output file: "seed \t weight" per line, sorted by seed (can be given to script_ruggedness.sh / script_greedy.sh
+		as the seeds file, and to compute_corrs.py as the weights file)
+	[6] (optional) random seed of the sampling (default 0)
+	[7] (optional) directory with the code library of the randomization type (see code_library.py)
+'''
+
+import numpy as np
+import os
+import sys
+import genetic_code as gc
+import code_library
+
+
+'''
+Draws a stratified sample of codes.
+parameters:
+	rob ... robustness of the codes of the pool
+	n_sample ... number of codes to select
+	n_strata ... number of strata (of equal width between the minimal and maximal robustness)
+	rng ... numpy random generator
+Returns (indices, weights): sorted indices of the selected codes and their importance weights.
+'''
+def stratified_sample(rob, n_sample, n_strata, rng):
+	rob = np.asarray(rob)
+	edges = np.linspace(rob.min(), rob.max(), n_strata+1)
+	strata = np.clip(np.searchsorted(edges, rob, side='right')-1, 0, n_strata-1)
+	sizes = np.bincount(strata, minlength=n_strata)
+	# allocate the sample equally among the strata, giving the budget of the small strata to the others
+	alloc = np.zeros(n_strata, dtype=np.int64)
+	budget = min(n_sample, len(rob))
+	while budget > 0:
+		open_strata = np.flatnonzero(alloc < sizes)
+		share = np.full(len(open_strata), budget // len(open_strata))
+		share[:(budget % len(open_strata))] += 1
+		add = np.minimum(share, sizes[open_strata] - alloc[open_strata])
+		alloc[open_strata] += add
+		budget -= int(add.sum())
+	indices = []
+	weights = []
+	for h in range(n_strata):
+		if alloc[h] > 0:
+			members = np.flatnonzero(strata==h)
+			indices.append(rng.choice(members, size=alloc[h], replace=False))
+			weights.append(np.full(alloc[h], sizes[h] / alloc[h]))
+	indices = np.concatenate(indices)
+	weights = np.concatenate(weights)
+	order = np.argsort(indices)
+	return indices[order], weights[order]
+
+# Reads a file with "seed \t weight" lines; returns a dictionary seed -> weight.
+def read_weights(fileName):
+	weights = {}
+	with open(fileName, 'r') as f:
+		for line in f:
+			if line.strip()!="":
+				splitLine = line.split()
+				weights[int(splitLine[0])] = float(splitLine[1])
+	return weights
+
+# Weighted Pearson correlation of x and y.
+def weighted_corrcoef(x, y, w):
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	w = np.asarray(w, dtype=float)
+	dx = x - np.average(x, weights=w)
+	dy = y - np.average(y, weights=w)
+	return np.sum(w*dx*dy) / np.sqrt(np.sum(w*dx*dx) * np.sum(w*dy*dy))
+
+
+
+if __name__ == "__main__":
+	randType = sys.argv[1]
+	n_pool = int(sys.argv[2])
+	n_sample = int(sys.argv[3])
+	n_strata = int(sys.argv[4])
+	outFile = sys.argv[5]
+	seed = int(sys.argv[6]) if len(sys.argv) > 6 else 0
+	libDir = sys.argv[7] if len(sys.argv) > 7 else "input/code_library"
+
+	# the standard code
+	standard_code = gc.read_code("input/code_standard.tsv")
+
+	# robustness of the codes of the pool, read from the code library if available
+	rob = None
+	if os.path.isdir(libDir):
+		lib = code_library.load_library(libDir)
+		if lib["header"]["family"]==randType and lib["robustness"].shape[0] >= n_pool:
+			rob = np.asarray(lib["robustness"][:n_pool])
+	if rob is None:
+		rob = gc.robustness(code_library.get_codes(randType, n_pool, standard_code, libDir), gc.physchem_groups)
+
+	indices, weights = stratified_sample(rob, n_sample, n_strata, np.random.default_rng(seed))
+
+	with open(outFile, 'w') as f:
+		for i, w in zip(indices, weights):
+			f.write(str(i) + "\t" + str(w) + "\n")
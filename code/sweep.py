@@ -0,0 +1,82 @@
+'''
+Runs a landscape engine (landscape_ruggedness, block_ruggedness, greedy_walk, random_walk) for a range of seeds of a
+randomization family in a single process (used by script_ruggedness.sh, script_greedy.sh, script_random.sh and the
+inner loops of GB1/06_dimensionality), instead of running generate_gen_code.py and the engine once per seed.
+The codes of all seeds are obtained at once (read from the code library if it contains them, otherwise generated, see
+generate_gen_code.seed_codes) and the results are looked up in the result cache (see result_cache.py). The codes not
+found in the cache are all evaluated by a single run of the engine: read by the engine directly from the code library if
+they are its consecutive records, otherwise from its standard input as 64-byte records (see the engines).
+Each line appended to the output file is the same as the line of the per-seed loop: the statistics written by
+generate_gen_code.py, followed by the result of the engine.
+Parameters:
+	[1] randomization type (see generate_gen_code.py)
+	[2], [3] first and last seed (inclusive); with [4], the first and last line of the seeds file (0-based, inclusive)
+	[4] file with selected seeds, one per line (see constrained_codes.py); "" for the seeds [2] .. [3]
+	[5] path to the engine binary
+	[6] the landscape file passed to the engine
+	[7] output file; the lines are appended
+	[8] directory of the result cache ("-" or a nonexistent directory: no cache)
+	[9] directory with the code library of the randomization type ("" or a nonexistent directory: the codes are generated)
+	[10] ... other parameters passed to the engine
+'''
+
+import numpy as np
+import os
+import sys
+import genetic_code as gc
+import generate_gen_code
+import result_cache
+
+
+'''
+Returns the seeds of a sweep: first .. last, or lines first .. last (0-based, inclusive) of the seeds file (only the first
+column is used). Lines beyond the end of the file are ignored.
+'''
+def sweep_seeds(first, last, seedsFile = ""):
+	if seedsFile=="":
+		return list(range(first, last+1))
+	with open(seedsFile, 'r') as f:
+		lines = f.read().split("\n")[first:(last+1)]
+	return [int(l.split("\t")[0]) for l in lines if l.strip()!=""]
+
+
+
+if __name__ == "__main__":
+	randType = sys.argv[1]
+	first = int(sys.argv[2])
+	last = int(sys.argv[3])
+	seedsFile = sys.argv[4]
+	engine = sys.argv[5]
+	mapFile = sys.argv[6]
+	outFile = sys.argv[7]
+	cacheDir = sys.argv[8]
+	libDir = sys.argv[9]
+	params = sys.argv[10:]
+	useCache = cacheDir!="-" and os.path.isdir(cacheDir)
+	useLibrary = libDir!="" and os.path.isdir(libDir)
+
+	standard_code = gc.read_code("input/code_standard.tsv")
+	tmpResults = outFile + ".tmp"
+
+	seeds = sweep_seeds(first, last, seedsFile)
+	lib, mode = generate_gen_code.load_seed_library(randType, libDir if useLibrary else None)
+	codes, rob, X = generate_gen_code.seed_codes(randType, seeds, standard_code, lib, mode)
+
+	# the row of each code in the code library (-1: generated)
+	libraryFile = None
+	libraryRows = None
+	if lib is not None:
+		libraryFile = os.path.join(libDir, "codes.npy")
+		libraryRows = np.where(np.array(seeds) < len(lib["codes"]), seeds, -1)
+
+	results = result_cache.cached_results(engine, mapFile, codes, params, cacheDir if useCache else None, tmpResults,
+		libraryFile, libraryRows)
+	if results is None:
+		sys.exit(1)
+
+	with open(outFile, 'a') as out:
+		for i, seed in enumerate(seeds):
+			out.write(generate_gen_code.code_stats(randType, seed, X[i], rob[i]) + results[i] + "\n")
+
+	if os.path.exists(tmpResults):
+		os.remove(tmpResults)
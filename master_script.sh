@@ -31,6 +31,24 @@ echo "vcregression done"
 echo "#####"
 '
 
+######## code libraries (shared by all proteins, built only once)
+echo "Code libraries"
+for randType in aa_permutation aa_permutation_restricted random; do
+	if [ ! -d ../resources/code_libraries/$randType ]; then
+		python3 ../code/code_library.py $randType 100000 ../resources/code_libraries/$randType ../resources/code_standard.tsv
+	fi
+done
+# the Ostrov codes summary table (generate_codes_ostrov.py can also generate any range of it, see there)
+if [ ! -f ../resources/ostrov_codes_summary.tsv ]; then
+	python3 ../code/generate_codes_ostrov.py ../resources/ostrov_codes_summary.tsv ../resources/code_standard.tsv
+fi
+if [ ! -d ../resources/code_libraries/ostrov ]; then
+	python3 ../code/code_library.py ostrov -1 ../resources/code_libraries/ostrov ../resources/code_standard.tsv ../resources/ostrov_codes_summary.tsv
+fi
+# result cache of the landscape engines (shared by all proteins, see code/result_cache.py)
+mkdir -p ../result_cache
+echo "#####"
+
 ######## 2: ruggedness
 echo "Step 2: ruggedness"
 mkdir 02_ruggedness
@@ -45,6 +63,7 @@ mkdir input
 cd input
 ln -s ../../../01_vcregression/output/map.txt .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/aa_permutation code_library
 cat map.txt | sed 's/,/\t/g' > map.tsv
 cd ..
 
@@ -66,6 +85,7 @@ mkdir input
 cd input
 ln -s ../../aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/aa_permutation_restricted code_library
 cd ..
 
 if [[ $N -eq 3 ]]; then
@@ -86,6 +106,7 @@ mkdir input
 cd input
 ln -s ../../aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/random code_library
 cd ..
 
 if [[ $N -eq 3 ]]; then
@@ -106,6 +127,7 @@ mkdir input
 cd input
 ln -s ../../aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/ostrov code_library
 ln -s ../../../../resources/ostrov_codes_summary.tsv .
 cd ..
 
@@ -143,6 +165,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/aa_permutation code_library
 cd ..
 
 if [[ $N -eq 3 ]]; then
@@ -167,6 +190,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/aa_permutation_restricted code_library
 cd ..
 
 if [[ $N -eq 3 ]]; then
@@ -191,6 +215,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/random code_library
 cd ..
 
 if [[ $N -eq 3 ]]; then
@@ -215,6 +240,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/ostrov code_library
 ln -s ../../../../resources/ostrov_codes_summary.tsv .
 cd ..
 
@@ -267,6 +293,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/aa_permutation code_library
 cd ..
 
 for i in $(seq 0 99); do
@@ -286,6 +313,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/random code_library
 cd ..
 
 for i in $(seq 0 99); do
@@ -305,6 +333,7 @@ mkdir input
 cd input
 ln -s ../../../02_ruggedness/aa_permutation/input/map.tsv .
 ln -s ../../../../resources/code_standard.tsv .
+ln -s ../../../../resources/code_libraries/ostrov code_library
 ln -s ../../../../resources/ostrov_codes_summary.tsv .
 cd ..
 
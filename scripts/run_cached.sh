@@ -0,0 +1,17 @@
+# Defines run_cached, which runs an engine for one code file, unless its result is already in the result cache
+# (see code/result_cache.py). Sourced by the scripts run from the protein directories (../../../ is the repository):
+#	run_cached engine map codeFile outFile [params ...]
+# The sweeps over many codes look up the results of all codes in one process instead (see result_cache.cached_results).
+
+cacheDir="../../../result_cache"
+run_cached() {
+	engine=$1; map=$2; code=$3; out=$4
+	shift 4
+	if [ -d $cacheDir ] && python3 ../../../code/result_cache.py get $cacheDir $engine $map $code $out "$@"; then
+		return 0
+	fi
+	$engine $map $code $out "$@" || return 1
+	if [ -d $cacheDir ]; then
+		python3 ../../../code/result_cache.py put $cacheDir $engine $map $code $out "$@"
+	fi
+}
@@ -5,15 +5,19 @@ randType=$4
 
 outFile="output/results_"$startSeed"-"$endSeed
 mkdir -p "output"
-codeFile="tmp_code_"$startSeed"-"$endSeed
-tmpOut="tmp_out_"$startSeed"-"$endSeed
 
-for i in $(seq $startSeed $endSeed); do
-        python3 ../../../code/generate_gen_code.py $randType $i $outFile $codeFile
-        ../../../code/./greedy_walk input/map.tsv $codeFile $tmpOut $N
-        cat $tmpOut >> $outFile
-done
+# code library of the randomization type (optional, see code/code_library.py)
+libDir=""
+if [ -d input/code_library ]; then
+	libDir="input/code_library"
+fi
 
-rm $codeFile
-rm $tmpOut
+# result cache (optional, see code/result_cache.py)
+cacheDir="../../../result_cache"
 
+# the seeds: startSeed .. endSeed, or (optional parameter 5) the seeds on lines startSeed .. endSeed (0-based) of a file
+# with selected seeds (see code/constrained_codes.py)
+seedsFile=$5
+
+# all seeds at once, by one run of the engine (see code/sweep.py)
+python3 ../../../code/sweep.py $randType $startSeed $endSeed "$seedsFile" ../../../code/./greedy_walk input/map.tsv $outFile $cacheDir "$libDir" $N || exit 1
@@ -3,9 +3,12 @@ N=$1
 mkdir output
 echo -n > output/results
 
+# runs an engine, unless its result is already in the result cache (optional, see code/result_cache.py)
+. ../../../scripts/run_cached.sh
+
 for code in "FS20" "RED20" "OPT" "OPT-NR" "CMC" "CMC2" "REC" "Ostrov"; do
 	codeFile="input/codes/code_"$code".tsv"
-	../../../code/./greedy_walk input/map.tsv $codeFile tmpOut $N
+	run_cached ../../../code/./greedy_walk input/map.tsv $codeFile tmpOut $N || exit 1
 	echo -ne "$code\t" >> output/results
 	cat tmpOut >> output/results
 done
@@ -5,30 +5,10 @@ popSize=$3
 mkdir -p output/results_"$popSize"
 
 resultsFile="output/results_"$popSize"/results_"$from"-"$to
-echo -n > $resultsFile
-tmpFile="tmpFile_"$popSize"_"$from"-"$to
-tmpCode="tmp_code_"$popSize"_"$from"-"$to
-tmpResults="tmp_results_"$popSize"_"$from"-"$to
 
-cat input/ostrov_codes_summary.tsv | head -n $to | tail -n +$from > $tmpFile
+# the codes are decoded from the summary table in-process and the results are looked up in the result cache
+# (optional, see code/ostrov_table.py and code/result_cache.py)
+cacheDir="../../../result_cache"
 
-while read code block1 block2 block3 block4 X Z B J; do
-	# create the code file
-	python3 ../../../code/create_ostrov_code.py $block1 $block2 $block3 $block4 $tmpCode 0 $X $Z $B $J
-	sed -i 's/O/*/g' $tmpCode
-	# run the simulation 
-	../../../code/./random_walk input/map.tsv $tmpCode $tmpResults $popSize
-	
-	if [ $? -eq 0 ]; then
-	    cat $tmpResults >> $resultsFile
-	else
-	    exit 1
-	fi
-
-	rm $tmpCode
-done < $tmpFile
-
-paste $tmpFile $resultsFile > $tmpResults
-mv $tmpResults $resultsFile
-
-rm $tmpFile
+# run the simulation
+python3 ../../../code/ostrov_table.py input/ostrov_codes_summary.tsv $from $to ../../../code/./random_walk input/map.tsv $resultsFile $cacheDir $popSize
@@ -6,19 +6,38 @@ rand_type=$4
 # output file
 outFile="output/results_"$startSeed"-"$endSeed
 mkdir -p "output"
-# temporary files
-codeFile="tmp_code_"$startSeed"-"$endSeed
-tmpOut="tmp_out_"$startSeed"-"$endSeed
 
-for i in $(seq $startSeed $endSeed); do
-	# generate the genetic code
-	python3 ../../../code/generate_gen_code.py $rand_type $i $outFile $codeFile
-	# run the ruggedness analysis
-	../../../code/./landscape_ruggedness input/map.tsv $codeFile $tmpOut $N
-	# append the results to the output file
-	cat $tmpOut >> $outFile
-done
+# code library of the randomization type (optional, see code/code_library.py)
+libDir=""
+if [ -d input/code_library ]; then
+	libDir="input/code_library"
+fi
 
-# remove the temporary files
-rm $codeFile
-rm $tmpOut
+# result cache (optional, see code/result_cache.py)
+cacheDir="../../../result_cache"
+
+# the seeds: startSeed .. endSeed, or (optional parameter 5) the seeds on lines startSeed .. endSeed (0-based) of a file
+# with selected seeds (see code/constrained_codes.py)
+seedsFile=$5
+
+# further options of the engine (optional parameters 6, ...; parameter 5 may then be ""), e.g. greedy=1 to run the greedy
+# walks on the same landscapes too (see code/landscape_ruggedness.cpp)
+engineOptions=""
+if [ $# -gt 5 ]; then
+	shift 5
+	engineOptions="$*"
+fi
+
+# the engine: the amino acid permutations keep the codon blocks of the standard code, so their ruggedness is computed on the
+# block graph (code/block_ruggedness.cpp, the same results); the options are only supported by landscape_ruggedness
+engine="../../../code/./landscape_ruggedness"
+case $rand_type in
+	aa_permutation|aa_permutation_restricted|aa_permutation_restricted_exhaustive)
+		if [ -z "$engineOptions" ]; then
+			engine="../../../code/./block_ruggedness"
+		fi;;
+esac
+
+# generate the genetic codes (or read them from the code library) and run the ruggedness analysis for all seeds at once,
+# appending the results to the output file (see code/sweep.py)
+python3 ../../../code/sweep.py $rand_type $startSeed $endSeed "$seedsFile" $engine input/map.tsv $outFile $cacheDir "$libDir" $N $engineOptions || exit 1